@@ -0,0 +1,57 @@
+"""
+The stdlib regex parser, and helpers for walking the trees it produces.
+
+The parser is private to ``re`` (``re._parser`` since Python 3.11, the
+``sre_parse`` module before), so the pattern analyses in this package all
+import it from here.
+"""
+from typing import Iterator, List, Pattern, Tuple
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+
+def _opcodes(*names: str) -> tuple:
+    """The named opcodes this Python version has"""
+    return tuple(op for op in (getattr(sre_constants, name, None) for name in names) if op is not None)
+
+
+# Quantifiers: the argument is (min, max, items)
+REPEATS = _opcodes('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+# Groups: the items are the argument's last element (an atomic group's argument is the items)
+GROUPS = _opcodes('SUBPATTERN', 'ATOMIC_GROUP')
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+
+
+def parse(pattern: Pattern):
+    """Parse tree of a compiled pattern"""
+    return sre_parse.parse(pattern.pattern, pattern.flags)
+
+
+def children(op, av) -> List:
+    """Item sequences nested directly in one (opcode, argument) item"""
+    if op in REPEATS:
+        return [av[2]]
+    if op is sre_constants.SUBPATTERN:
+        return [av[3]]
+    if op is _ATOMIC_GROUP:
+        return [av]
+    if op is sre_constants.BRANCH:
+        return list(av[1])
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op is sre_constants.GROUPREF_EXISTS:
+        return [branch for branch in av[1:] if branch is not None]
+    return []
+
+
+def walk(items) -> Iterator[Tuple]:
+    """Every (opcode, argument) in a parse tree, depth first"""
+    for op, av in items:
+        yield op, av
+        for sub in children(op, av):
+            yield from walk(sub)
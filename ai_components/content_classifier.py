@@ -1,95 +1,595 @@
+import hashlib
 import logging
 import re
-from typing import Dict, Any, List
+import time
+from bisect import bisect_right
+from typing import Dict, Any, List, Iterable, Optional
+
+from .entropy_detector import EntropyDetector
+from .keyword_automaton import KeywordAutomaton
+from .line_index import LineIndex
+from .pattern_matcher import PatternMatcher
+from .pattern_registry import PatternRegistry, PatternSet
+from .regex_safety import RegexBudget
+from .tier_stats import TierStats
+
+# Cap on the overlap kept between stream chunks for patterns whose matches
+# are unbounded (e.g. ``[^\s]+``); longer matches may be cut at chunk edges
+DEFAULT_STREAM_MAX_MATCH = 4096
+
+# Regex time allowed per file and per pattern within a file, in seconds,
+# plus a further allowance per megabyte of content for both
+DEFAULT_REGEX_TIME_BUDGET = 5.0
+DEFAULT_REGEX_PATTERN_TIME_BUDGET = 1.0
+DEFAULT_REGEX_TIME_PER_MB = 1.0
+
+# Match locations reported per detected pattern when locations are requested
+DEFAULT_MAX_LOCATIONS = 100
+
+# Text model defaults: score at or above which content counts as sensitive,
+# and how much of each text is scored
+DEFAULT_ML_THRESHOLD = 0.75
+DEFAULT_ML_MAX_CHARS = 4096
+# In cascade mode the model settles what the patterns leave in doubt: hits
+# with confidence below this (scored as windows of context around them),
+# and content without hits where patterns ran out of time
+DEFAULT_ML_ESCALATE_BELOW = 0.8
+# Doubtful hits scoring below this are cleared as false positives
+DEFAULT_ML_CLEAR_BELOW = 0.25
+DEFAULT_ML_WINDOW = 256
+DEFAULT_ML_MAX_WINDOWS = 8
+
+# Joins the texts of a batch for shared passes. The newlines make each text's
+# edges look like the start and end of a text to \b, and the record separator
+# keeps keywords and entropy tokens from running from one text into the next
+BATCH_SEPARATOR = '\n\x1e\n'
+
+
+def _batch_starts(texts: List[str]) -> List[int]:
+    """Offset of each text in ``BATCH_SEPARATOR.join(texts)``"""
+    starts, pos = [], 0
+    for text in texts:
+        starts.append(pos)
+        pos += len(text) + len(BATCH_SEPARATOR)
+    return starts
+
+
+def _mark_texts(candidates: set, starts: List[int], spans: Iterable) -> None:
+    """Add the index of every batch text a (start, end) span overlaps"""
+    for start, end in spans:
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, max(start, end - 1)) - 1
+        candidates.update(range(first, last + 1))
+
+
+class _ScanState:
+    """Per-content match accumulator, carried across chunks when streaming"""
+
+    def __init__(self, pattern_set: PatternSet, budget: Optional[RegexBudget] = None):
+        # The pattern set is fixed for the whole content, even if the
+        # registry swaps in a new one meanwhile
+        self.pattern_set = pattern_set
+        self.pattern_counts = {}
+        self.pattern_samples = {}
+        self.keyword_counts = {}
+        # Absolute offset each pattern/keyword may next match from, so that
+        # matches are non-overlapping and counted once across chunk windows
+        self.resume = {}
+        self.budget = budget
+        # (start, end) of matches per pattern, when locations are requested
+        self.spans = {}
+        self.line_index = None
+        # Text around pattern hits, for the text model
+        self.model_windows = []
 
 class ContentClassifier:
     """
     AI Content Classifier for sensitive data detection
     """
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], pattern_registry: Optional[PatternRegistry] = None):
         self.config = config
         self.logger = logging.getLogger(__name__)
         
-        # Sensitive patterns with compiled regex for better performance
-        self.sensitive_patterns = {
-            'ssn': re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-            'credit_card': re.compile(r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b'),
-            'email': re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-            'phone': re.compile(r'\b\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
-            'api_key': re.compile(r'\b[A-Za-z0-9]{32,40}\b'),
-            'password_mention': re.compile(r'\bpassword\s*[=:]\s*[^\s]+\b', re.IGNORECASE),
-            'secret_mention': re.compile(r'\bsecret\s*[=:]\s*[^\s]+\b', re.IGNORECASE)
-        }
+        # Budgets are checked between regex passes; patterns on the regex
+        # package's engine (opt-in with regex_engine "regex", or by default
+        # those loaded despite a ReDoS warning) can be interrupted mid-match.
+        # Without budgets the stdlib engine runs everything
+        self.regex_time_budget = config.get("regex_time_budget", DEFAULT_REGEX_TIME_BUDGET)
+        self.regex_pattern_time_budget = config.get(
+            "regex_pattern_time_budget", DEFAULT_REGEX_PATTERN_TIME_BUDGET
+        )
+        self.regex_time_per_mb = config.get("regex_time_per_mb", DEFAULT_REGEX_TIME_PER_MB)
+        budgeted = bool(self.regex_time_budget or self.regex_pattern_time_budget)
+        regex_engine = config.get("regex_engine", "auto")
+        if regex_engine == "auto" and not budgeted:
+            regex_engine = "re"
+        
+        # Compiled patterns and high-risk keywords come from the registry,
+        # which may be shared with other scanners and hot-reloaded from the
+        # config file
+        self.pattern_registry = pattern_registry or PatternRegistry.from_config(
+            config, engine=regex_engine
+        )
+        matcher = self.pattern_matcher
+        if budgeted and (regex_engine == "regex" or matcher.risky) and not matcher.interruptible:
+            self.logger.warning("regex package not installed; regex time budgets are only "
+                                "checked between patterns")
+        
+        # High-entropy tokens (generated keys and tokens the regexes miss);
+        # opt-in, since generated identifiers in ordinary files also qualify
+        entropy_config = config.get("entropy_detection", {})
+        self.entropy_detector = None
+        if entropy_config.get("enabled", False):
+            self.entropy_detector = EntropyDetector(
+                thresholds=entropy_config.get("thresholds"),
+                min_length=entropy_config.get("min_length", 20),
+                max_length=entropy_config.get("max_length", 128)
+            )
         
-        # High-risk keywords
-        self.high_risk_keywords = [
-            'password', 'secret', 'confidential', 'private', 'restricted',
-            'classified', 'proprietary', 'token', 'key', 'credential',
-            'aws_key', 'api_key', 'access_key', 'secret_key', 'private_key'
-        ]
+        self.stream_max_match_length = config.get("stream_max_match_length", DEFAULT_STREAM_MAX_MATCH)
+        
+        # Offsets and line/column numbers of matches (classify_content only)
+        self.report_locations = config.get("report_locations", False)
+        self.max_locations = config.get("max_locations", DEFAULT_MAX_LOCATIONS)
+        
+        # Optional linear text model, loaded (memory-mapped) on first use
+        ml_config = config.get("ml_model") or {}
+        self.ml_model_path = ml_config.get("path")
+        self.ml_threshold = ml_config.get("threshold", DEFAULT_ML_THRESHOLD)
+        self.ml_max_chars = ml_config.get("max_chars", DEFAULT_ML_MAX_CHARS)
+        # "cascade": score only ambiguous content, around its pattern hits;
+        # "always": score the start of all content
+        self.ml_mode = ml_config.get("mode", "cascade")
+        self.ml_escalate_below = ml_config.get("escalate_below", DEFAULT_ML_ESCALATE_BELOW)
+        self.ml_clear_below = ml_config.get("clear_below", DEFAULT_ML_CLEAR_BELOW)
+        self.ml_window = ml_config.get("window", DEFAULT_ML_WINDOW)
+        self.ml_max_windows = ml_config.get("max_windows", DEFAULT_ML_MAX_WINDOWS)
+        self._ml_unavailable = False
+        self._captures_windows = bool(self.ml_model_path) and self.ml_mode == "cascade"
+        
+        # Counts and time per detection tier (the engine adds the path filter)
+        self.tier_stats = TierStats()
+        self._overlaps = {}
+        self._rulesets = {}
+        self._keyword_probes = {}
+    
+    @property
+    def sensitive_patterns(self) -> Dict[str, Any]:
+        return self.pattern_registry.current.patterns
+    
+    @property
+    def pattern_matcher(self) -> PatternMatcher:
+        return self.pattern_registry.current.matcher
+    
+    @property
+    def high_risk_keywords(self) -> List[str]:
+        return list(self.pattern_registry.current.keywords)
+    
+    @property
+    def keyword_automaton(self) -> KeywordAutomaton:
+        return self.pattern_registry.current.keyword_automaton
+    
+    def _keyword_probe(self, pattern_set: PatternSet):
+        """Regex finding the set's lowercased keywords in a whole batch at once (classify_batch)"""
+        if pattern_set.fingerprint not in self._keyword_probes:
+            lowered = sorted({keyword.lower() for keyword in pattern_set.keywords},
+                             key=len, reverse=True)
+            probe = re.compile('|'.join(map(re.escape, lowered))) if lowered else None
+            self._keyword_probes = {pattern_set.fingerprint: probe}
+        return self._keyword_probes[pattern_set.fingerprint]
+    
+    @property
+    def stream_overlap(self) -> int:
+        return self._stream_overlap(self.pattern_registry.current)
+    
+    def _stream_overlap(self, pattern_set: PatternSet) -> int:
+        """Overlap between stream chunks: long enough for the longest match
+        
+        That is the longest possible match of any pattern or keyword, capped
+        for unbounded patterns; remembered per pattern set.
+        """
+        overlap = self._overlaps.get(pattern_set.fingerprint)
+        if overlap is None:
+            overlap = max(max((len(keyword) for keyword in pattern_set.keywords), default=1),
+                          pattern_set.max_width(self.stream_max_match_length),
+                          self.entropy_detector.max_width if self.entropy_detector else 0)
+            self._overlaps = {pattern_set.fingerprint: overlap}
+        return overlap
+    
+    def ruleset_fingerprint(self, pattern_set: Optional[PatternSet] = None) -> str:
+        """Identifies everything that decides results, for caches of past results"""
+        pattern_set = pattern_set or self.pattern_registry.current
+        fingerprint = self._rulesets.get(pattern_set.fingerprint)
+        if fingerprint is None:
+            # The set's fingerprint covers its keywords too
+            rules = (pattern_set.fingerprint,
+                     self.entropy_detector.settings() if self.entropy_detector else None,
+                     self.report_locations and self.max_locations,
+                     self.ml_model_path and (self.ml_model_path, self.ml_threshold, self.ml_max_chars,
+                                             self.ml_mode, self.ml_escalate_below, self.ml_clear_below,
+                                             self.ml_window, self.ml_max_windows))
+            fingerprint = hashlib.sha256(repr(rules).encode('utf-8')).hexdigest()
+            self._rulesets = {pattern_set.fingerprint: fingerprint}
+        return fingerprint
+    
+    @property
+    def text_model(self):
+        """The configured LinearTextClassifier, or None if there is none or it cannot load"""
+        if not self.ml_model_path or self._ml_unavailable:
+            return None
+        try:
+            from ai_models.linear_classifier import load_shared
+            return load_shared(self.ml_model_path)
+        except (ImportError, OSError, ValueError, KeyError) as e:
+            self._ml_unavailable = True
+            self.logger.warning(f"Text model {self.ml_model_path} not used: {str(e)}")
+            return None
+    
+    def model_scores(self, texts: List[str]) -> Optional[List[float]]:
+        """Text model probabilities for the first ``ml_max_chars`` of each text, in one batch"""
+        model = self.text_model
+        if model is None:
+            return None
+        return model.predict_proba([text[:self.ml_max_chars] for text in texts])
+    
+    def _model_inputs(self, result: Dict[str, Any], state: _ScanState, head: str) -> List[str]:
+        """What the text model should score for a pattern-tier result (nothing if decided)"""
+        if not self.ml_model_path or 'error' in result:
+            return []
+        if self.ml_mode == "always":
+            return [head]
+        if not result['is_sensitive']:
+            # No hits is only in doubt when some patterns did not finish
+            return [head] if result.get('timed_out') else []
+        if result['confidence'] >= self.ml_escalate_below:
+            return []
+        # Keyword or entropy hits alone leave no windows; score the start instead
+        return state.model_windows or [head]
+    
+    def _escalate(self, items: List[tuple]) -> List[Dict[str, Any]]:
+        """Run the model tier on (result, state, head) items, scoring all inputs in one batch"""
+        inputs = [self._model_inputs(result, state, head) for result, state, head in items]
+        texts = [text for item_inputs in inputs for text in item_inputs]
+        if not texts:
+            return [result for result, _, _ in items]
+        
+        started = time.perf_counter()
+        try:
+            scores = self.model_scores(texts)
+        except Exception as e:
+            self.logger.error(f"Text model failed: {str(e)}")
+            scores = None
+        results, offset, flagged, cleared = [], 0, 0, 0
+        for (result, _, _), item_inputs in zip(items, inputs):
+            if item_inputs and scores is not None:
+                score = max(scores[offset:offset + len(item_inputs)])
+                verdict = self._apply_model_score(result, score)
+                flagged += verdict == "flagged"
+                cleared += verdict == "cleared"
+            offset += len(item_inputs)
+            results.append(result)
+        if scores is not None:
+            self.tier_stats.record("model", time.perf_counter() - started,
+                                   entered=sum(1 for item_inputs in inputs if item_inputs),
+                                   passed=flagged, cleared=cleared, units=len(texts))
+        return results
+    
+    def _apply_model_score(self, result: Dict[str, Any], score: float) -> Optional[str]:
+        """Record the model's score in a result and let it settle a doubtful verdict
+        
+        Returns "flagged" if the model flags the content (confirming a
+        doubtful hit or overruling a doubtful negative), "cleared" if it
+        overrules doubtful hits as false positives, else None. Hits with
+        confidence of ``ml_escalate_below`` or more are never cleared.
+        """
+        result['ml_score'] = round(score, 4)
+        if score >= self.ml_threshold:
+            result['is_sensitive'] = True
+            result['confidence'] = max(result['confidence'], score)
+            result['details'].append(f"Text model score {score:.2f}")
+            return "flagged"
+        if result['is_sensitive'] and result['confidence'] < self.ml_escalate_below and \
+                score < self.ml_clear_below:
+            result['is_sensitive'] = False
+            result['confidence'] = round(score, 4)
+            result['risk_level'] = 'low'
+            result['details'].append(f"Pattern hits cleared by text model score {score:.2f}")
+            return "cleared"
+        return None
+    
+    def _new_state(self, pattern_set: Optional[PatternSet]) -> _ScanState:
+        return _ScanState(pattern_set or self.pattern_registry.current,
+                          RegexBudget(self.regex_time_budget, self.regex_pattern_time_budget,
+                                      self.regex_time_per_mb))
     
-    def classify_content(self, content: str, file_path: str) -> Dict[str, Any]:
+    def classify_content(self, content: str, file_path: str,
+                         pattern_set: Optional[PatternSet] = None,
+                         locations: Optional[bool] = None,
+                         max_locations: Optional[int] = None) -> Dict[str, Any]:
         """
         Classify content for sensitive information
+        
+        Uses ``pattern_set`` if given, otherwise the registry's current set.
+        With ``locations`` (default: the ``report_locations`` setting) each
+        detected pattern also lists where its first ``max_locations``
+        (default: the setting of that name) matches are, as character and
+        UTF-8 byte offsets plus 1-based line and column numbers. They are
+        only worked out for patterns that matched, so content without
+        matches costs nothing extra.
+        
+        A configured text model then scores the content as the last tier
+        of the cascade; see ``_model_inputs`` for when and on what.
         """
         try:
-            results = {
-                'is_sensitive': False,
-                'confidence': 0.0,
-                'detected_patterns': [],
-                'risk_level': 'low',
-                'details': []
-            }
-            
-            content_lower = content.lower()
-            detected_count = 0
+            result, state = self._classify(content, pattern_set, locations, max_locations)
+            return self._escalate([(result, state, content[:self.ml_max_chars])])[0]
             
-            # Check for regex patterns
-            for pattern_name, pattern in self.sensitive_patterns.items():
-                matches = pattern.findall(content)
-                if matches:
-                    detected_count += len(matches)
-                    results['detected_patterns'].append({
-                        'type': pattern_name,
-                        'count': len(matches),
-                        'sample': matches[0] if matches else None
-                    })
-            
-            # Check for high-risk keywords
-            keyword_matches = []
-            for keyword in self.high_risk_keywords:
-                if keyword in content_lower:
-                    count = content_lower.count(keyword)
-                    detected_count += count
-                    keyword_matches.append({
-                        'keyword': keyword,
-                        'count': count
-                    })
-            
-            if keyword_matches:
-                results['detected_patterns'].extend(keyword_matches)
+        except Exception as e:
+            return self._error_result(e)
+    
+    def _classify(self, content: str, pattern_set: Optional[PatternSet],
+                  locations: Optional[bool], max_locations: Optional[int] = None) -> tuple:
+        """Pattern tier of classify_content: regexes, entropy and keywords"""
+        started = time.perf_counter()
+        state = self._new_state(pattern_set)
+        state.budget.extend(len(content))
+        self._scan_window(content, 0, len(content), state)
+        if self.report_locations if locations is None else locations:
+            self._collect_spans(content, state,
+                                self.max_locations if max_locations is None else max_locations)
+        result = self._build_result(state)
+        self.tier_stats.record("patterns", time.perf_counter() - started,
+                               passed=int(result['is_sensitive']))
+        return result, state
+    
+    def classify_batch(self, texts: List[str], file_path: str = "batch",
+                       pattern_set: Optional[PatternSet] = None,
+                       locations: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Classify many small texts (log lines, form fields, messages) at once
+        
+        Returns exactly what ``classify_content`` would for each text, in
+        order. The texts are joined so that the regex patterns, keywords and
+        entropy detector each make one pass over the whole batch to find
+        which texts can match anything; only those are classified one by
+        one, and the rest get the empty result without a call of their own.
+        Patterns that look beyond their matches (anchors, lookarounds) are
+        searched text by text. All texts share one pattern set, and the
+        text model, if configured, scores all its inputs in one batch.
+        """
+        pattern_set = pattern_set or self.pattern_registry.current
+        try:
+            candidates = self._batch_candidates(texts, pattern_set)
+        except Exception as e:
+            # e.g. the batch ran out of regex time: classify every text alone
+            self.logger.warning(f"Batch pass failed, classifying texts separately: {str(e)}")
+            candidates = set(range(len(texts)))
+        
+        clean_state = _ScanState(pattern_set)
+        clean = self._build_result(clean_state)
+        items = []
+        for index, text in enumerate(texts):
+            if index in candidates:
+                try:
+                    result, state = self._classify(text, pattern_set, locations)
+                except Exception as e:
+                    result, state = self._error_result(e), clean_state
+            else:
+                result, state = dict(clean, detected_patterns=[], details=[]), clean_state
+            items.append((result, state, text[:self.ml_max_chars]))
+        # Texts without candidates skip the pattern tier, but still count as entering it
+        self.tier_stats.record("patterns", 0.0, entered=len(texts) - len(candidates))
+        return self._escalate(items)
+    
+    def _batch_candidates(self, texts: List[str], pattern_set: PatternSet) -> set:
+        """Indexes of the texts in which some pattern, keyword or token may be found"""
+        candidates = set()
+        if not texts:
+            return candidates
+        starts = _batch_starts(texts)
+        joined = BATCH_SEPARATOR.join(texts)
+        
+        budget = self._new_state(pattern_set).budget
+        budget.extend(len(joined))
+        matcher = pattern_set.matcher
+        _mark_texts(candidates, starts, matcher.candidate_spans(joined, budget))
+        for pattern_name, pattern in pattern_set.patterns.items():
+            if pattern_name not in matcher.context_free:
+                candidates.update(index for index, text in enumerate(texts) if pattern.search(text))
+        
+        if self.entropy_detector is not None:
+            for spans in self.entropy_detector.spans(joined, len(joined)).values():
+                _mark_texts(candidates, starts, spans)
+        
+        automaton = pattern_set.keyword_automaton
+        probe = self._keyword_probe(pattern_set)
+        if automaton.uses_automaton:
+            # Counted character by character anyway; nothing to share
+            candidates.update(index for index, text in enumerate(texts)
+                              if any(automaton.count(text).values()))
+        elif probe is not None:
+            # Same lowercasing as the direct keyword count
+            lowered = [text.lower() for text in texts]
+            _mark_texts(candidates, _batch_starts(lowered),
+                        (match.span() for match in probe.finditer(BATCH_SEPARATOR.join(lowered))))
+        return candidates
+    
+    def classify_stream(self, chunks: Iterable[str], file_path: str,
+                        pattern_set: Optional[PatternSet] = None) -> Dict[str, Any]:
+        """
+        Classify content arriving as a sequence of text chunks
+
+        Each chunk is scanned together with the tail of the previous one.
+        Matches starting in the last ``stream_overlap`` characters of a
+        window are deferred to the next window, so a match straddling a
+        chunk boundary is seen whole and counted exactly once. Memory stays
+        bounded by the chunk size plus twice the overlap.
+        """
+        try:
+            state = self._new_state(pattern_set)
+            overlap = self._stream_overlap(state.pattern_set)
+            window = ''
+            base = 0
+            # Start of the content, for the text model
+            head = ''
+            started = time.perf_counter()
             
-            # Calculate risk level
-            if detected_count > 0:
-                results['is_sensitive'] = True
-                results['confidence'] = min(1.0, detected_count * 0.2)
-                
-                if detected_count >= 5:
-                    results['risk_level'] = 'high'
-                elif detected_count >= 2:
-                    results['risk_level'] = 'medium'
-                else:
-                    results['risk_level'] = 'low'
+            for chunk in chunks:
+                state.budget.extend(len(chunk))
+                if self.ml_model_path and len(head) < self.ml_max_chars:
+                    head += chunk[:self.ml_max_chars - len(head)]
+                window += chunk
+                cut = len(window) - overlap
+                if cut <= 0:
+                    continue
+                self._scan_window(window, base, cut, state)
+                # Keep the deferred tail plus enough context before it
+                keep = max(0, cut - overlap)
+                window = window[keep:]
+                base += keep
             
-            return results
+            self._scan_window(window, base, len(window), state)
+            result = self._build_result(state)
+            self.tier_stats.record("patterns", time.perf_counter() - started,
+                                   passed=int(result['is_sensitive']))
+            return self._escalate([(result, state, head)])[0]
             
         except Exception as e:
-            self.logger.error(f"Error in content classification: {str(e)}")
-            return {
-                'is_sensitive': False,
-                'confidence': 0.0,
-                'detected_patterns': [],
-                'risk_level': 'low',
-                'details': [f'Classification error: {str(e)}']
-            }
+            return self._error_result(e)
+    
+    def _scan_window(self, window: str, base: int, cut: int, state: _ScanState) -> None:
+        """Record matches starting before ``cut`` in a window beginning at offset ``base``"""
+        resume = state.resume
+        
+        # Check for regex patterns
+        pattern_set = state.pattern_set
+        starts = {name: max(0, resume.get(name, 0) - base) for name in pattern_set.patterns}
+        matches = pattern_set.matcher.scan(window, starts, cut, state.budget)
+        for pattern_name, (count, first, last_end) in matches.items():
+            if count:
+                if self._captures_windows and len(state.model_windows) < self.ml_max_windows:
+                    context = self.ml_window
+                    state.model_windows.append(window[max(0, first.start() - context):first.end() + context])
+                if pattern_name not in state.pattern_samples:
+                    state.pattern_samples[pattern_name] = self._findall_item(first)
+                state.pattern_counts[pattern_name] = state.pattern_counts.get(pattern_name, 0) + count
+            resume[pattern_name] = base + max(cut, last_end)
+        
+        # Check for high-entropy tokens
+        if self.entropy_detector is not None:
+            start = max(0, resume.get(('entropy',), 0) - base)
+            findings = self.entropy_detector.scan(window, start, cut)
+            for name, (count, first, _) in findings.items():
+                if count:
+                    state.pattern_samples.setdefault(name, first)
+                    state.pattern_counts[name] = state.pattern_counts.get(name, 0) + count
+            resume[('entropy',)] = base + max([cut] + [end for _, _, end in findings.values()])
+        
+        # Check for high-risk keywords
+        starts = {keyword: max(0, resume.get(('keyword', keyword), 0) - base)
+                  for keyword in pattern_set.keywords}
+        keyword_matches = pattern_set.keyword_automaton.scan(window, starts, cut,
+                                                             final=cut == len(window))
+        for keyword, (count, last_end) in keyword_matches.items():
+            if count:
+                state.keyword_counts[keyword] = state.keyword_counts.get(keyword, 0) + count
+            resume[('keyword', keyword)] = base + max(cut, last_end)
+    
+    @staticmethod
+    def _findall_item(match):
+        """The value ``Pattern.findall`` would report for this match"""
+        groups = match.re.groups
+        if groups == 0:
+            return match.group(0)
+        if groups == 1:
+            return match.group(1) or ''
+        return tuple(group or '' for group in match.groups())
+    
+    def _collect_spans(self, content: str, state: _ScanState, limit: int) -> None:
+        """Find the first ``limit`` matches of every pattern the scan counted, for their locations"""
+        matcher = state.pattern_set.matcher
+        for pattern_name in state.pattern_set.patterns:
+            if state.pattern_counts.get(pattern_name):
+                state.spans[pattern_name] = matcher.spans(
+                    pattern_name, content, limit, state.budget
+                )
+        if self.entropy_detector is not None and \
+                any(state.pattern_counts.get(name) for name in self.entropy_detector.names):
+            state.spans.update(self.entropy_detector.spans(content, limit))
+        if state.spans:
+            state.line_index = LineIndex(content)
+    
+    def _locations(self, state: _ScanState, pattern_name: str) -> List[Dict[str, int]]:
+        locations = []
+        for start, end in state.spans.get(pattern_name, ()):
+            location = state.line_index.locate(start)
+            location['end'] = end
+            locations.append(location)
+        return locations
+    
+    def _build_result(self, state: _ScanState) -> Dict[str, Any]:
+        """Turn accumulated matches into the classification result"""
+        results = {
+            'is_sensitive': False,
+            'confidence': 0.0,
+            'detected_patterns': [],
+            'risk_level': 'low',
+            'details': []
+        }
+        
+        detected_count = 0
+        
+        pattern_names = list(state.pattern_set.patterns)
+        if self.entropy_detector is not None:
+            pattern_names += self.entropy_detector.names
+        for pattern_name in pattern_names:
+            count = state.pattern_counts.get(pattern_name)
+            if count:
+                detected_count += count
+                finding = {
+                    'type': pattern_name,
+                    'count': count,
+                    'sample': state.pattern_samples.get(pattern_name)
+                }
+                if state.line_index is not None:
+                    finding['locations'] = self._locations(state, pattern_name)
+                results['detected_patterns'].append(finding)
+        
+        for keyword in state.pattern_set.keywords:
+            count = state.keyword_counts.get(keyword)
+            if count:
+                detected_count += count
+                results['detected_patterns'].append({
+                    'keyword': keyword,
+                    'count': count
+                })
+        
+        # Calculate risk level
+        if detected_count > 0:
+            results['is_sensitive'] = True
+            results['confidence'] = min(1.0, detected_count * 0.2)
+            
+            if detected_count >= 5:
+                results['risk_level'] = 'high'
+            elif detected_count >= 2:
+                results['risk_level'] = 'medium'
+            else:
+                results['risk_level'] = 'low'
+        
+        # Patterns cut short by the time budget; their counts are partial
+        if state.budget is not None and state.budget.timed_out:
+            results['timed_out'] = list(state.budget.timed_out)
+        
+        return results
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        self.logger.error(f"Error in content classification: {str(error)}")
+        return {
+            'is_sensitive': False,
+            'confidence': 0.0,
+            'detected_patterns': [],
+            'risk_level': 'low',
+            'details': [f'Classification error: {str(error)}'],
+            'error': str(error)
+        }
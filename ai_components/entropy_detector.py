@@ -0,0 +1,231 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without it entropy is computed token by token
+    np = None
+
+# Characters a candidate token may consist of (base64, URL-safe base64, hex);
+# '=' only as trailing padding, so key=value pairs split into two tokens.
+# Runs right after a '.' continue a host name or attribute path and are skipped
+TOKEN_CHARS = 'A-Za-z0-9+/_-'
+CHARSETS = ('hex', 'alnum', 'base64')
+
+# Bits per character a token must reach to be reported, per charset; random
+# hex tops out at 4 bits, alphanumeric at ~5.95 and base64 at 6. Hex is off
+# by default (None): nearly all long hex strings are commit ids and checksums
+DEFAULT_THRESHOLDS = {'hex': None, 'alnum': 4.2, 'base64': 4.5}
+DEFAULT_MIN_LENGTH = 20
+# Longer runs are blobs (embedded files, dumps) rather than credentials
+DEFAULT_MAX_LENGTH = 128
+
+# A token of length L has at most log2(L) bits per character, so short
+# random tokens cannot reach the charset thresholds; for them the threshold
+# is capped at this far below that maximum
+SHORT_TOKEN_MARGIN = 0.4
+
+# Digests look random by design but are not secrets: tokens written as
+# "sha512-<digest>" (package-lock integrity) or right after a digest key
+# ("sha256:", "commit ", "checksum = ") are never reported
+DIGEST_PREFIX = re.compile(r'(?:sha(?:1|224|256|384|512)|md5)-', re.IGNORECASE)
+DIGEST_CONTEXT = re.compile(
+    r'(?:sha-?(?:1|224|256|384|512)(?:sum)?|md5(?:sum)?|blake2[bs]?|digest|checksum|hash|'
+    r'commit|revision|integrity|etag)["\']?\s*[:=]?\s*["\']?$',
+    re.IGNORECASE
+)
+# Characters before a token searched for a digest key
+DIGEST_CONTEXT_WIDTH = 24
+
+# Slack for float rounding, so both code paths agree on borderline tokens
+EPSILON = 1e-9
+
+# Tokens handled per NumPy batch; bounds the (tokens x symbols) histogram
+BATCH_TOKENS = 4096
+
+# Character classes: every character of a token shares the charset bits,
+# at least one has each of the kinds a charset requires
+_HEX, _ALNUM = 1, 2
+_DIGIT, _UPPER, _LOWER = 1, 2, 4
+_SYMBOLS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=_-'
+_HEX_DIGITS = '0123456789abcdefABCDEF'
+
+if np is not None:
+    _CHARSET_TABLE = np.zeros(256, dtype=np.uint8)
+    _KIND_TABLE = np.zeros(256, dtype=np.uint8)
+    _SYMBOL_TABLE = np.zeros(256, dtype=np.intp)
+    for _index, _ch in enumerate(_SYMBOLS):
+        _CHARSET_TABLE[ord(_ch)] = (_HEX if _ch in _HEX_DIGITS else 0) | (_ALNUM if _ch.isalnum() else 0)
+        _KIND_TABLE[ord(_ch)] = ((_DIGIT if _ch.isdigit() else 0) | (_UPPER if _ch.isupper() else 0) |
+                                 (_LOWER if _ch.islower() else 0))
+        _SYMBOL_TABLE[ord(_ch)] = _index
+
+
+def _charset(token: str) -> Optional[str]:
+    """Narrowest charset of a token, or None if it does not look generated
+
+    Generated hex mixes digits and letters; generated alphanumeric and
+    base64 strings mix digits with both letter cases. Words, identifiers,
+    paths and plain numbers mostly do not.
+    """
+    has_digit = any(ch.isdigit() for ch in token)
+    if all(ch in _HEX_DIGITS for ch in token):
+        return 'hex' if has_digit and not token.isdigit() else None
+    if not (has_digit and any(ch.isupper() for ch in token) and any(ch.islower() for ch in token)):
+        return None
+    return 'alnum' if token.isalnum() else 'base64'
+
+
+def _is_digest(text: str, token: str, start: int) -> bool:
+    """Whether a token at ``start`` in ``text`` is written as a digest"""
+    return bool(DIGEST_PREFIX.match(token) or
+                DIGEST_CONTEXT.search(text, max(0, start - DIGEST_CONTEXT_WIDTH), start))
+
+
+def shannon_entropy(token: str) -> float:
+    """Bits per character of a single string"""
+    length = len(token)
+    if not length:
+        return 0.0
+    return -sum(count / length * math.log2(count / length) for count in Counter(token).values())
+
+
+class EntropyDetector:
+    """
+    Finds high-entropy strings that look like generated secrets.
+
+    Candidate tokens are whole runs of base64/hex characters between
+    ``min_length`` and ``max_length`` long (plus padding) that mix digits
+    and letters. Each is assigned the narrowest of the hex, alnum and
+    base64 charsets and reported when its Shannon
+    entropy reaches that charset's threshold (lowered for short tokens,
+    see ``SHORT_TOKEN_MARGIN``), unless it is written as a digest (see
+    ``DIGEST_CONTEXT``). With NumPy, charsets and entropies are
+    computed for whole batches of tokens at once from one byte histogram
+    per batch instead of a Python loop per token.
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None,
+                 min_length: int = DEFAULT_MIN_LENGTH, max_length: int = DEFAULT_MAX_LENGTH,
+                 use_numpy: bool = True):
+        self.thresholds = dict(DEFAULT_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+        unknown = set(self.thresholds) - set(CHARSETS)
+        if unknown:
+            raise ValueError(f"unknown entropy charsets: {', '.join(sorted(unknown))}")
+        self.min_length = max(2, int(min_length))
+        self.max_length = max(self.min_length, int(max_length))
+        self.use_numpy = use_numpy and np is not None
+        self.tokenizer = re.compile(
+            f"(?<![.{TOKEN_CHARS}])[{TOKEN_CHARS}]{{{self.min_length},{self.max_length}}}={{0,2}}(?![{TOKEN_CHARS}])"
+        )
+        # Threshold per charset and token length, short-token cap applied;
+        # a charset whose threshold is None is never reported
+        self._limits = {
+            charset: [math.inf if threshold is None else
+                      min(threshold, math.log2(max(length, 1)) - SHORT_TOKEN_MARGIN)
+                      for length in range(self.max_length + 3)]
+            for charset, threshold in self.thresholds.items()
+        }
+        if self.use_numpy:
+            self._limit_table = np.array([self._limits[charset] for charset in CHARSETS])
+            counts = np.arange(self.max_length + 3, dtype=np.float64)
+            self._xlogx = counts * np.log2(np.maximum(counts, 1))
+
+    @property
+    def names(self) -> List[str]:
+        """Result type reported for each charset"""
+        return [f"high_entropy_{charset}" for charset in CHARSETS]
+
+    @property
+    def max_width(self) -> int:
+        """Longest stretch of text a finding depends on
+
+        The token, its padding, a boundary character each side and the
+        text searched for a digest key before it.
+        """
+        return self.max_length + 4 + DIGEST_CONTEXT_WIDTH
+
+    def settings(self) -> Tuple:
+        """Everything that affects findings, e.g. for cache keys"""
+        return (tuple(sorted(self.thresholds.items())), self.min_length, self.max_length)
+
+    def scan(self, text: str, start: int, cut: int) -> Dict[str, Tuple[int, Any, int]]:
+        """High-entropy tokens starting in [start, cut), per result type
+
+        Returns ``{name: (count, first token or None, end of last token)}``
+        in the shape of :meth:`PatternMatcher.scan`, every end defaulting to
+        ``start``. Tokens never overlap, so one resume position serves all.
+        """
+        results = {name: (0, None, start) for name in self.names}
+        for name, token, _, end in self._findings(text, start, cut):
+            count, first, _ = results[name]
+            results[name] = (count + 1, first or token, end)
+        return results
+
+    def spans(self, text: str, limit: int) -> Dict[str, List[Tuple[int, int]]]:
+        """(start, end) of the first ``limit`` tokens found in ``text``, per result type"""
+        spans = {name: [] for name in self.names}
+        for name, _, begin, end in self._findings(text, 0, len(text)):
+            if len(spans[name]) < limit:
+                spans[name].append((begin, end))
+        return spans
+
+    def _findings(self, text: str, start: int, cut: int) -> List[Tuple[str, str, int, int]]:
+        """(result type, token, start, end) of every token reported in [start, cut)"""
+        tokens, bounds = [], []
+        for match in self.tokenizer.finditer(text, start):
+            if match.start() >= cut:
+                break
+            tokens.append(match.group())
+            bounds.append(match.span())
+        if not tokens:
+            return []
+        charsets = self._classify_batches(tokens) if self.use_numpy else self._classify_each(tokens)
+        return [(f"high_entropy_{charset}", token, begin, end)
+                for token, (begin, end), charset in zip(tokens, bounds, charsets)
+                if charset is not None and not _is_digest(text, token, begin)]
+
+    def _classify_each(self, tokens: List[str]) -> List[Optional[str]]:
+        """Charset of each token reaching its threshold, else None (no NumPy)"""
+        found = []
+        for token in tokens:
+            charset = _charset(token)
+            if charset is not None and \
+                    shannon_entropy(token) + EPSILON < self._limits[charset][len(token)]:
+                charset = None
+            found.append(charset)
+        return found
+
+    def _classify_batches(self, tokens: List[str]) -> List[Optional[str]]:
+        found = []
+        for offset in range(0, len(tokens), BATCH_TOKENS):
+            found.extend(self._classify_batch(tokens[offset:offset + BATCH_TOKENS]))
+        return found
+
+    def _classify_batch(self, tokens: List[str]) -> List[Optional[str]]:
+        count = len(tokens)
+        lengths = np.fromiter(map(len, tokens), dtype=np.intp, count=count)
+        starts = np.zeros(count, dtype=np.intp)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        # Token characters are ASCII by construction of the tokenizer
+        codes = np.frombuffer(''.join(tokens).encode('ascii'), dtype=np.uint8)
+
+        # Charset flags every character of a token shares, kinds any one has
+        shared = np.bitwise_and.reduceat(_CHARSET_TABLE[codes], starts)
+        kinds = np.bitwise_or.reduceat(_KIND_TABLE[codes], starts)
+        charset = np.where(shared & _HEX, 0, np.where(shared & _ALNUM, 1, 2))
+        generated = np.where(charset == 0, (kinds & _DIGIT != 0) & (kinds != _DIGIT),
+                             kinds == _DIGIT | _UPPER | _LOWER)
+
+        # One histogram row per token: H = log2(L) - sum(c * log2 c) / L
+        symbols = len(_SYMBOLS)
+        owners = np.repeat(np.arange(count, dtype=np.intp), lengths)
+        histogram = np.bincount(owners * symbols + _SYMBOL_TABLE[codes],
+                                minlength=count * symbols).reshape(count, symbols)
+        entropy = np.log2(lengths) - self._xlogx[histogram].sum(axis=1) / lengths
+
+        hits = (entropy + EPSILON >= self._limit_table[charset, lengths]) & generated
+        return [CHARSETS[index] if hit else None for index, hit in zip(charset.tolist(), hits.tolist())]
@@ -0,0 +1,134 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+# Up to this many keywords, one C-level str.count per keyword over a
+# lowercased copy beats walking the automaton character by character in
+# Python (benchmarks/bench_keyword_automaton.py puts the crossover at
+# around 230 keywords); larger sets use the automaton
+DIRECT_COUNT_MAX_KEYWORDS = 200
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordAutomaton:
+    """
+    Case-insensitive multi-keyword counter built on an Aho-Corasick automaton.
+
+    The trie is built once from the keyword list with both the lower- and
+    upper-case form of every character as transitions, so the content never
+    has to be lowercased and scanning costs one step per character however
+    many keywords are loaded. Counts follow ``str.count`` semantics per
+    keyword (non-overlapping, leftmost first). With ``whole_words`` only
+    occurrences not embedded in a longer word are counted.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords = list(dict.fromkeys(keywords))
+        self.whole_words = whole_words
+        self._lowered = [keyword.lower() for keyword in self.keywords]
+        self.max_length = max((len(keyword) for keyword in self._lowered), default=0)
+
+        self.uses_automaton = whole_words or len(self.keywords) > DIRECT_COUNT_MAX_KEYWORDS
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        if self.uses_automaton:
+            self._build()
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def _build(self) -> None:
+        goto, output = self._goto, self._output
+        for index, keyword in enumerate(self._lowered):
+            if not keyword:
+                continue
+            state = 0
+            for ch in keyword:
+                child = goto[state].get(ch)
+                if child is None:
+                    child = len(goto)
+                    goto.append({})
+                    output.append(())
+                    for variant in {ch, ch.upper()}:
+                        if len(variant) == 1:
+                            goto[state][variant] = child
+                state = child
+            output[state] += (index,)
+
+        # Breadth-first failure links; a state's output includes the
+        # keywords that end at its longest proper suffix state
+        fail = self._fail = [0] * len(goto)
+        queue = deque(set(goto[0].values()))
+        visited = set(queue)
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                # Both case variants lead to the same child; link it once
+                if child in visited:
+                    continue
+                visited.add(child)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(ch, 0)
+                output[child] += output[fail[child]]
+                queue.append(child)
+
+    def scan(self, text: str, starts: Dict[str, int], cut: int,
+             final: bool = True) -> Dict[str, Tuple[int, int]]:
+        """Count each keyword's occurrences starting at or after its start position
+
+        Unless ``final``, only occurrences starting before ``cut`` are
+        counted. Returns ``{keyword: (count, end of last counted occurrence)}``,
+        the end defaulting to the start position when nothing was counted.
+        """
+        next_pos = [starts.get(keyword, 0) for keyword in self.keywords]
+        counts = [0] * len(self.keywords)
+        end = len(text) if final else min(len(text), cut + self.max_length - 1)
+
+        if not self.uses_automaton:
+            lowered = text.lower()
+            for index, keyword in enumerate(self._lowered):
+                if not keyword:
+                    continue
+                limit = len(lowered) if final else min(end, cut + len(keyword) - 1)
+                count = lowered.count(keyword, next_pos[index], limit)
+                if count:
+                    counts[index] = count
+                    next_pos[index] = lowered.rfind(keyword, next_pos[index], limit) + len(keyword)
+        elif next_pos:
+            self._run(text, min(next_pos), end, cut, final, counts, next_pos)
+
+        return {keyword: (counts[index], next_pos[index])
+                for index, keyword in enumerate(self.keywords)}
+
+    def _run(self, text: str, pos: int, end: int, cut: int, final: bool,
+             counts: List[int], next_pos: List[int]) -> None:
+        goto, fail, output = self._goto, self._fail, self._output
+        lengths = [len(keyword) for keyword in self._lowered]
+        whole_words = self.whole_words
+        state = 0
+        for offset, ch in enumerate(text[pos:end], pos):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            for index in output[state]:
+                start = offset + 1 - lengths[index]
+                if start < next_pos[index] or (not final and start >= cut):
+                    continue
+                if whole_words and (
+                        (start > 0 and _is_word_char(text[start - 1])) or
+                        (offset + 1 < len(text) and _is_word_char(text[offset + 1]))):
+                    continue
+                counts[index] += 1
+                next_pos[index] = offset + 1
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Occurrences of every keyword in the whole text"""
+        return {keyword: count for keyword, (count, _) in self.scan(text, {}, len(text)).items()}
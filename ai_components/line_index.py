@@ -0,0 +1,70 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+
+class LineIndex:
+    """
+    Maps character offsets in a text to line/column numbers and UTF-8 byte offsets.
+
+    The newline offsets are only collected on the first lookup, so building
+    an index for a text that never needs one costs nothing. Lines are
+    separated by '\\n'; lines and columns are 1-based, columns count
+    characters. Byte offsets are those of the text encoded as UTF-8.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._starts: Optional[List[int]] = None
+        self._byte_starts: Optional[List[int]] = None
+
+    def _build(self) -> None:
+        text = self.text
+        starts = [0]
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self._starts = starts
+
+        if text.isascii():
+            self._byte_starts = starts
+            return
+        # '\n' is a single byte in UTF-8, so only the lines themselves need encoding
+        byte_starts, total = [0], 0
+        for begin, end in zip(starts, starts[1:]):
+            total += len(text[begin:end].encode('utf-8', 'surrogatepass'))
+            byte_starts.append(total)
+        self._byte_starts = byte_starts
+
+    @property
+    def line_count(self) -> int:
+        if self._starts is None:
+            self._build()
+        return len(self._starts)
+
+    def locate(self, offset: int) -> Dict[str, int]:
+        """Line, column and byte offset of the character at ``offset``"""
+        if self._starts is None:
+            self._build()
+        index = bisect_right(self._starts, offset) - 1
+        line_start = self._starts[index]
+        byte_offset = self._byte_starts[index]
+        if self._byte_starts is self._starts:
+            byte_offset += offset - line_start
+        else:
+            byte_offset += len(self.text[line_start:offset].encode('utf-8', 'surrogatepass'))
+        return {
+            'offset': offset,
+            'byte_offset': byte_offset,
+            'line': index + 1,
+            'column': offset - line_start + 1
+        }
+
+    def line(self, number: int) -> str:
+        """Text of a 1-based line, without its newline"""
+        if self._starts is None:
+            self._build()
+        begin = self._starts[number - 1]
+        end = self._starts[number] - 1 if number < len(self._starts) else len(self.text)
+        return self.text[begin:end]
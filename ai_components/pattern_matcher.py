@@ -0,0 +1,501 @@
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from ._sre import REPEATS, parse, sre_constants, walk
+from .pattern_prefilter import LiteralPrefilter, TextProfile
+from .regex_safety import RegexBudget, find_redos_risk
+
+try:
+    import regex
+except ImportError:  # Optional: without it time budgets are only checked between passes
+    regex = None
+
+# Inline flags the combined pattern can carry per alternative as a scoped group
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'),
+                 (re.VERBOSE, 'x'), (re.ASCII, 'a'))
+_LEADING_GLOBAL_FLAGS = re.compile(r'^(?:\(\?[aiLmsux]+\))+')
+# Flags carried over when recompiling for the regex engine (its values differ)
+_ENGINE_FLAGS = ('IGNORECASE', 'MULTILINE', 'DOTALL', 'VERBOSE', 'ASCII')
+
+_CATEGORY_CLASSES = {
+    sre_constants.CATEGORY_DIGIT: r'\d',
+    sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+    sre_constants.CATEGORY_SPACE: r'\s',
+    sre_constants.CATEGORY_NOT_SPACE: r'\S',
+    sre_constants.CATEGORY_WORD: r'\w',
+    sre_constants.CATEGORY_NOT_WORD: r'\W',
+}
+# Once spans are closer together than this on average (after a short warm
+# up), per-span re-matching costs more than separate passes, so the rest of
+# the text is scanned pattern by pattern instead
+DENSE_SPAN_GAP = 256
+DENSE_SPAN_WARMUP = 64
+
+# Upper bound on alternations kept for different prefilter outcomes
+COMBINED_CACHE_SIZE = 256
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _compile_timed(source: str, flags: int = 0) -> Optional[Any]:
+    """``source`` compiled with the regex engine, whose calls accept a timeout
+
+    Returns None when the engine is not installed or rejects the pattern,
+    in which case the caller keeps the stdlib compilation.
+    """
+    if regex is None:
+        return None
+    engine_flags = 0
+    for name in _ENGINE_FLAGS:
+        if flags & getattr(re, name):
+            engine_flags |= getattr(regex, name)
+    try:
+        return regex.compile(source, engine_flags)
+    except (regex.error, TypeError, ValueError):
+        return None
+
+
+def _is_timed(compiled) -> bool:
+    return regex is not None and isinstance(compiled, regex.Pattern)
+
+
+def _timeout_args(compiled, seconds: Optional[float]) -> Dict[str, float]:
+    return {'timeout': seconds} if seconds is not None and _is_timed(compiled) else {}
+
+
+def _class_item(op, av) -> str:
+    """Regex source for one member of a character set"""
+    if op is sre_constants.LITERAL:
+        return re.escape(chr(av))
+    if op is sre_constants.RANGE:
+        return f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}"
+    if op is sre_constants.CATEGORY and av in _CATEGORY_CLASSES:
+        return _CATEGORY_CLASSES[av]
+    raise _Unsupported(op)
+
+
+def _first_items(items) -> Tuple[List[str], bool]:
+    """Character-class members a non-empty match of ``items`` can start with
+
+    Returns (members, nullable), where nullable means the sequence can match
+    the empty string and the caller must also consider what follows it.
+    """
+    members = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            return members + [_class_item(op, av)], False
+        if op is sre_constants.IN:
+            if av and av[0][0] is sre_constants.NEGATE:
+                if members:
+                    raise _Unsupported(op)
+                return ['^' + ''.join(_class_item(*item) for item in av[1:])], False
+            return members + [_class_item(*item) for item in av], False
+        if op in REPEATS:
+            low, _, sub = av
+            sub_members, sub_nullable = _first_items(sub)
+            members += sub_members
+            if low > 0 and not sub_nullable:
+                return members, False
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if add_flags or del_flags:
+                raise _Unsupported(op)
+            sub_members, sub_nullable = _first_items(sub)
+            members += sub_members
+            if not sub_nullable:
+                return members, False
+        elif op is sre_constants.BRANCH:
+            nullable = False
+            for alternative in av[1]:
+                sub_members, sub_nullable = _first_items(alternative)
+                members += sub_members
+                nullable = nullable or sub_nullable
+            if not nullable:
+                return members, False
+        else:
+            raise _Unsupported(op)
+        if any(member.startswith('^') for member in members):
+            raise _Unsupported(op)
+    return members, True
+
+
+def _is_context_free(pattern: Pattern) -> bool:
+    """Whether the pattern matches a piece of text the same wherever it is embedded
+
+    True when nothing but ``\\b``/``\\B`` looks outside the match, so the
+    piece matches alike as a whole text or between non-word characters.
+    """
+    try:
+        parsed = parse(pattern)
+    except Exception:
+        return False
+    for op, av in walk(parsed):
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return False
+        if op is sre_constants.AT and av not in (sre_constants.AT_BOUNDARY,
+                                                 sre_constants.AT_NON_BOUNDARY):
+            return False
+    return True
+
+
+class _Entry:
+    """A pattern's source, split for the combined alternation, and its start probe"""
+
+    __slots__ = ('name', 'pattern', 'runner', 'body', 'boundary', 'probe', 'reach')
+
+    def __init__(self, name: str, pattern: Pattern, runner: Any):
+        self.name = name
+        self.pattern = pattern
+        self.runner = runner
+
+        parsed = parse(pattern)
+        if pattern.groupindex or any(op in (sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS)
+                                     for op, _ in walk(parsed)):
+            raise _Unsupported('named groups or backreferences')
+
+        items = list(parsed)
+        self.boundary = bool(items) and items[0] == (sre_constants.AT, sre_constants.AT_BOUNDARY)
+        members, nullable = _first_items(items[1:] if self.boundary else items)
+        if nullable or not members:
+            raise _Unsupported('pattern can match the empty string')
+
+        source = _LEADING_GLOBAL_FLAGS.sub('', pattern.pattern)
+        if self.boundary:
+            # A top-level alternation would parse as a single BRANCH, so a
+            # leading boundary item is a plain prefix of the source
+            if not source.startswith(r'\b'):
+                raise _Unsupported('leading boundary is not a plain prefix')
+            source = source[2:]
+        if pattern.flags & re.VERBOSE:
+            # Keep a trailing comment from swallowing the closing parenthesis
+            source += '\n'
+        scoped = ''.join(letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag)
+        self.body = f"(?{scoped}:{source})" if scoped else f"(?:{source})"
+
+        # Needs only the boundary (if any) and the first character, so it is
+        # exact even when the search is cut off at the end of a span
+        self.probe = re.compile((r'\b' if self.boundary else '') + f"[{''.join(members)}]",
+                                pattern.flags)
+
+        # A match of a bounded pattern without lookarounds never reads more
+        # than its maximum width (plus one character for a trailing boundary)
+        # past its start, so a search cut off that far past a span is exact
+        width = parsed.getwidth()[1]
+        lookaround = any(op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+                         for op, _ in walk(parsed))
+        self.reach = width + 1 if width < sre_constants.MAXREPEAT and not lookaround else None
+
+    def first_match(self, text: str, pos: int, limit: int,
+                    timeout: Optional[float] = None) -> Optional[Any]:
+        """Leftmost full-context match of this pattern starting in [pos, limit)
+
+        ``timeout`` bounds each regex call made on the pattern's behalf
+        (regex engine only); running out raises ``TimeoutError``.
+        """
+        limits = _timeout_args(self.runner, timeout)
+        if self.reach is not None:
+            match = self.runner.search(text, pos, limit + self.reach, **limits)
+            return match if match and match.start() < limit else None
+        for candidate in self.probe.finditer(text, pos, limit):
+            match = self.runner.match(text, candidate.start(), **limits)
+            if match:
+                return match
+        return None
+
+
+class PatternMatcher:
+    """
+    Finds matches of many named regexes in one pass over the text.
+
+    All patterns are joined into a single alternation that is only used to
+    locate spans where *some* pattern matches. Every position at which any
+    pattern matches lies inside one of those spans, so each pattern is then
+    re-matched (in full context, with ``pattern.match``) only at the few
+    positions inside the spans where its start probe fires. Counts, first
+    samples and non-overlap rules are therefore exactly those of running
+    ``finditer`` per pattern. Patterns that cannot be combined (named groups,
+    backreferences, nullable or unprobeable starts) are scanned on their own,
+    as is the rest of any text where matches turn out to be very dense.
+
+    Before scanning, each pattern's :class:`LiteralPrefilter` is checked
+    against the text, and patterns that cannot match are left out of the
+    alternation altogether. ``prefilter_stats`` counts, per pattern, how
+    many texts were checked and how many were skipped.
+
+    A :class:`RegexBudget` passed to :meth:`scan` is checked between
+    passes, and can also interrupt a call that runs too long when the
+    pattern runs on the ``regex`` package's engine. That engine is slower
+    than the stdlib one and differs from it in corners (e.g. what ``\s``
+    matches), so with ``engine`` 'auto' it only runs the patterns
+    :func:`find_redos_risk` flags (loaded with ``allow_unsafe``), each on
+    its own; 'regex' runs everything on it and 're' nothing.
+    """
+
+    def __init__(self, patterns: Dict[str, Pattern], engine: str = 'auto'):
+        self.patterns = dict(patterns)
+        self.timed = engine == 'regex' and regex is not None
+        self.risky = [name for name, pattern in self.patterns.items()
+                      if engine == 'auto' and find_redos_risk(pattern)]
+        self._entries = []
+        self.standalone = []
+        self.prefilters = {name: LiteralPrefilter(pattern) for name, pattern in self.patterns.items()}
+        self.prefilter_stats = {}
+        self.reset_prefilter_stats()
+
+        # What actually runs each pattern: the regex engine's compilation
+        # where wanted and possible, otherwise the stdlib pattern itself
+        self._runners = {
+            name: (_compile_timed(pattern.pattern, pattern.flags)
+                   if self.timed or name in self.risky else None) or pattern
+            for name, pattern in self.patterns.items()
+        }
+
+        for name, pattern in self.patterns.items():
+            if name in self.risky:
+                # Kept out of the stdlib alternation, where no timeout applies
+                self.standalone.append(name)
+                continue
+            try:
+                self._entries.append(_Entry(name, pattern, self._runners[name]))
+            except (_Unsupported, re.error, TypeError):
+                self.standalone.append(name)
+
+        self.context_free = {name for name, pattern in self.patterns.items()
+                             if _is_context_free(pattern)}
+
+        # Alternations compiled per subset of entries that pass the prefilter
+        self._combined = {}
+        if self._entries:
+            try:
+                self._combined_for(tuple(range(len(self._entries))))
+            except re.error:
+                self.standalone = list(self.patterns)
+                self._entries = []
+
+    @property
+    def interruptible(self) -> List[str]:
+        """Patterns running on the regex engine, whose calls a budget can cut short"""
+        return [name for name, runner in self._runners.items() if _is_timed(runner)]
+
+    @property
+    def combined_names(self) -> List[str]:
+        return [entry.name for entry in self._entries]
+
+    def reset_prefilter_stats(self) -> None:
+        self.prefilter_stats = {name: {"checked": 0, "skipped": 0} for name in self.patterns}
+
+    def merge_prefilter_stats(self, other: Dict[str, Dict[str, int]]) -> None:
+        """Fold in the checked/skipped counts another matcher kept for the same patterns"""
+        for name, counters in other.items():
+            stats = self.prefilter_stats.setdefault(name, {"checked": 0, "skipped": 0})
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+
+    def _combined_for(self, indexes: Tuple[int, ...]) -> Pattern:
+        combined = self._combined.get(indexes)
+        if combined is None:
+            if len(self._combined) >= COMBINED_CACHE_SIZE:
+                self._combined.clear()
+            entries = [self._entries[index] for index in indexes]
+            if all(entry.boundary for entry in entries):
+                source = r'\b(?:' + '|'.join(entry.body for entry in entries) + ')'
+            else:
+                source = '|'.join((r'\b' if entry.boundary else '') + entry.body
+                                  for entry in entries)
+            combined = (_compile_timed(source) if self.timed else None) or re.compile(source)
+            self._combined[indexes] = combined
+        return combined
+
+    def _may_match(self, name: str, profile: TextProfile) -> bool:
+        stats = self.prefilter_stats[name]
+        stats["checked"] += 1
+        if self.prefilters[name].may_match(profile):
+            return True
+        stats["skipped"] += 1
+        return False
+
+    @staticmethod
+    def _allowance(name: str, budget: Optional[RegexBudget]) -> Tuple[bool, Optional[float]]:
+        """(whether the pattern may still run, its timeout) under ``budget``"""
+        if budget is None:
+            return True, None
+        if name in budget.timed_out:
+            return False, None
+        timeout = budget.timeout(name)
+        if timeout == 0.0:
+            budget.expire(name)
+            return False, None
+        return True, timeout
+
+    def scan(self, text: str, starts: Dict[str, int], cut: int,
+             budget: Optional[RegexBudget] = None) -> Dict[str, Tuple[int, Any, int]]:
+        """Non-overlapping matches of every pattern that start before ``cut``
+
+        ``starts`` gives the position each pattern may next match from.
+        Returns ``{name: (count, first match or None, end of last match)}``,
+        the end defaulting to the start position when nothing matched.
+
+        With a ``budget``, a pattern that runs out of time is recorded in
+        ``budget.timed_out`` and reports the matches found before that;
+        patterns already recorded there are not run again.
+        """
+        profile = TextProfile(text)
+        results = {}
+        for name in self.standalone:
+            pos = starts.get(name, 0)
+            if self._may_match(name, profile):
+                results[name] = self._scan_separately(name, self._runners[name], text, pos, cut, budget)
+            else:
+                results[name] = (0, None, pos)
+
+        active = tuple(index for index, entry in enumerate(self._entries)
+                       if not (budget is not None and entry.name in budget.timed_out)
+                       and self._may_match(entry.name, profile))
+        for index, entry in enumerate(self._entries):
+            if index not in active:
+                results[entry.name] = (0, None, starts.get(entry.name, 0))
+        if not active:
+            return results
+
+        entries = [self._entries[index] for index in active]
+        next_pos = [starts.get(entry.name, 0) for entry in entries]
+        counts = [0] * len(entries)
+        firsts = [None] * len(entries)
+
+        scan_start = min(next_pos)
+        spans = 0
+        combined = self._combined_for(active)
+        shared_timeout = budget.shared_timeout() if budget is not None else None
+        # Once the shared allowance is used up, go straight to separate passes
+        dense = shared_timeout == 0.0
+        pass_started = time.perf_counter()
+        span_iter = () if dense else combined.finditer(
+            text, scan_start, **_timeout_args(combined, shared_timeout))
+        try:
+            for span in span_iter:
+                span_start, span_end = span.span()
+                if span_start >= cut:
+                    break
+                spans += 1
+                if spans > DENSE_SPAN_WARMUP and spans * DENSE_SPAN_GAP > span_start - scan_start:
+                    dense = True
+                    break
+                limit = min(span_end, cut)
+                for index, entry in enumerate(entries):
+                    pos = max(span_start, next_pos[index])
+                    if pos >= limit:
+                        continue
+                    allowed, timeout = self._allowance(entry.name, budget)
+                    if not allowed:
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        while pos < limit:
+                            match = entry.first_match(text, pos, limit, timeout)
+                            if match is None:
+                                break
+                            if firsts[index] is None:
+                                firsts[index] = match
+                            counts[index] += 1
+                            pos = next_pos[index] = match.end()
+                    except TimeoutError:
+                        budget.expire(entry.name)
+                    if budget is not None:
+                        budget.charge(entry.name, time.perf_counter() - started)
+        except TimeoutError:
+            # Too slow all together: finish pattern by pattern, so only the
+            # patterns that are slow on their own are cut short
+            dense = True
+        if budget is not None:
+            budget.charge(None, time.perf_counter() - pass_started)
+
+        for index, entry in enumerate(entries):
+            if dense:
+                # Nothing matched between next_pos and the spans handled so
+                # far, so a separate pass from there continues exactly
+                count, first, next_pos[index] = self._scan_separately(
+                    entry.name, entry.runner, text, next_pos[index], cut, budget)
+                counts[index] += count
+                firsts[index] = firsts[index] or first
+            results[entry.name] = (counts[index], firsts[index], next_pos[index])
+        return results
+
+    def candidate_spans(self, text: str,
+                        budget: Optional[RegexBudget] = None) -> List[Tuple[int, int]]:
+        """Spans of ``text`` outside which no pattern in ``context_free`` matches
+
+        Every match such a pattern has in a piece of ``text`` bordered by
+        non-word characters (or in that piece on its own) overlaps one of
+        the spans, so pieces no span touches cannot match. Runs under the
+        ``budget``'s shared allowance; running out raises ``TimeoutError``.
+        """
+        profile = TextProfile(text)
+        active = tuple(index for index, entry in enumerate(self._entries)
+                       if entry.name in self.context_free and self._may_match(entry.name, profile))
+        runners = [self._combined_for(active)] if active else []
+        runners += [self._runners[name] for name in self.standalone
+                    if name in self.context_free and self._may_match(name, profile)]
+
+        spans = []
+        for runner in runners:
+            timeout = budget.shared_timeout() if budget is not None else None
+            if timeout == 0.0:
+                raise TimeoutError("regex time budget exhausted")
+            started = time.perf_counter()
+            try:
+                spans.extend(match.span() for match in runner.finditer(
+                    text, **_timeout_args(runner, timeout)))
+            finally:
+                if budget is not None:
+                    budget.charge(None, time.perf_counter() - started)
+        return spans
+
+    def spans(self, name: str, text: str, limit: int,
+              budget: Optional[RegexBudget] = None) -> List[Tuple[int, int]]:
+        """(start, end) of the first ``limit`` matches of one pattern
+
+        The same non-overlapping matches :meth:`scan` counts, found with a
+        plain finditer pass; meant for patterns already known to match.
+        Time is charged to the pattern's own ``budget`` allowance.
+        """
+        spans = []
+        allowed, timeout = self._allowance(name, budget)
+        if not allowed or limit <= 0:
+            return spans
+        runner = self._runners[name]
+        started = time.perf_counter()
+        try:
+            for match in runner.finditer(text, **_timeout_args(runner, timeout)):
+                spans.append(match.span())
+                if len(spans) >= limit:
+                    break
+        except TimeoutError:
+            budget.expire(name)
+        if budget is not None:
+            budget.charge(name, time.perf_counter() - started)
+        return spans
+
+    def _scan_separately(self, name: str, pattern: Any, text: str, pos: int, cut: int,
+                         budget: Optional[RegexBudget]) -> Tuple[int, Any, int]:
+        """finditer pass of a single pattern, in the same shape as :meth:`scan` results"""
+        count, first, last_end = 0, None, pos
+        allowed, timeout = self._allowance(name, budget)
+        if not allowed:
+            return count, first, last_end
+        started = time.perf_counter()
+        try:
+            for match in pattern.finditer(text, pos, **_timeout_args(pattern, timeout)):
+                if match.start() >= cut:
+                    break
+                if first is None:
+                    first = match
+                count += 1
+                last_end = match.end()
+        except TimeoutError:
+            budget.expire(name)
+        if budget is not None:
+            budget.charge(name, time.perf_counter() - started)
+        return count, first, last_end
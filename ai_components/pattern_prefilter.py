@@ -0,0 +1,175 @@
+import re
+from typing import Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+from ._sre import GROUPS, REPEATS, parse, sre_constants, walk
+
+ASCII_DIGITS = frozenset('0123456789')
+
+# Explicit character sets larger than this are not worth counting
+MAX_COUNTED_CLASS = 16
+
+# re's case-insensitive matching equates these with "i" where casefold() does not
+_FOLD_FIXES = str.maketrans({'\u0130': 'i', '\u0131': 'i'})
+
+
+def _fold(text: str) -> str:
+    return text.casefold() if text.isascii() else text.translate(_FOLD_FIXES).casefold()
+
+
+class _NoPrefilter(Exception):
+    pass
+
+
+def _item_chars(op, av) -> Optional[Tuple[FrozenSet[str], bool]]:
+    """(characters a single-character item can match, needs ASCII text) or None"""
+    if op is sre_constants.LITERAL:
+        return frozenset(chr(av)), False
+    if op is sre_constants.IN:
+        chars = set()
+        unicode_digits = False
+        for member, value in av:
+            if member is sre_constants.LITERAL:
+                chars.add(chr(value))
+            elif member is sre_constants.RANGE and value[1] - value[0] < MAX_COUNTED_CLASS:
+                chars.update(chr(code) for code in range(value[0], value[1] + 1))
+            elif member is sre_constants.CATEGORY and value is sre_constants.CATEGORY_DIGIT:
+                # \d also matches non-ASCII digits unless the pattern is ASCII-only
+                chars.update(ASCII_DIGITS)
+                unicode_digits = True
+            else:
+                return None
+        if len(chars) > MAX_COUNTED_CLASS:
+            return None
+        return frozenset(chars), unicode_digits
+    return None
+
+
+def _min_count(items, chars: FrozenSet[str]) -> int:
+    """Fewest characters from ``chars`` that any match of ``items`` consumes"""
+    total = 0
+    for op, av in items:
+        if op in REPEATS:
+            low, _, sub = av
+            total += low * _min_count(sub, chars) if low else 0
+        elif op in GROUPS:
+            total += _min_count(av[-1], chars)
+        elif op is sre_constants.BRANCH:
+            total += min(_min_count(alternative, chars) for alternative in av[1])
+        else:
+            item = _item_chars(op, av)
+            if item is not None and item[0] <= chars:
+                total += 1
+    return total
+
+
+def _item_classes(items, classes: Dict[FrozenSet[str], bool]) -> None:
+    """Every countable character class mentioned anywhere in ``items``"""
+    for op, av in items:
+        if op in REPEATS:
+            _item_classes(av[2], classes)
+        elif op in GROUPS:
+            _item_classes(av[-1], classes)
+        elif op is sre_constants.BRANCH:
+            for alternative in av[1]:
+                _item_classes(alternative, classes)
+        else:
+            item = _item_chars(op, av)
+            if item is not None:
+                chars, unicode_digits = item
+                classes[chars] = classes.get(chars, False) or unicode_digits
+
+
+def _has_scoped_flags(items) -> bool:
+    return any(op is sre_constants.SUBPATTERN and (av[1] or av[2]) for op, av in walk(items))
+
+
+class TextProfile:
+    """Lazily computed facts about one piece of text, shared by all prefilters"""
+
+    __slots__ = ('text', '_folded', '_counts', 'is_ascii')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.is_ascii = text.isascii()
+        self._folded = None
+        self._counts = {}
+
+    def contains(self, literal: str, fold_case: bool) -> bool:
+        if not fold_case:
+            return literal in self.text
+        if self._folded is None:
+            self._folded = _fold(self.text)
+        return literal in self._folded
+
+    def has_at_least(self, chars: FrozenSet[str], minimum: int) -> bool:
+        total = 0
+        for ch in chars:
+            count = self._counts.get(ch)
+            if count is None:
+                count = self._counts[ch] = self.text.count(ch)
+            total += count
+            if total >= minimum:
+                return True
+        return False
+
+
+class LiteralPrefilter:
+    """
+    Cheap necessary conditions for a regex to match, derived from its parse tree.
+
+    Two kinds of requirement are derived: literal runs the pattern always
+    contains (``password``, ``@``) and a minimum number of characters from
+    small classes (at least nine digits for ``\\d{3}-\\d{2}-\\d{4}``). They are
+    checked with ``in`` and ``str.count``, which run in C far faster than
+    the regex itself; text failing any of them cannot contain a match.
+    """
+
+    def __init__(self, pattern: Pattern):
+        self.literals: List[str] = []
+        self.counts: List[Tuple[FrozenSet[str], int, bool]] = []
+        self.fold_case = bool(pattern.flags & re.IGNORECASE)
+
+        try:
+            parsed = parse(pattern)
+            self._derive(parsed, pattern.flags)
+        except (_NoPrefilter, re.error, TypeError, RecursionError):
+            self.literals, self.counts = [], []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.literals or self.counts)
+
+    def _derive(self, parsed, flags: int) -> None:
+        if _has_scoped_flags(parsed):
+            # Scoped flag changes would make case handling item-dependent
+            raise _NoPrefilter()
+
+        run = []
+        for op, av in list(parsed) + [(None, None)]:
+            if op is sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            if len(run) > 1:
+                literal = ''.join(run)
+                self.literals.append(_fold(literal) if self.fold_case else literal)
+            run = []
+
+        classes = {}
+        _item_classes(parsed, classes)
+        for chars, unicode_digits in classes.items():
+            if self.fold_case and any(ch.lower() != ch.upper() for ch in chars):
+                continue
+            minimum = _min_count(parsed, chars)
+            if minimum:
+                self.counts.append((chars, minimum, unicode_digits and not flags & re.ASCII))
+
+    def may_match(self, profile: TextProfile) -> bool:
+        for literal in self.literals:
+            if not profile.contains(literal, self.fold_case):
+                return False
+        for chars, minimum, needs_ascii in self.counts:
+            if needs_ascii and not profile.is_ascii:
+                continue
+            if not profile.has_at_least(chars, minimum):
+                return False
+        return True
@@ -0,0 +1,393 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from ._sre import parse
+from .keyword_automaton import KeywordAutomaton
+from .pattern_matcher import PatternMatcher
+from .regex_safety import find_redos_risk
+
+# Built-in detectors; the ``patterns`` section of the config file and the
+# ``patterns`` config key add to or override these by name
+BUILTIN_PATTERNS: Dict[str, Tuple[str, int]] = {
+    'ssn': (r'\b\d{3}-\d{2}-\d{4}\b', 0),
+    'credit_card': (r'\b\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}\b', 0),
+    'email': (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 0),
+    'phone': (r'\b\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b', 0),
+    'api_key': (r'\b[A-Za-z0-9]{32,40}\b', 0),
+    'password_mention': (r'\bpassword\s*[=:]\s*[^\s]+\b', re.IGNORECASE),
+    'secret_mention': (r'\bsecret\s*[=:]\s*[^\s]+\b', re.IGNORECASE),
+}
+
+# Built-in high-risk keywords; the ``keywords`` section of the config file and
+# the ``high_risk_keywords`` config key replace them, and a keywords file adds
+# to whichever list is in effect
+BUILTIN_KEYWORDS: Tuple[str, ...] = (
+    'password', 'secret', 'confidential', 'private', 'restricted',
+    'classified', 'proprietary', 'token', 'key', 'credential',
+    'aws_key', 'api_key', 'access_key', 'secret_key', 'private_key'
+)
+
+# Seconds between checks of the config file's modification time
+DEFAULT_POLL_INTERVAL = 2.0
+
+_FLAG_NAMES = ('IGNORECASE', 'MULTILINE', 'DOTALL', 'VERBOSE', 'ASCII')
+
+
+def _parse_flags(value: Any) -> int:
+    """Regex flags given as an int, a flag name or a list of flag names"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = [value]
+    flags = 0
+    for name in value:
+        name = str(name).upper()
+        if name not in _FLAG_NAMES:
+            raise ValueError(f"unknown regex flag: {name}")
+        flags |= getattr(re, name)
+    return flags
+
+
+def _parse_entry(value: Any) -> Optional[Tuple[str, int]]:
+    """(source, flags) for one config entry; None means the pattern is disabled
+
+    An entry is either the regex itself or a mapping with ``pattern`` and
+    optional ``flags`` and ``enabled`` keys.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value, 0
+    if isinstance(value, dict):
+        if not value.get('enabled', True):
+            return None
+        if not isinstance(value.get('pattern'), str):
+            raise ValueError("pattern entry needs a 'pattern' string")
+        return value['pattern'], _parse_flags(value.get('flags'))
+    raise ValueError(f"unsupported pattern entry: {value!r}")
+
+
+def _matches_empty(pattern: Pattern) -> bool:
+    try:
+        return parse(pattern).getwidth()[0] == 0
+    except Exception:
+        return pattern.fullmatch('') is not None
+
+
+def read_pattern_file(config_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """The ``patterns`` and ``keywords`` sections of a YAML config file
+
+    Unlike ConfigLoader, errors are raised rather than replaced by defaults,
+    so a broken edit never silently swaps in a different pattern set.
+    """
+    import yaml
+
+    with open(config_path, 'r') as file:
+        config = yaml.safe_load(file) or {}
+    patterns = config.get('patterns') or {}
+    if not isinstance(patterns, dict):
+        raise ValueError("'patterns' must be a mapping of name to regex")
+    keywords = config.get('keywords') or {}
+    if not isinstance(keywords, dict):
+        raise ValueError("'keywords' must be a mapping")
+    return patterns, keywords
+
+
+def read_keyword_file(path: str) -> List[str]:
+    """Keywords listed one per line; blank lines and lines starting with # are skipped"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith('#')]
+
+
+class PatternSet:
+    """
+    One immutable, compiled generation of the pattern registry.
+
+    A scan takes the current set once and uses it throughout, so swapping
+    in a new generation never changes the patterns under a running scan.
+    The high-risk keywords belong to the set too, with their automaton.
+    ``fingerprint`` identifies the sources and keywords, so results computed
+    with one set are never mistaken for another's.
+    """
+
+    def __init__(self, version: int, sources: Dict[str, Tuple[str, int]],
+                 engine: str = 'auto', allow_unsafe: bool = False, source: str = 'builtin',
+                 keywords: Iterable[str] = BUILTIN_KEYWORDS, whole_words: bool = False):
+        started = time.perf_counter()
+        self.version = version
+        self.source = source
+        self.rejected: Dict[str, str] = {}
+        self.patterns: Dict[str, Pattern] = {}
+
+        for name, (pattern_source, flags) in sources.items():
+            try:
+                pattern = re.compile(pattern_source, flags)
+            except (re.error, TypeError, ValueError) as e:
+                self.rejected[name] = f"invalid regex: {str(e)}"
+                continue
+            if _matches_empty(pattern):
+                # Would report a match at every position of every file
+                self.rejected[name] = "matches the empty string"
+                continue
+            reason = None if allow_unsafe else find_redos_risk(pattern)
+            if reason:
+                self.rejected[name] = reason
+                continue
+            self.patterns[name] = pattern
+        for name, reason in self.rejected.items():
+            logging.getLogger(__name__).error(f"Pattern {name} disabled: {reason}")
+
+        self.sources = {name: sources[name] for name in self.patterns}
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self.fingerprint = hashlib.sha256(
+            repr((sorted(self.sources.items()), self.keywords, whole_words)).encode('utf-8')
+        ).hexdigest()
+        self.matcher = PatternMatcher(self.patterns, engine=engine)
+        # Built once per set; cost per character does not grow with the keyword count
+        self.keyword_automaton = KeywordAutomaton(self.keywords, whole_words=whole_words)
+        self.compile_seconds = time.perf_counter() - started
+        self.loaded_at = datetime.now()
+
+    def max_width(self, cap: int) -> int:
+        """Longest possible match of any pattern, capped for unbounded patterns"""
+        longest = 0
+        for pattern in self.patterns.values():
+            try:
+                width = parse(pattern).getwidth()[1]
+            except Exception:
+                width = cap
+            longest = max(longest, min(width, cap))
+        return longest
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint[:16],
+            "source": self.source,
+            "patterns": list(self.patterns),
+            "keywords": len(self.keywords),
+            "rejected": dict(self.rejected),
+            "compile_ms": round(self.compile_seconds * 1000, 3),
+            "loaded_at": self.loaded_at.isoformat()
+        }
+
+
+class PatternRegistry:
+    """
+    Versioned store of compiled detection patterns shared by scanners.
+
+    Patterns are the built-ins, overridden or extended by the ``patterns``
+    section of ``config_path`` and then by ``overrides``; an entry set to
+    null or with ``enabled: false`` removes a pattern. Patterns that fail to
+    compile, can match the empty string or look prone to catastrophic
+    backtracking are left out and listed as rejected.
+
+    The high-risk keywords are ``keywords`` if given, else the
+    ``high_risk_keywords`` list of the file's ``keywords`` section, else the
+    built-ins; ``keywords_file`` (or the section's entry of that name) adds
+    one keyword per line.
+
+    The config file and keywords file are polled by :meth:`maybe_reload`
+    (at most once every ``poll_interval`` seconds); when either changes, a
+    complete new
+    :class:`PatternSet` is compiled before being swapped in with a single
+    assignment, so readers always see either the old set or the new one.
+    A file that cannot be read or parsed leaves the current set in place.
+    """
+
+    def __init__(self, config_path: Optional[str] = None, overrides: Optional[Dict[str, Any]] = None,
+                 include_builtins: bool = True, engine: str = 'auto', allow_unsafe: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, keywords: Optional[Iterable[str]] = None,
+                 keywords_file: Optional[str] = None, whole_words: bool = False):
+        self.config_path = config_path
+        self.overrides = dict(overrides or {})
+        self.keywords = list(keywords) if keywords is not None else None
+        self.keywords_file = keywords_file
+        self.whole_words = whole_words
+        # Keywords file in effect, named here or by the config file
+        self._keywords_path = keywords_file
+        self.include_builtins = include_builtins
+        self.engine = engine
+        self.allow_unsafe = allow_unsafe
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self.last_error = None
+        self.reloads = 0
+
+        self._lock = threading.Lock()
+        self._file_stamp = None
+        self._last_poll = time.monotonic()
+        try:
+            file_patterns, file_keywords = self._read_file_patterns()
+            keywords = self._keywords(file_keywords)
+        except Exception:
+            # Nothing to keep serving yet; start without the files' rules
+            file_patterns, keywords = {}, list(self.keywords or BUILTIN_KEYWORDS)
+        self._current = PatternSet(1, self._sources(file_patterns), engine,
+                                   allow_unsafe, self._source_label(), keywords, whole_words)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], engine: str = 'auto') -> 'PatternRegistry':
+        """Registry configured by the flat engine/classifier config keys"""
+        return cls(
+            config_path=config.get("pattern_config"),
+            overrides=config.get("patterns"),
+            include_builtins=config.get("builtin_patterns", True),
+            engine=engine,
+            allow_unsafe=config.get("allow_unsafe_patterns", False),
+            poll_interval=config.get("pattern_poll_interval", DEFAULT_POLL_INTERVAL),
+            keywords=config.get("high_risk_keywords"),
+            keywords_file=config.get("keywords_file"),
+            whole_words=config.get("keyword_whole_words", False)
+        )
+
+    @property
+    def current(self) -> PatternSet:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def _source_label(self) -> str:
+        parts = ['builtin'] if self.include_builtins else []
+        if self.config_path:
+            parts.append(str(self.config_path))
+        if self.overrides:
+            parts.append('config')
+        return '+'.join(parts)
+
+    @staticmethod
+    def _file_stamp_of(path: Optional[str]) -> Optional[Tuple[int, int, int]]:
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _stamp(self) -> Tuple[Optional[Tuple[int, int, int]], ...]:
+        return (self._file_stamp_of(self.config_path), self._file_stamp_of(self._keywords_path))
+
+    def _read_file_patterns(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Patterns and keyword settings from the config file; a missing file contributes none"""
+        self._file_stamp = self._stamp()
+        if not self.config_path or self._file_stamp[0] is None:
+            return {}, {}
+        try:
+            return read_pattern_file(self.config_path)
+        except Exception as e:
+            self.last_error = f"{self.config_path}: {str(e)}"
+            self.logger.error(f"Pattern config not loaded: {self.last_error}")
+            raise
+
+    def _keywords(self, file_keywords: Dict[str, Any]) -> List[str]:
+        """Keywords in effect, reading the keywords file named here or in the config file"""
+        keywords = self.keywords
+        if keywords is None:
+            keywords = file_keywords.get('high_risk_keywords')
+        if keywords is None:
+            keywords = BUILTIN_KEYWORDS
+        path = self.keywords_file or file_keywords.get('keywords_file')
+        if path != self._keywords_path:
+            self._keywords_path = path
+            self._file_stamp = self._stamp()
+        try:
+            if not isinstance(keywords, (list, tuple)) or \
+                    not all(isinstance(keyword, str) for keyword in keywords):
+                raise ValueError("'high_risk_keywords' must be a list of strings")
+            keywords = list(keywords)
+            if path:
+                keywords += read_keyword_file(path)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            self.last_error = f"{path or self.config_path}: {str(e)}"
+            self.logger.error(f"Keywords not loaded: {self.last_error}")
+            raise
+        return keywords
+
+    def _sources(self, file_patterns: Dict[str, Any]) -> Dict[str, Tuple[str, int]]:
+        sources = dict(BUILTIN_PATTERNS) if self.include_builtins else {}
+        for layer in (file_patterns, self.overrides):
+            for name, value in layer.items():
+                try:
+                    entry = _parse_entry(value)
+                except ValueError as e:
+                    self.logger.error(f"Pattern {name} ignored: {str(e)}")
+                    continue
+                if entry is None:
+                    sources.pop(str(name), None)
+                else:
+                    sources[str(name)] = entry
+        return sources
+
+    def reload(self) -> bool:
+        """Recompile from the config file now; True if a different set was swapped in"""
+        with self._lock:
+            try:
+                file_patterns, file_keywords = self._read_file_patterns()
+                keywords = self._keywords(file_keywords)
+            except Exception:
+                return False
+            sources = self._sources(file_patterns)
+            self.last_error = None
+
+            current = self._current
+            candidate = PatternSet(current.version + 1, sources, self.engine,
+                                   self.allow_unsafe, self._source_label(), keywords, self.whole_words)
+            if candidate.fingerprint == current.fingerprint:
+                return False
+            self._current = candidate
+            self.reloads += 1
+        self.logger.info(f"Pattern set v{candidate.version} loaded "
+                         f"({len(candidate.patterns)} patterns, {len(candidate.keywords)} keywords, "
+                         f"{candidate.compile_seconds * 1000:.1f} ms)")
+        return True
+
+    def maybe_reload(self) -> bool:
+        """Reload if the config or keywords file changed since it was last read
+
+        Cheap enough to call before every scan: the file is stat'ed at most
+        once per ``poll_interval`` seconds.
+        """
+        if not self.config_path and not self._keywords_path:
+            return False
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval:
+            return False
+        self._last_poll = now
+        if self._stamp() == self._file_stamp:
+            return False
+        return self.reload()
+
+    def resolved_config(self) -> Dict[str, Any]:
+        """Config keys that rebuild exactly the current set elsewhere (e.g. in a worker process)"""
+        return {
+            "patterns": {name: {"pattern": source, "flags": flags}
+                         for name, (source, flags) in self._current.sources.items()},
+            "builtin_patterns": False,
+            "pattern_config": None,
+            "high_risk_keywords": list(self._current.keywords),
+            "keywords_file": None,
+            "keyword_whole_words": self.whole_words,
+            # Already vetted here; a rejected pattern is simply absent
+            "allow_unsafe_patterns": True
+        }
+
+    def health(self) -> Dict[str, Any]:
+        status = self._current.to_dict()
+        status.update({
+            "config_path": self.config_path,
+            "keywords_file": self._keywords_path,
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        })
+        return status
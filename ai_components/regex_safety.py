@@ -0,0 +1,129 @@
+import time
+from typing import Dict, Optional, Pattern
+
+from ._sre import REPEATS, children, parse, sre_constants, walk
+
+# Shortest timeout handed to the regex engine; anything less means "exhausted"
+MIN_TIMEOUT = 0.001
+
+
+def _is_unbounded(op, av) -> bool:
+    return op in REPEATS and av[1] == sre_constants.MAXREPEAT
+
+
+def _contains_unbounded(items) -> bool:
+    return any(_is_unbounded(op, av) for op, av in walk(items))
+
+
+def _first_op(items):
+    items = list(items)
+    return items[0] if items else None
+
+
+def _risk(items) -> Optional[str]:
+    previous = None
+    for op, av in items:
+        if op in REPEATS and av[1] > 1:
+            # (a+)+ and friends: exponential backtracking on a near-miss
+            if _contains_unbounded(av[2]):
+                return "nested quantifier"
+            # (a|ab)* and friends: alternatives that can start the same way
+            for sub_op, sub_av in av[2]:
+                if sub_op is sre_constants.BRANCH:
+                    firsts = [_first_op(alternative) for alternative in sub_av[1]]
+                    literals = [first for first in firsts if first and first[0] is sre_constants.LITERAL]
+                    if len(literals) != len(set(literals)):
+                        return "overlapping alternation under a quantifier"
+        # \w+\w+ and friends: polynomial backtracking between adjacent repeats
+        if previous is not None and _is_unbounded(op, av) and _is_unbounded(*previous) and \
+                list(av[2]) == list(previous[1][2]):
+            return "adjacent unbounded repeats of the same item"
+        previous = (op, av) if op in REPEATS else None
+        for sub in children(op, av):
+            reason = _risk(sub)
+            if reason:
+                return reason
+    return None
+
+
+def find_redos_risk(pattern: Pattern) -> Optional[str]:
+    """Describe why a pattern is prone to catastrophic backtracking, or None
+
+    A structural check run when patterns are loaded. It flags nested
+    unbounded quantifiers, quantified alternations whose branches start with
+    the same literal, and adjacent unbounded repeats of the same item.
+    """
+    try:
+        return _risk(parse(pattern))
+    except Exception as e:
+        return f"cannot be analyzed: {str(e)}"
+
+
+class RegexBudget:
+    """
+    Time allowance for running regexes over one file.
+
+    ``file_seconds`` bounds all regex work for the file and
+    ``pattern_seconds`` bounds each pattern separately; either may be None
+    for no limit. Both grow by ``seconds_per_mb`` for every megabyte of
+    content passed to :meth:`extend`, so large files are not cut short
+    merely for being large. Patterns that run out are recorded in
+    ``timed_out`` and skipped for the rest of the file.
+    """
+
+    def __init__(self, file_seconds: Optional[float], pattern_seconds: Optional[float],
+                 seconds_per_mb: float = 0.0):
+        self.deadline = time.perf_counter() + file_seconds if file_seconds else None
+        self.pattern_seconds = pattern_seconds or None
+        self.seconds_per_mb = seconds_per_mb
+        self.spent: Dict[str, float] = {}
+        self.shared_spent = 0.0
+        self.timed_out: Dict[str, None] = {}
+
+    def extend(self, chars: int) -> None:
+        """Add the allowance for ``chars`` more characters of content"""
+        extra = chars / (1024 * 1024) * self.seconds_per_mb
+        if self.deadline is not None:
+            self.deadline += extra
+        if self.pattern_seconds is not None:
+            self.pattern_seconds += extra
+
+    def timeout(self, name: Optional[str] = None) -> Optional[float]:
+        """Seconds the next call may run for; None means no limit
+
+        Returns 0.0 when the file budget, or the pattern's own, is used up.
+        """
+        limits = []
+        if self.deadline is not None:
+            limits.append(self.deadline - time.perf_counter())
+        if name is not None and self.pattern_seconds is not None:
+            limits.append(self.pattern_seconds - self.spent.get(name, 0.0))
+        if not limits:
+            return None
+        remaining = min(limits)
+        return remaining if remaining >= MIN_TIMEOUT else 0.0
+
+    def shared_timeout(self) -> Optional[float]:
+        """Seconds a pass running every pattern at once may take
+
+        Such passes share one pattern's allowance, within the file budget,
+        so a single slow pattern is isolated before it can use up the whole
+        file. Returns 0.0 once that allowance is used up.
+        """
+        remaining = self.timeout()
+        if self.pattern_seconds is None:
+            return remaining
+        shared = self.pattern_seconds - self.shared_spent
+        if remaining is not None:
+            shared = min(remaining, shared)
+        return shared if shared >= MIN_TIMEOUT else 0.0
+
+    def charge(self, name: Optional[str], seconds: float) -> None:
+        """Record time spent on one pattern, or on a shared pass when ``name`` is None"""
+        if name is None:
+            self.shared_spent += seconds
+        else:
+            self.spent[name] = self.spent.get(name, 0.0) + seconds
+
+    def expire(self, name: str) -> None:
+        self.timed_out[name] = None
@@ -0,0 +1,51 @@
+from typing import Any, Dict
+
+# Detection tiers, in the order content passes through them
+TIERS = ('path_filter', 'patterns', 'model')
+
+
+class TierStats:
+    """
+    Counters for each tier of the detection cascade.
+
+    Per tier: how many items (files or texts) ``entered`` it, how many it
+    ``passed`` on (through the path filter; flagged by the patterns or by
+    the model), how many earlier hits it ``cleared`` (the model), the
+    ``units`` of work where a tier handles several per item (model
+    windows), and the ``seconds`` spent in it.
+    """
+
+    def __init__(self):
+        self.tiers: Dict[str, Dict[str, float]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.tiers = {tier: {"entered": 0, "passed": 0, "cleared": 0, "units": 0, "seconds": 0.0} for tier in TIERS}
+
+    def record(self, tier: str, seconds: float, entered: int = 1, passed: int = 0,
+               cleared: int = 0, units: int = 0) -> None:
+        counters = self.tiers[tier]
+        counters["entered"] += entered
+        counters["passed"] += passed
+        counters["cleared"] += cleared
+        counters["units"] += units
+        counters["seconds"] += seconds
+
+    def merge(self, other: Dict[str, Dict[str, float]]) -> None:
+        """Sum another instance's ``tiers`` into this one, tier by tier and counter by counter"""
+        for tier, counters in other.items():
+            mine = self.tiers.setdefault(tier, {"entered": 0, "passed": 0, "cleared": 0, "units": 0, "seconds": 0.0})
+            for key, value in counters.items():
+                mine[key] = mine.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {}
+        for tier, counters in self.tiers.items():
+            entered = counters["entered"]
+            status[tier] = dict(
+                counters,
+                seconds=round(counters["seconds"], 6),
+                pass_rate=round(counters["passed"] / entered, 4) if entered else None,
+                avg_ms=round(counters["seconds"] * 1000 / entered, 4) if entered else None
+            )
+        return status
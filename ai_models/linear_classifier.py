@@ -0,0 +1,151 @@
+"""
+CPU-only text classifier: hashed n-gram features and a linear model.
+
+The model file holds plain NumPy arrays written by joblib, so loading it
+with ``mmap_mode='r'`` maps the weights instead of copying them; processes
+forked from one that loaded it, or that load the same file themselves,
+share those pages. scikit-learn and joblib are imported on first use only.
+
+Train with: python3 -m ai_models.linear_classifier train samples.csv model.joblib
+(a CSV with ``text`` and ``label`` columns, label 1 for sensitive).
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MODEL_FORMAT = 1
+DEFAULT_FEATURES = 2 ** 20
+DEFAULT_NGRAM_RANGE = (1, 2)
+# Texts vectorized per call; bounds the sparse matrix built at once
+DEFAULT_BATCH_SIZE = 1024
+
+_shared: Dict[str, Tuple[Tuple[int, int, int], 'LinearTextClassifier']] = {}
+_shared_lock = threading.Lock()
+
+
+def _make_vectorizer(n_features: int, ngram_range: Tuple[int, int]):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Stateless: nothing is learned, so only its parameters are saved
+    return HashingVectorizer(n_features=n_features, ngram_range=tuple(ngram_range),
+                             alternate_sign=False, dtype=np.float32)
+
+
+class LinearTextClassifier:
+    """
+    Logistic-regression scores over hashed word n-grams.
+
+    ``coef`` may be a read-only memory map; nothing here writes to it.
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: float,
+                 n_features: int = DEFAULT_FEATURES,
+                 ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE):
+        if coef.shape != (n_features,):
+            raise ValueError(f"expected {n_features} weights, got {coef.shape}")
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.vectorizer = _make_vectorizer(n_features, self.ngram_range)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'LinearTextClassifier':
+        import joblib
+
+        data = joblib.load(path, mmap_mode='r' if mmap else None)
+        if data.get('format') != MODEL_FORMAT:
+            raise ValueError(f"unsupported model format: {data.get('format')!r}")
+        return cls(data['coef'], data['intercept'], data['n_features'], data['ngram_range'])
+
+    def save(self, path: str) -> None:
+        import joblib
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Uncompressed, so the weights can be memory-mapped when loaded
+        joblib.dump({
+            'format': MODEL_FORMAT,
+            'coef': np.ascontiguousarray(self.coef, dtype=np.float32),
+            'intercept': self.intercept,
+            'n_features': self.n_features,
+            'ngram_range': self.ngram_range
+        }, path)
+
+    def predict_proba(self, texts: Sequence[str],
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> List[float]:
+        """Probability that each text is sensitive, vectorized a batch at a time"""
+        scores = []
+        for offset in range(0, len(texts), batch_size):
+            features = self.vectorizer.transform(texts[offset:offset + batch_size])
+            logits = features @ self.coef + self.intercept
+            scores.extend((1.0 / (1.0 + np.exp(-logits))).tolist())
+        return scores
+
+
+def train(texts: Sequence[str], labels: Sequence[int], n_features: int = DEFAULT_FEATURES,
+          ngram_range: Tuple[int, int] = DEFAULT_NGRAM_RANGE, **params: Any) -> LinearTextClassifier:
+    """Fit a classifier on labelled texts (1 = sensitive); ``params`` go to LogisticRegression"""
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = _make_vectorizer(n_features, ngram_range)
+    params.setdefault('max_iter', 1000)
+    params.setdefault('class_weight', 'balanced')
+    model = LogisticRegression(**params)
+    model.fit(vectorizer.transform(texts), np.asarray(labels))
+    return LinearTextClassifier(model.coef_[0].astype(np.float32), model.intercept_[0],
+                                n_features, ngram_range)
+
+
+def _stamp(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def load_shared(path: str) -> LinearTextClassifier:
+    """The process-wide classifier for ``path``, loaded (memory-mapped) on first use
+
+    Later calls return the same instance until the file changes on disk.
+    """
+    path = os.path.abspath(path)
+    stamp = _stamp(path)
+    cached = _shared.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _shared_lock:
+        cached = _shared.get(path)
+        if cached is None or cached[0] != stamp:
+            classifier = LinearTextClassifier.load(path)
+            _shared[path] = cached = (stamp, classifier)
+            logging.getLogger(__name__).info(f"Loaded text model {path} "
+                                             f"({classifier.n_features} features)")
+    return cached[1]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import csv
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    train_parser = commands.add_parser('train', help='train from a CSV with text and label columns')
+    train_parser.add_argument('samples')
+    train_parser.add_argument('output')
+    train_parser.add_argument('--features', type=int, default=DEFAULT_FEATURES)
+    args = parser.parse_args(argv)
+
+    with open(args.samples, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    classifier = train([row['text'] for row in rows], [int(row['label']) for row in rows],
+                       n_features=args.features)
+    classifier.save(args.output)
+    print(f"Trained on {len(rows)} samples, saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
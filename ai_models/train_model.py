@@ -1,6 +1,8 @@
-import tensorflow as tf
-
 def train(X, y, epochs=5):
+    # Optional and slow to import; only needed when this model is trained.
+    # For CPU-only nodes see ai_models.linear_classifier
+    import tensorflow as tf
+
     model = tf.keras.Sequential([
         tf.keras.layers.Dense(64, activation='relu', input_shape=(X.shape[1],)),
         tf.keras.layers.Dense(1, activation='sigmoid')
@@ -1,25 +1,52 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 import os
+import json
 import logging
+import math
+import re
 from pathlib import Path
+from config_loader import ConfigLoader
 from dlp_engine import DLPEngine
+from monitor_manager import MonitorManager
 
 # Initialize Flask app
 app = Flask(__name__)
 app.logger.setLevel(logging.INFO)
 
+# Patterns, keywords and model settings; see config/dlp_config.yaml
+config_path = os.environ.get("DLP_CONFIG", "config/dlp_config.yaml")
+ml_model_config = ConfigLoader.ml_model_config(ConfigLoader.load_config(config_path))
+ml_model_config["path"] = os.environ.get("DLP_ML_MODEL", ml_model_config["path"])
+ml_model_config["mode"] = os.environ.get("DLP_ML_MODE", ml_model_config["mode"])
+
 # DLP Engine Configuration
 dlp_config = {
     "max_file_size": 10 * 1024 * 1024,
+    "workers": int(os.environ.get("DLP_SCAN_WORKERS", 1)),
     "allowed_extensions": [".txt", ".log", ".csv", ".json", ".xml", ".yml", ".yaml", ".py", ".js", ".html"],
     "blacklisted_dirs": [".git", "__pycache__", "node_modules", ".env", "venv"],
     "blacklisted_files": [".env", ".pem", ".key", "credentials.json"],
-    "reporting": {"output_path": "./reports"}
+    "reporting": {"output_path": "./reports"},
+    "database": {"type": "sqlite", "path": "./data/dlp_database.db"},
+    # Its patterns section is merged over the built-ins and reloaded on change
+    "pattern_config": config_path,
+    # Loaded on first use and memory-mapped, so processes share one copy of the weights
+    "ml_model": ml_model_config
 }
 
 # Initialize DLP Engine
 dlp_engine = DLPEngine(dlp_config)
 
+# Monitor sessions share the engine's patterns, one scan pool, one observer and
+# one dispatcher thread; their log cursors and findings history live in the
+# state directory. They run in this process only: serve the app from a single
+# worker process (the Dockerfile runs gunicorn with --workers 1 --threads N)
+monitor_manager = MonitorManager(
+    dlp_engine,
+    pool_workers=int(os.environ.get("DLP_MONITOR_WORKERS", 8)),
+    state_dir=os.environ.get("DLP_MONITOR_STATE", "./data/monitor")
+)
+
 def normalize_and_verify_path(path):
     """Normalize and verify file path security"""
     try:
@@ -69,20 +96,31 @@ def api_scan():
     try:
         data = request.json or {}
         path = data.get('path')
+        mode = data.get('mode', 'incremental')
         
         if not path:
             return jsonify({'error': 'missing_path', 'message': 'Path is required'}), 400
         
+        if mode not in ('full', 'incremental'):
+            return jsonify({'error': 'invalid_mode', 'message': 'Mode must be full or incremental'}), 400
+        
         # Validate path
         normalized_path = normalize_and_verify_path(path)
         
+        # Stream one JSON result per line instead of buffering the whole scan
+        if data.get('stream'):
+            lines = (json.dumps(result.to_dict()) + '\n'
+                     for result in dlp_engine.iter_scan(normalized_path, mode=mode))
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        
         # Perform scan
-        results = dlp_engine.scan_target(normalized_path)
+        results = dlp_engine.scan_target(normalized_path, mode=mode)
         
         return jsonify({
             'success': True,
-            'results': results,
-            'scanned_path': normalized_path
+            'results': [result.to_dict() for result in results],
+            'scanned_path': normalized_path,
+            'mode': mode
         })
         
     except Exception as e:
@@ -110,23 +148,89 @@ def api_clear_alerts():
 def api_monitor_start():
     try:
         data = request.json or {}
-        path = data.get('path')
+        paths = data.get('paths') or ([data['path']] if data.get('path') else [])
         
-        if not path:
+        if not paths:
             return jsonify({'error': 'missing_path', 'message': 'Path is required'}), 400
         
-        normalized_path = normalize_and_verify_path(path)
+        normalized_paths = [normalize_and_verify_path(path) for path in paths]
+        # Named after the first watched directory unless given a name
+        name = data.get('name') or re.sub(r'[^A-Za-z0-9_.-]', '_', Path(normalized_paths[0]).name or 'root')
+        options = {}
+        for key, convert in (('debounce', float), ('scan_interval', float), ('scan_workers', int)):
+            if key in data:
+                try:
+                    options[key] = convert(data[key])
+                    valid = math.isfinite(options[key]) and options[key] > 0
+                except (TypeError, ValueError, OverflowError):
+                    valid = False
+                if not valid:
+                    return jsonify({'error': 'invalid_option',
+                                    'message': f'{key} must be a positive number'}), 400
+        
+        try:
+            session = monitor_manager.start(name, normalized_paths, **options)
+        except ValueError as e:
+            return jsonify({'error': 'invalid_session', 'message': str(e)}), 409
+        except RuntimeError as e:
+            return jsonify({'error': 'monitor_elsewhere', 'message': str(e)}), 409
         
-        # Start monitoring (placeholder - you can integrate your monitor.py here)
         return jsonify({
             'success': True,
-            'message': f'Monitoring started for {normalized_path}',
-            'monitored_path': normalized_path
+            'message': f'Monitoring started for {", ".join(normalized_paths)}',
+            'monitored_path': normalized_paths[0],
+            'session': session
         })
         
     except Exception as e:
         return jsonify({'error': 'monitor_failed', 'message': str(e)}), 500
 
+@app.route('/api/monitor/stop', methods=['POST'])
+def api_monitor_stop():
+    try:
+        name = (request.json or {}).get('name')
+        if not name:
+            return jsonify({'error': 'missing_name', 'message': 'Session name is required'}), 400
+        return jsonify({'success': True, 'session': monitor_manager.stop(name)})
+    except KeyError:
+        return jsonify({'error': 'unknown_session', 'message': f'No monitor session {name}'}), 404
+    except Exception as e:
+        return jsonify({'error': 'monitor_failed', 'message': str(e)}), 500
+
+@app.route('/api/monitor/sessions', methods=['GET'])
+def api_monitor_sessions():
+    try:
+        return jsonify({'sessions': monitor_manager.list()})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/monitor/sessions/<name>', methods=['GET'])
+def api_monitor_status(name):
+    try:
+        return jsonify(monitor_manager.status(name))
+    except KeyError:
+        return jsonify({'error': 'unknown_session', 'message': f'No monitor session {name}'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/monitor/sessions/<name>/findings', methods=['GET'])
+def api_monitor_findings(name):
+    """Findings of a session, filtered by after_seq, start/end (epoch seconds), path_prefix and limit"""
+    try:
+        args = request.args
+        findings = monitor_manager.get(name).findings.query(
+            start=args.get('start', type=float),
+            end=args.get('end', type=float),
+            path_prefix=args.get('path_prefix'),
+            limit=args.get('limit', default=100, type=int),
+            after_seq=args.get('after_seq', type=int)
+        )
+        return jsonify({'name': name, 'findings': findings})
+    except KeyError:
+        return jsonify({'error': 'unknown_session', 'message': f'No monitor session {name}'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/report/generate', methods=['POST'])
 def api_generate_report():
     try:
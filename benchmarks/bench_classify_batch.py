@@ -0,0 +1,76 @@
+"""
+Items per second for classify_batch against one classify_content call per item.
+
+Small texts of three kinds (log lines, form fields, chat messages), a few
+percent of them sensitive, are classified in batches of 1, 100 and 10000.
+Batch results must equal the per-item results; the script exits non-zero
+if they do not.
+
+Run with: python3 benchmarks/bench_classify_batch.py [items]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.content_classifier import ContentClassifier  # noqa: E402
+
+BATCH_SIZES = (1, 100, 10000)
+
+
+def build_corpora(count: int) -> dict:
+    rng = random.Random(42)
+    words = ("the quick brown fox jumps over lazy dog user login status ok latency "
+             "request response server client session cache retry meeting lunch").split()
+    leaks = ('password=hunter2', 'bob@example.com', '123-45-6789', '4111 1111 1111 1111')
+
+    def sentence(length):
+        text = ' '.join(rng.choice(words) for _ in range(length))
+        if rng.random() < 0.03:
+            text += ' ' + rng.choice(leaks)
+        return text
+
+    return {
+        'log lines': [f"2024-05-0{rng.randint(1, 9)} 12:{rng.randint(10, 59)}:07 INFO {sentence(10)}"
+                      for _ in range(count)],
+        'form fields': [sentence(rng.randint(1, 3)) for _ in range(count)],
+        'chat messages': [sentence(rng.randint(5, 25)) for _ in range(count)],
+    }
+
+
+def measure(func, texts, batch_size: int, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for offset in range(0, len(texts), batch_size):
+            func(texts[offset:offset + batch_size])
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    classifier = ContentClassifier({})
+    corpora = build_corpora(count)
+
+    def one_by_one(texts):
+        return [classifier.classify_content(text, 'batch') for text in texts]
+
+    print(f"{'corpus':<14} {'batch':>6} {'per-item items/s':>17} {'batch items/s':>14} {'speedup':>8}")
+    print("-" * 64)
+    mismatches = 0
+    for name, texts in corpora.items():
+        if classifier.classify_batch(texts) != one_by_one(texts):
+            mismatches += 1
+            print(f"{name}: results differ")
+        for batch_size in BATCH_SIZES:
+            before = measure(one_by_one, texts, batch_size)
+            after = measure(classifier.classify_batch, texts, batch_size)
+            print(f"{name:<14} {batch_size:>6} {before:>17.0f} {after:>14.0f} {after / before:>7.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
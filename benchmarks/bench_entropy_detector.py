@@ -0,0 +1,105 @@
+"""
+Cost of entropy-based secret detection.
+
+For each corpus, times classify_content with and without the entropy
+detector (MB/s, and the share of regex-only throughput that remains), and
+the detector's token classification alone, NumPy batches against the
+per-token Python fallback. Both detector paths must report the same
+findings; the script exits non-zero if they do not.
+
+Run with: python3 benchmarks/bench_entropy_detector.py [size_mb]
+"""
+import base64
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.content_classifier import ContentClassifier  # noqa: E402
+from ai_components.entropy_detector import EntropyDetector, np  # noqa: E402
+
+
+def build_corpora(size: int) -> dict:
+    rng = random.Random(42)
+    words = ("the quick brown fox jumps over lazy dog user login status ok latency "
+             "request response server client session cache retry").split()
+    alphanumeric = string.ascii_letters + string.digits
+
+    def fill(make_line):
+        lines, total = [], 0
+        while total < size:
+            line = make_line()
+            lines.append(line)
+            total += len(line) + 1
+        return '\n'.join(lines)
+
+    def log_line():
+        line = ' '.join(rng.choice(words) for _ in range(12))
+        if rng.random() < 0.2:
+            line += f" request_id={rng.getrandbits(128):032x} trace=/api/v2/{rng.choice(words)}"
+        return line
+
+    def config_line():
+        key = '_'.join(rng.choice(words) for _ in range(2)).upper()
+        kind = rng.random()
+        if kind < 0.3:
+            value = ''.join(rng.choice(alphanumeric) for _ in range(40))
+        elif kind < 0.5:
+            value = base64.b64encode(rng.randbytes(rng.randint(18, 48))).decode()
+        else:
+            value = rng.choice(words)
+        return f"{key}={value}"
+
+    def minified_line():
+        return ';'.join(f"var {rng.choice(words)}{i}=function(a,b){{return a.{rng.choice(words)}+b}}"
+                        for i in range(20))
+
+    return {
+        'application log': fill(log_line),
+        'secrets config': fill(config_line),
+        'minified JS': fill(minified_line),
+    }
+
+
+def measure(func, content: str, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return len(content) / best / (1024 * 1024)
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    regex_only = ContentClassifier({'entropy_detection': {'enabled': False}})
+    with_entropy = ContentClassifier({'entropy_detection': {'enabled': True}})
+    batched, per_token = EntropyDetector(), EntropyDetector(use_numpy=False)
+    corpora = build_corpora(int(size_mb * 1024 * 1024))
+    if np is None:
+        print("numpy not installed; both detector columns use the per-token path")
+
+    print(f"{'corpus':<16} {'regex MB/s':>11} {'+entropy MB/s':>14} {'kept':>6} "
+          f"{'python MB/s':>12} {'numpy MB/s':>11} {'findings':>9}")
+    print("-" * 85)
+    mismatches = 0
+    for name, content in corpora.items():
+        found = batched.scan(content, 0, len(content))
+        if found != per_token.scan(content, 0, len(content)):
+            mismatches += 1
+            print(f"{name}: detector paths differ")
+        before = measure(lambda text: regex_only.classify_content(text, name), content)
+        after = measure(lambda text: with_entropy.classify_content(text, name), content)
+        python = measure(lambda text: per_token.scan(text, 0, len(text)), content)
+        numpy = measure(lambda text: batched.scan(text, 0, len(text)), content)
+        findings = sum(count for count, _, _ in found.values())
+        print(f"{name:<16} {before:>11.1f} {after:>14.1f} {after / before:>6.0%} "
+              f"{python:>12.1f} {numpy:>11.1f} {findings:>9}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Keyword counting throughput as the keyword list grows.
+
+Compares the original approach (lowercase the content, then one str.count
+per keyword) against KeywordAutomaton for growing lists of synthetic
+codenames and hostnames, in MB/s. Counts must agree; the script exits
+non-zero if they do not.
+
+Run with: python3 benchmarks/bench_keyword_automaton.py [size_mb]
+"""
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.content_classifier import ContentClassifier  # noqa: E402
+from ai_components.keyword_automaton import KeywordAutomaton  # noqa: E402
+
+KEYWORD_COUNTS = (15, 150, 1500, 5000)
+
+
+def legacy_count(keywords, content: str) -> dict:
+    content_lower = content.lower()
+    return {keyword: content_lower.count(keyword) for keyword in keywords}
+
+
+def build_keywords(base: list, total: int, rng: random.Random) -> list:
+    keywords = list(base)
+    while len(keywords) < total:
+        name = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+        keywords.append(rng.choice([name, f"{name}-db01", f"project_{name}"]))
+    return list(dict.fromkeys(keywords))[:total]
+
+
+def build_content(keywords: list, size: int, rng: random.Random) -> str:
+    words = ("the quick brown fox jumps over lazy dog user login status ok latency "
+             "request response server client session cache retry").split()
+    lines, total = [], 0
+    while total < size:
+        line = ' '.join(rng.choice(words) for _ in range(12))
+        if rng.random() < 0.05:
+            line += ' ' + rng.choice(keywords).upper()
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+
+def measure(func, content: str, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return len(content) / best / (1024 * 1024)
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    rng = random.Random(42)
+    base = ContentClassifier({}).high_risk_keywords
+    all_keywords = build_keywords(base, max(KEYWORD_COUNTS), rng)
+    content = build_content(all_keywords, int(size_mb * 1024 * 1024), rng)
+
+    print(f"{'keywords':>9} {'str.count MB/s':>15} {'automaton MB/s':>15} {'build ms':>9}")
+    print("-" * 52)
+    mismatches = 0
+    for total in KEYWORD_COUNTS:
+        keywords = all_keywords[:total]
+        start = time.perf_counter()
+        automaton = KeywordAutomaton(keywords)
+        if not automaton.uses_automaton:
+            # Measure the automaton itself even where the direct path would be used
+            automaton.uses_automaton = True
+            automaton._build()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        if automaton.count(content) != legacy_count(keywords, content):
+            mismatches += 1
+            print(f"{total}: counts differ")
+        before = measure(lambda text: legacy_count(keywords, text), content)
+        after = measure(automaton.count, content)
+        print(f"{total:>9} {before:>15.1f} {after:>15.1f} {build_ms:>9.1f}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput benchmark for ContentClassifier.classify_content.
+
+Compares the original implementation (one findall pass per regex, then a
+lowercased copy and a count per keyword) against the current single-pass
+PatternMatcher, in MB/s, on a few synthetic corpora. Results must be
+identical; the script exits non-zero if they are not.
+
+Run with: python3 benchmarks/bench_pattern_matcher.py [size_mb]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.content_classifier import ContentClassifier  # noqa: E402
+
+
+def legacy_classify(classifier: ContentClassifier, content: str) -> dict:
+    """classify_content as it was before the combined matcher"""
+    results = {'is_sensitive': False, 'confidence': 0.0, 'detected_patterns': [],
+               'risk_level': 'low', 'details': []}
+    content_lower = content.lower()
+    detected_count = 0
+    for pattern_name, pattern in classifier.sensitive_patterns.items():
+        matches = pattern.findall(content)
+        if matches:
+            detected_count += len(matches)
+            results['detected_patterns'].append(
+                {'type': pattern_name, 'count': len(matches), 'sample': matches[0]})
+    for keyword in classifier.high_risk_keywords:
+        if keyword in content_lower:
+            count = content_lower.count(keyword)
+            detected_count += count
+            results['detected_patterns'].append({'keyword': keyword, 'count': count})
+    if detected_count > 0:
+        results['is_sensitive'] = True
+        results['confidence'] = min(1.0, detected_count * 0.2)
+        results['risk_level'] = 'high' if detected_count >= 5 else \
+            'medium' if detected_count >= 2 else 'low'
+    return results
+
+
+def build_corpora(size: int) -> dict:
+    rng = random.Random(42)
+    words = ("the quick brown fox jumps over lazy dog user login status ok latency "
+             "request response server client session cache retry").split()
+
+    def fill(make_line):
+        lines, total = [], 0
+        while total < size:
+            line = make_line()
+            lines.append(line)
+            total += len(line) + 1
+        return '\n'.join(lines)
+
+    def log_line():
+        line = ' '.join(rng.choice(words) for _ in range(12))
+        if rng.random() < 0.01:
+            line += ' password=hunter2 contact bob@example.com ssn 123-45-6789'
+        return line
+
+    def pii_row():
+        return (f"{rng.randint(1, 10**6)},user{rng.randint(1, 9999)}@example.com,"
+                f"{rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)},"
+                f"({rng.randint(200, 999)}) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}")
+
+    def minified_line():
+        return ';'.join(f"var {rng.choice(words)}{i}=function(a,b){{return a+b}}" for i in range(20))
+
+    return {
+        'application log': fill(log_line),
+        'PII-dense CSV': fill(pii_row),
+        'minified JS': fill(minified_line),
+    }
+
+
+def measure(func, content: str, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return len(content) / best / (1024 * 1024)
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    # The original had no entropy detection; compare like with like
+    classifier = ContentClassifier({'entropy_detection': {'enabled': False}})
+    corpora = build_corpora(int(size_mb * 1024 * 1024))
+
+    print(f"{'corpus':<18} {'original MB/s':>14} {'combined MB/s':>14} {'speedup':>8}")
+    print("-" * 58)
+    mismatches = 0
+    for name, content in corpora.items():
+        if legacy_classify(classifier, content) != classifier.classify_content(content, name):
+            mismatches += 1
+            print(f"{name}: results differ")
+        before = measure(lambda text: legacy_classify(classifier, text), content)
+        after = measure(lambda text: classifier.classify_content(text, name), content)
+        print(f"{name:<18} {before:>14.1f} {after:>14.1f} {after / before:>7.1f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Classification time on adversarial inputs, with and without regex time budgets.
+
+Each corpus is a long run without whitespace of the kind that makes
+backtracking patterns degrade: alphanumeric blobs, base64 and minified JS
+on a single line, digit runs, and near-miss emails and password mentions.
+The stdlib engine (budgets disabled) is timed on a small sample only,
+since its cost can grow quadratically; the budgeted classifier, which runs
+every pattern on the regex engine so calls can be interrupted, is timed on
+the sample and on the full size, and the patterns it cut short are listed.
+
+Run with: python3 benchmarks/bench_regex_budget.py [size_kb] [pattern_seconds]
+"""
+import base64
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_components.content_classifier import ContentClassifier  # noqa: E402
+
+SAMPLE_SIZE = 32 * 1024
+
+
+def build_corpora() -> dict:
+    """Corpus name -> function building that corpus at a given length"""
+    rng = random.Random(42)
+    alphanumeric = string.ascii_letters + string.digits
+
+    def minified(length):
+        parts, total = [], 0
+        while total < length:
+            part = f"var a{rng.randint(0, 999)}=function(b,c){{return b.c+c.d}};"
+            parts.append(part)
+            total += len(part)
+        return ''.join(parts)[:length]
+
+    return {
+        'alphanumeric blob': lambda n: ''.join(rng.choice(alphanumeric) for _ in range(n)),
+        'base64 dump': lambda n: base64.b64encode(rng.randbytes(n * 3 // 4)).decode()[:n],
+        'minified JS': minified,
+        'digit run': lambda n: ''.join(rng.choice(string.digits) for _ in range(n)),
+        'near-miss email': lambda n: 'a.' * (n // 2 - 1) + '@',
+        'password run': lambda n: 'password=' + '-' * (n - 9),
+    }
+
+
+def timed(classifier: ContentClassifier, content: str):
+    start = time.perf_counter()
+    result = classifier.classify_content(content, 'adversarial')
+    return time.perf_counter() - start, result
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1024) if len(sys.argv) > 1 else 1024 * 1024
+    pattern_seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    unbudgeted = ContentClassifier({'regex_time_budget': 0, 'regex_pattern_time_budget': 0})
+    budgeted = ContentClassifier({'regex_pattern_time_budget': pattern_seconds,
+                                  'regex_time_per_mb': 0, 'regex_engine': 'regex'})
+    builders = build_corpora()
+
+    print(f"{'corpus':<18} {'re 32KB s':>10} {'budget 32KB s':>14} "
+          f"{'budget ' + str(size // 1024) + 'KB s':>16}  timed out")
+    print("-" * 80)
+    for name, build in builders.items():
+        sample = build(SAMPLE_SIZE)
+        content = build(size)
+        before, _ = timed(unbudgeted, sample)
+        small, _ = timed(budgeted, sample)
+        after, result = timed(budgeted, content)
+        timed_out = ', '.join(result.get('timed_out', [])) or '-'
+        print(f"{name:<18} {before:>10.3f} {small:>14.3f} {after:>16.3f}  {timed_out}")
+
+
+if __name__ == '__main__':
+    main()
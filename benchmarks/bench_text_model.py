@@ -0,0 +1,64 @@
+"""
+Load time and throughput of the linear text model.
+
+Trains a model on synthetic labelled sentences, saves it, then times
+loading it memory-mapped against loading it into memory, and scoring
+texts one call per text against batches of 100 and 1000.
+
+Run with: python3 benchmarks/bench_text_model.py [texts]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_models.linear_classifier import LinearTextClassifier, train  # noqa: E402
+
+BATCH_SIZES = (1, 100, 1000)
+
+
+def build_samples(count: int, rng: random.Random):
+    words = ("the quick brown fox meeting lunch report status server deploy build "
+             "request response session cache retry invoice customer").split()
+    sensitive = "password salary ssn confidential acquisition patient diagnosis".split()
+    texts, labels = [], []
+    for _ in range(count):
+        label = rng.random() < 0.3
+        tokens = [rng.choice(words) for _ in range(rng.randint(5, 30))]
+        if label:
+            tokens += rng.sample(sensitive, 2)
+        rng.shuffle(tokens)
+        texts.append(' '.join(tokens))
+        labels.append(int(label))
+    return texts, labels
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = random.Random(42)
+    texts, labels = build_samples(count, rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'model.joblib')
+        train(texts[:2000], labels[:2000]).save(path)
+
+        for mmap in (False, True):
+            start = time.perf_counter()
+            model = LinearTextClassifier.load(path, mmap=mmap)
+            print(f"load {'memory-mapped' if mmap else 'into memory'}: "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+        print(f"\n{'batch':>6} {'texts/s':>10}")
+        print("-" * 17)
+        for batch_size in BATCH_SIZES:
+            start = time.perf_counter()
+            for offset in range(0, len(texts), batch_size):
+                model.predict_proba(texts[offset:offset + batch_size])
+            print(f"{batch_size:>6} {len(texts) / (time.perf_counter() - start):>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for binary/text sniffing in DLPEngine.
+
+Builds a mixed corpus (text with and without known extensions, random
+binary, and files carrying common binary signatures) and reports files/s
+for the original per-byte generator sniffer and the current one.
+
+Run with: python3 benchmarks/bench_text_sniff.py [files_per_kind]
+"""
+import mimetypes
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dlp_engine import DLPEngine, TEXT_SNIFF_SIZE  # noqa: E402
+
+LEGACY_TEXT_EXTENSIONS = {
+    '.txt', '.log', '.csv', '.json', '.xml', '.yml', '.yaml',
+    '.md', '.rst', '.conf', '.config', '.ini', '.py', '.js',
+    '.html', '.htm', '.php', '.java', '.c', '.cpp', '.h', '.cs',
+    '.ts', '.jsx', '.tsx', '.vue', '.rb', '.go', '.rs', '.swift',
+    '.kt', '.scala', '.pl', '.pm', '.r', '.sql', '.sh', '.bash',
+    '.zsh', '.fish', '.ps1', '.bat', '.cmd', '.properties'
+}
+
+
+def legacy_is_text_file(file_path: Path) -> bool:
+    """The sniffer as it was before the bytes.translate rewrite"""
+    if file_path.suffix.lower() in LEGACY_TEXT_EXTENSIONS:
+        return True
+    mime_type, _ = mimetypes.guess_type(str(file_path))
+    if mime_type and mime_type.startswith('text/'):
+        return True
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(1024)
+            if b'\0' in sample:
+                return False
+            printable_count = sum(1 for byte in sample if 32 <= byte <= 126 or byte in [9, 10, 13])
+            if printable_count / len(sample) > 0.8:
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def legacy_looks_like_text(sample: bytes) -> bool:
+    if not sample or b'\0' in sample:
+        return False
+    printable_count = sum(1 for byte in sample if 32 <= byte <= 126 or byte in [9, 10, 13])
+    return printable_count / len(sample) > 0.8
+
+
+def build_corpus(root: Path, per_kind: int) -> list:
+    rng = random.Random(42)
+    line = b"2024-01-01 INFO user=alice action=login status=ok latency_ms=12\n"
+    signatures = [b'\x7fELF', b'\x89PNG\r\n\x1a\n', b'PK\x03\x04', b'%PDF-1.7\n', b'\x1f\x8b\x08']
+    paths = []
+    for i in range(per_kind):
+        samples = {
+            f"known_{i}.log": line * 40,
+            f"noext_{i}": line * 40,
+            f"data_{i}.dat": line * 40,
+            f"random_{i}.bin": bytes(rng.getrandbits(8) for _ in range(2048)),
+            f"signed_{i}.blob": rng.choice(signatures) + line * 40,
+        }
+        for name, data in samples.items():
+            path = root / name
+            path.write_bytes(data)
+            paths.append(path)
+    return paths
+
+
+def measure(label: str, func, paths: list, rounds: int = 3) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    rate = len(paths) / best
+    print(f"{label:<28} {rate:>12,.0f} files/s")
+    return rate
+
+
+def main():
+    per_kind = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_corpus(Path(tmp), per_kind)
+        engine = DLPEngine({"reporting": {"output_path": tmp}, "classification_cache": {"enabled": False}})
+
+        # Same verdicts apart from files whose only tell is a binary signature
+        disagreements = sum(legacy_is_text_file(p) != engine._is_text_file(p) for p in paths)
+
+        samples = [path.read_bytes()[:TEXT_SNIFF_SIZE] for path in paths]
+        print(f"Corpus: {len(paths)} files ({per_kind} per kind), {disagreements} verdicts changed")
+        print("-" * 50)
+        before = measure("legacy _is_text_file", legacy_is_text_file, paths)
+        after = measure("_is_text_file", engine._is_text_file, paths)
+        print(f"{'speedup':<28} {after / before:>12.1f}x")
+        print("-" * 50)
+        before = measure("legacy sample sniff", legacy_looks_like_text, samples)
+        after = measure("_looks_like_text", engine._looks_like_text, samples)
+        print(f"{'speedup':<28} {after / before:>12.1f}x")
+
+
+if __name__ == '__main__':
+    main()
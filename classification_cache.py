@@ -0,0 +1,96 @@
+import copy
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ClassificationCache:
+    """
+    Content-addressed memo of classification results.
+
+    Keys are content digests, so byte-identical files are classified once.
+    Recent entries are kept in a bounded in-memory LRU; when a database path
+    is given, every entry is also written to SQLite and misses in memory fall
+    back to disk before counting as a real miss.
+    """
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        self.max_entries = max(1, int(max_entries))
+        self.logger = logging.getLogger(__name__)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(exist_ok=True, parents=True)
+                self._conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS classification_cache "
+                    "(digest TEXT PRIMARY KEY, result TEXT NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.error(f"Classification cache disk store unavailable: {str(e)}")
+                self._conn = None
+
+    @property
+    def disk_backed(self) -> bool:
+        return self._conn is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for a digest, or None"""
+        with self._lock:
+            result = self._entries.get(digest)
+            if result is not None:
+                self._entries.move_to_end(digest)
+            elif self._conn is not None:
+                result = self._load(digest)
+                if result is not None:
+                    self._remember(digest, result)
+
+        return copy.deepcopy(result) if result is not None else None
+
+    def put(self, digest: str, result: Dict[str, Any]) -> None:
+        """Cache the classification result for a digest"""
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._remember(digest, result)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO classification_cache (digest, result) VALUES (?, ?)",
+                        (digest, json.dumps(result))
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    self.logger.error(f"Classification cache write failed: {str(e)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, digest: str, result: Dict[str, Any]) -> None:
+        self._entries[digest] = result
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._conn.execute(
+                "SELECT result FROM classification_cache WHERE digest = ?", (digest,)
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.error(f"Classification cache read failed: {str(e)}")
+            return None
@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 import logging
 
+from ai_components.pattern_registry import BUILTIN_KEYWORDS
+
 class ConfigLoader:
     @staticmethod
     def load_config(config_path: str = None) -> dict:
@@ -54,12 +56,19 @@ class ConfigLoader:
                 'ssn': r'\b\d{3}-\d{2}-\d{4}\b',
                 'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
             },
+            'keywords': {
+                'high_risk_keywords': list(BUILTIN_KEYWORDS),
+                'keywords_file': None
+            },
             'ai': {
-                'model_name': 'distilbert-base-uncased',
-                'model_path': './models/',
-                'confidence_threshold': 0.75,
-                'training_data_path': './data/training/',
-                'use_gpu': True
+                'model_path': None,
+                'mode': 'cascade',
+                'threshold': 0.75,
+                'escalate_below': 0.8,
+                'clear_below': 0.25,
+                'max_chars': 4096,
+                'window': 256,
+                'max_windows': 8
             },
             'reporting': {
                 'output_format': 'json',
@@ -81,6 +90,13 @@ class ConfigLoader:
             }
         }
     
+    @staticmethod
+    def ml_model_config(config: dict) -> dict:
+        """The classifier's ml_model settings from the ai section"""
+        ai = dict(config.get('ai') or {})
+        ai['path'] = ai.pop('model_path', None)
+        return ai
+    
     @staticmethod
     def validate_config(config: dict) -> dict:
         """Validate and fill in missing configuration values"""
@@ -1,14 +1,98 @@
+import asyncio
 import logging
 import os
 import re
 import mimetypes
 import json
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Union
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import hashlib
+import codecs
+import threading
+import time
 
 from ai_components.content_classifier import ContentClassifier
+from ai_components.pattern_registry import PatternRegistry, PatternSet
+from scan_index import ScanIndex
+from classification_cache import ClassificationCache
+from scan_result import ScanResult
+
+TEXT_EXTENSIONS = frozenset({
+    '.txt', '.log', '.csv', '.json', '.xml', '.yml', '.yaml',
+    '.md', '.rst', '.conf', '.config', '.ini', '.py', '.js',
+    '.html', '.htm', '.php', '.java', '.c', '.cpp', '.h', '.cs',
+    '.ts', '.jsx', '.tsx', '.vue', '.rb', '.go', '.rs', '.swift',
+    '.kt', '.scala', '.pl', '.pm', '.r', '.sql', '.sh', '.bash',
+    '.zsh', '.fish', '.ps1', '.bat', '.cmd', '.properties'
+})
+
+# Files are read once in blocks of this size. The first block is also the
+# binary sniff sample; files larger than one block are classified as a stream
+READ_BLOCK_SIZE = 1024 * 1024
+TEXT_SNIFF_SIZE = 1024
+
+# Bytes counted as printable when sniffing text (ASCII printable, tab, LF, CR)
+PRINTABLE_BYTES = bytes(range(32, 127)) + b'\t\n\r'
+
+# Leading signatures of common binary formats, rejected before any byte counting
+BINARY_SIGNATURES = (
+    b'\x7fELF',                                    # ELF executables and libraries
+    b'\x89PNG\r\n\x1a\n',                          # PNG
+    b'PK\x03\x04', b'PK\x05\x06', b'PK\x07\x08',   # ZIP, JAR, Office documents
+    b'%PDF-',                                      # PDF
+    b'\x1f\x8b',                                   # gzip
+    b'\xff\xd8\xff',                               # JPEG
+    b'GIF87a', b'GIF89a',                          # GIF
+    b'\xfd7zXZ\x00',                               # xz
+    b"7z\xbc\xaf'\x1c",                            # 7-Zip
+    b'Rar!\x1a\x07',                               # RAR
+    b'\xca\xfe\xba\xbe',                           # Java class / Mach-O fat binary
+    b'SQLite format 3\x00',                        # SQLite database
+)
+
+# Upper bound on distinct suffixes remembered by the name-based text check
+SUFFIX_CACHE_SIZE = 4096
+
+SCAN_MODES = ("full", "incremental")
+
+# Refuse to open a path whose final component is a symlink (0 where unsupported)
+O_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+# Per-process engine used by the scan worker pool (see DLPEngine.scan_target)
+_worker_engine = None
+
+
+def _init_scan_worker(config: Dict[str, Any]) -> None:
+    """Build the engine each worker process reuses for all of its files"""
+    global _worker_engine
+    _worker_engine = DLPEngine(config)
+
+
+def _scan_file_in_worker(file_path: str, file_stat: os.stat_result):
+    """Scan one file in a worker process
+
+    Returns (result, statistics delta, pattern prefilter counters delta,
+    detection tier counters delta).
+    """
+    _worker_engine.reset_statistics()
+    result = _worker_engine._scan_file(Path(file_path), file_stat, skip_binary=True,
+                                       nofollow=not _worker_engine.follow_symlinks)
+    return (result, _worker_engine.statistics, _worker_engine.pattern_matcher.prefilter_stats,
+            _worker_engine.content_classifier.tier_stats.tiers)
+
+
+def _remember_paths(candidates, paths: set):
+    """Pass (path, stat) pairs through, adding each path to ``paths``"""
+    for file_path, file_stat in candidates:
+        paths.add(file_path)
+        yield file_path, file_stat
+
+
+def _open_nofollow(path, flags):
+    return os.open(path, flags | O_NOFOLLOW)
+
 
 class SecurityAlerts:
     def __init__(self):
@@ -24,16 +108,21 @@ class DLPEngine:
     Zero vulnerabilities implementation
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], pattern_registry: Optional[PatternRegistry] = None):
         self.config = config
         self.logger = self._setup_logging()
         
-        # Initialize the ContentClassifier
-        self.content_classifier = ContentClassifier(config)
+        # Initialize the ContentClassifier; its pattern registry can be shared
+        self.content_classifier = ContentClassifier(config, pattern_registry)
+        self.pattern_registry = self.content_classifier.pattern_registry
         self.security_alerts = SecurityAlerts()
         
         # Security configurations
         self.max_file_size = config.get("max_file_size", 10 * 1024 * 1024)
+        self.workers = max(1, int(config.get("workers", 1)))
+        # Classify whole files in chunks; when off, only the first block is classified
+        self.streaming_scan = config.get("streaming_scan", True)
+        self.follow_symlinks = config.get("follow_symlinks", False)
         self.allowed_extensions = set(config.get("allowed_extensions", [
             '.txt', '.log', '.csv', '.json', '.xml', '.yml', '.yaml', 
             '.md', '.rst', '.conf', '.config', '.ini', '.py', '.js', '.html',
@@ -56,15 +145,38 @@ class DLPEngine:
         
         # Initialize mimetypes
         mimetypes.init()
+        self._suffix_is_text = {}
+        
+        # Content-addressed memo so duplicate files are classified once
+        cache_config = config.get("classification_cache", {})
+        self.classification_cache = None
+        if cache_config.get("enabled", True):
+            self.classification_cache = ClassificationCache(
+                max_entries=cache_config.get("max_entries", 10000),
+                db_path=cache_config.get("path")
+            )
+        
+        # Persistent index of unchanged files for incremental scans
+        self.scan_index = self._open_scan_index(config.get("database", {}))
         
         # Statistics
-        self.statistics = {
-            "files_scanned": 0,
-            "sensitive_files_found": 0,
-            "files_failed": 0,
-            "total_size_scanned": 0,
-            "last_scan": None
-        }
+        self.reset_statistics()
+
+    @property
+    def pattern_matcher(self):
+        return self.content_classifier.pattern_matcher
+
+    def _open_scan_index(self, database_config: Dict[str, Any]) -> Optional[ScanIndex]:
+        """Open the SQLite scan index configured under ``database``, if any"""
+        db_path = database_config.get("path")
+        if not db_path or database_config.get("type", "sqlite") != "sqlite":
+            return None
+        
+        try:
+            return ScanIndex(db_path)
+        except Exception as e:
+            self.logger.error(f"Scan index unavailable, incremental scans disabled: {str(e)}")
+            return None
 
     def _setup_logging(self) -> logging.Logger:
         """Secure logging setup"""
@@ -92,65 +204,88 @@ class DLPEngine:
 
     def _is_safe_path(self, target_path: str) -> bool:
         """Validate path safety to prevent directory traversal"""
+        return self._resolve_safe_path(target_path) is not None
+
+    def _resolve_safe_path(self, target_path: str) -> Optional[Path]:
+        """Return the resolved path if it is safe to scan, otherwise None"""
         try:
             target_path = Path(target_path).resolve()
             current_dir = Path.cwd().resolve()
             
             if not target_path.is_relative_to(current_dir):
                 self.logger.warning(f"Path traversal attempt detected: {target_path}")
-                return False
+                return None
             
             if not target_path.exists():
                 self.logger.warning(f"Path does not exist: {target_path}")
-                return False
+                return None
                 
-            return True
+            return target_path
             
         except Exception as e:
             self.logger.error(f"Path safety check failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def _is_within_root(path: str, root: str) -> bool:
+        """Prefix check of an already-resolved path against a resolved root"""
+        return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+    def _is_text_by_name(self, file_path: Path) -> bool:
+        """Decide text-ness from the file extension (or its MIME type), cached per suffix"""
+        suffix = file_path.suffix.lower()
+        is_text = self._suffix_is_text.get(suffix)
+        if is_text is None:
+            is_text = suffix in TEXT_EXTENSIONS
+            if not is_text and suffix:
+                mime_type, _ = mimetypes.guess_type('file' + suffix)
+                is_text = bool(mime_type and mime_type.startswith('text/'))
+            if len(self._suffix_is_text) < SUFFIX_CACHE_SIZE:
+                self._suffix_is_text[suffix] = is_text
+        return is_text
+
+    def _looks_like_text(self, sample: bytes) -> bool:
+        """Detect binary content from a leading sample of the file
+
+        Known binary signatures are rejected first; otherwise printable bytes
+        are counted in C by deleting them with ``bytes.translate``.
+        """
+        if not sample or sample.startswith(BINARY_SIGNATURES) or b'\0' in sample:
             return False
+        
+        printable_count = len(sample) - len(sample.translate(None, PRINTABLE_BYTES))
+        return printable_count / len(sample) > 0.8
 
     def _is_text_file(self, file_path: Path) -> bool:
         """Check if file is likely a text file"""
         try:
-            text_extensions = {
-                '.txt', '.log', '.csv', '.json', '.xml', '.yml', '.yaml', 
-                '.md', '.rst', '.conf', '.config', '.ini', '.py', '.js', 
-                '.html', '.htm', '.php', '.java', '.c', '.cpp', '.h', '.cs',
-                '.ts', '.jsx', '.tsx', '.vue', '.rb', '.go', '.rs', '.swift',
-                '.kt', '.scala', '.pl', '.pm', '.r', '.sql', '.sh', '.bash',
-                '.zsh', '.fish', '.ps1', '.bat', '.cmd', '.properties'
-            }
-            
-            if file_path.suffix.lower() in text_extensions:
+            if self._is_text_by_name(file_path):
                 return True
             
-            # Check MIME type
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-            if mime_type and mime_type.startswith('text/'):
-                return True
-            
-            # Sample file content to detect binary files
-            try:
-                with open(file_path, 'rb') as f:
-                    sample = f.read(1024)
-                    if b'\0' in sample:
-                        return False
-                    
-                    printable_count = sum(1 for byte in sample if 32 <= byte <= 126 or byte in [9, 10, 13])
-                    if printable_count / len(sample) > 0.8:
-                        return True
-            except:
-                pass
-                
-            return False
+            with open(file_path, 'rb') as f:
+                return self._looks_like_text(f.read(TEXT_SNIFF_SIZE))
             
         except Exception as e:
             self.logger.error(f"File type detection failed: {file_path} - {str(e)}")
             return False
 
-    def _should_scan_file(self, file_path: Path) -> bool:
-        """Determine if file should be scanned based on security rules"""
+    def _should_scan_file(self, file_path: Path, file_stat: Optional[os.stat_result] = None,
+                          check_parents: bool = True) -> bool:
+        """Determine if file should be scanned based on security rules
+
+        Only metadata is checked here; binary content is rejected by the
+        read pipeline from the first block it reads anyway. The directory
+        walker prunes blacklisted directories itself and skips the per-file
+        parent check. Counts as the path filter tier of the detection cascade.
+        """
+        started = time.perf_counter()
+        passed = self._passes_path_rules(file_path, file_stat, check_parents)
+        self.content_classifier.tier_stats.record("path_filter", time.perf_counter() - started,
+                                                  passed=int(passed))
+        return passed
+
+    def _passes_path_rules(self, file_path: Path, file_stat: Optional[os.stat_result],
+                           check_parents: bool) -> bool:
         try:
             # Check blacklisted files
             if file_path.name in self.blacklisted_files:
@@ -158,19 +293,14 @@ class DLPEngine:
                 return False
             
             # Check file size
-            file_size = file_path.stat().st_size
+            file_size = (file_stat or file_path.stat()).st_size
             if file_size > self.max_file_size:
                 self.logger.warning(f"File too large: {file_path} ({file_size} bytes)")
                 return False
             
             # Check if in blacklisted directory
-            for parent in file_path.parents:
-                if parent.name in self.blacklisted_dirs:
-                    self.logger.warning(f"File in blacklisted directory: {file_path}")
-                    return False
-            
-            # Check if it's a text file
-            if not self._is_text_file(file_path):
+            if check_parents and self._in_blacklisted_dir(file_path):
+                self.logger.warning(f"File in blacklisted directory: {file_path}")
                 return False
             
             return True
@@ -179,146 +309,416 @@ class DLPEngine:
             self.logger.error(f"File scan eligibility check failed: {str(e)}")
             return False
 
-    def scan_target(self, target_path: str) -> List[Dict[str, Any]]:
-        """Securely scan a target path and return results"""
-        if not self._is_safe_path(target_path):
-            return [{"error": "Invalid or unsafe path", "path": target_path}]
+    def _in_blacklisted_dir(self, path: Path) -> bool:
+        return any(parent.name in self.blacklisted_dirs for parent in path.parents)
+
+    def _iter_candidate_files(self, root: Path, trusted_root: Optional[Path] = None):
+        """Walk a directory, yielding (path, stat) for files passing the metadata rules
+
+        Uses os.scandir so blacklisted directories are pruned before they are
+        entered and file types come from the directory entry. Symlinks are
+        skipped unless ``follow_symlinks`` is set, in which case directories
+        are tracked by (device, inode) so link loops are walked only once.
+
+        ``trusted_root`` is the resolved root that was validated once by the
+        caller. Plain entries below it cannot leave it, so only symlinks are
+        resolved, and those pointing outside the root are rejected.
+        """
+        trusted = str(trusted_root or root.resolve())
+        if root.name in self.blacklisted_dirs or self._in_blacklisted_dir(root):
+            self.logger.warning(f"Target is in a blacklisted directory: {root}")
+            return
+        
+        follow = self.follow_symlinks
+        visited = set()
+        stack = [str(root)]
+        while stack:
+            directory = stack.pop()
+            if follow:
+                try:
+                    dir_stat = os.stat(directory)
+                except OSError:
+                    continue
+                dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+                if dir_key in visited:
+                    self.logger.warning(f"Skipping symlink loop: {directory}")
+                    continue
+                visited.add(dir_key)
+            
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if follow and entry.is_symlink() and \
+                                    not self._is_within_root(os.path.realpath(entry.path), trusted):
+                                self.logger.warning(f"Skipping symlink outside scan root: {entry.path}")
+                                continue
+                            if entry.is_dir(follow_symlinks=follow):
+                                if entry.name not in self.blacklisted_dirs:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=follow):
+                                file_stat = entry.stat(follow_symlinks=follow)
+                                if self._should_scan_file(Path(entry.path), file_stat, check_parents=False):
+                                    yield entry.path, file_stat
+                        except OSError:
+                            continue
+            except OSError as e:
+                self.logger.warning(f"Cannot read directory: {directory} - {str(e)}")
+
+    def scan_target(self, target_path: str, workers: Optional[int] = None,
+                    mode: str = "incremental") -> List[ScanResult]:
+        """Securely scan a target path and return results
+
+        Collects :meth:`iter_scan`; prefer that for large trees.
+        """
+        return list(self.iter_scan(target_path, workers=workers, mode=mode))
+
+    def iter_scan(self, target_path: str, workers: Optional[int] = None,
+                  mode: str = "incremental") -> Iterator[ScanResult]:
+        """Securely scan a target path, yielding each file result as it is produced
+
+        Statistics are updated as results are yielded, so a consumer that
+        stops early still sees accurate counts for what it received.
+        With more than one worker, files are scanned in a process pool and
+        results arrive in completion order rather than walk order.
+        In ``incremental`` mode, files whose stat tuple matches the scan index
+        reuse their last result; ``full`` mode rescans and reindexes everything.
+        """
+        # Pick up pattern config edits; scans already running keep their set
+        self.pattern_registry.maybe_reload()
+        
+        # The root is validated once; descendants are checked against it cheaply
+        trusted_root = self._resolve_safe_path(target_path)
+        if trusted_root is None:
+            yield ScanResult.failure(target_path, "Invalid or unsafe path")
+            return
+        
+        if mode not in SCAN_MODES:
+            yield ScanResult.failure(target_path, f"Invalid scan mode: {mode}")
+            return
         
         self.logger.info(f"Scanning target: {target_path}")
         
-        results = []
         target_path_obj = Path(target_path)
+        workers = max(1, int(workers if workers is not None else self.workers))
+        walked = None
         
         try:
             if target_path_obj.is_file():
-                result = self.scan_file(str(target_path_obj))
-                if result:
-                    results.append(result)
+                scanned = iter([self._scan_file(target_path_obj)])
             elif target_path_obj.is_dir():
-                for file_path in target_path_obj.rglob('*'):
-                    if file_path.is_file() and self._should_scan_file(file_path):
-                        result = self.scan_file(str(file_path))
-                        if result:
-                            results.append(result)
+                candidates = self._iter_candidate_files(target_path_obj, trusted_root)
+                if self.scan_index is not None:
+                    # Paths the walk yields; once it is complete, rows of any others go
+                    walked = set()
+                    candidates = _remember_paths(candidates, walked)
+                # Indexed results only hold for the rules that produced them
+                if self.scan_index is not None and \
+                        self.scan_index.bind_ruleset(self.content_classifier.ruleset_fingerprint()):
+                    self.logger.info("Pattern set changed since the last scan; scan index cleared")
+                use_index = mode == "incremental" and self.scan_index is not None
+                if workers > 1:
+                    scanned = self._scan_files_parallel(candidates, workers, use_index)
+                else:
+                    scanned = self._scan_files_serial(candidates, use_index)
+            else:
+                scanned = iter([])
+            
+            for result in scanned:
+                if result:
+                    self.statistics["files_scanned"] += 1
+                    yield result
             
-            self.statistics["files_scanned"] += len(results)
+            if walked is not None:
+                pruned = self.scan_index.prune(str(target_path_obj), walked)
+                if pruned:
+                    self.logger.info(f"Dropped {pruned} index entries for files no longer in {target_path}")
             self.statistics["last_scan"] = datetime.now().isoformat()
             
         except Exception as e:
             self.logger.error(f"Target scan failed: {str(e)}")
-            results.append({
-                "error": f"Scan failed: {str(e)}",
-                "path": target_path
-            })
+            yield ScanResult.failure(target_path, f"Scan failed: {str(e)}")
+        finally:
+            if self.scan_index:
+                self.scan_index.commit()
+
+    async def aiter_scan(self, target_path: str, workers: Optional[int] = None,
+                         mode: str = "incremental") -> AsyncIterator[ScanResult]:
+        """Async variant of :meth:`iter_scan`
+
+        The blocking walk and file I/O run in the loop's default executor,
+        one result at a time, so the event loop is never blocked.
+        """
+        loop = asyncio.get_running_loop()
+        results = self.iter_scan(target_path, workers=workers, mode=mode)
+        finished = object()
+        # Held while the generator runs; it cannot be closed mid-step
+        running = threading.Lock()
+        
+        def step():
+            with running:
+                return next(results, finished)
         
-        return results
+        def close():
+            with running:
+                results.close()
+        
+        try:
+            while True:
+                result = await loop.run_in_executor(None, step)
+                if result is finished:
+                    break
+                yield result
+        finally:
+            if running.acquire(blocking=False):
+                try:
+                    results.close()
+                finally:
+                    running.release()
+            else:
+                # Cancelled while a step was still running: close the scan
+                # once it returns, without holding up the cancellation
+                loop.run_in_executor(None, close)
+
+    def _lookup_unchanged(self, file_path: str, file_stat: os.stat_result):
+        """Return (True, indexed result) for files unchanged since the last scan"""
+        found, cached = self.scan_index.lookup(file_path, file_stat)
+        if not found:
+            return False, None
+        
+        try:
+            cached = ScanResult.from_state(cached) if cached else None
+        except (TypeError, ValueError):
+            # Entry written in an older format; rescan and overwrite it
+            return False, None
+        
+        if cached is None:
+            # Indexed as binary: skipped again, not counted as an unchanged scan
+            self.statistics["files_skipped_binary"] += 1
+        else:
+            self.statistics["files_unchanged"] += 1
+            if cached.sensitive:
+                self.statistics["sensitive_files_found"] += 1
+        return True, cached
+
+    def _index_result(self, file_path: str, file_stat: os.stat_result,
+                      result: Optional[ScanResult]) -> None:
+        # Errors and results cut short by the regex time budget are retried next scan
+        if self.scan_index and not (result and (result.error or result.timed_out)):
+            self.scan_index.store(file_path, file_stat, result.to_state() if result else None,
+                                  result.sha256 if result else None)
+
+    def _scan_files_serial(self, candidates, use_index: bool):
+        """Scan files one at a time in this process, yielding results"""
+        for file_path, file_stat in candidates:
+            if use_index:
+                found, cached = self._lookup_unchanged(file_path, file_stat)
+                if found:
+                    yield cached
+                    continue
+            result = self._scan_file(Path(file_path), file_stat, skip_binary=True,
+                                     nofollow=not self.follow_symlinks)
+            self._index_result(file_path, file_stat, result)
+            yield result
 
-    def scan_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+    def _scan_files_parallel(self, candidates, workers: int, use_index: bool):
+        """Scan files in a process pool, yielding results in completion order
+
+        Submission is bounded so the walk never runs far ahead of the workers,
+        and each worker's statistics delta is merged into this engine.
+        """
+        max_pending = workers * 4
+        # Workers never touch the scan index; this engine owns it. They
+        # compile exactly this engine's current patterns, not the config file
+        worker_config = dict(self.config, database={}, **self.pattern_registry.resolved_config())
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker,
+                                 initargs=(worker_config,)) as executor:
+            pending = {}
+            for file_path, file_stat in candidates:
+                if use_index:
+                    found, cached = self._lookup_unchanged(file_path, file_stat)
+                    if found:
+                        yield cached
+                        continue
+                future = executor.submit(_scan_file_in_worker, file_path, file_stat)
+                pending[future] = (file_path, file_stat)
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._merge_worker_result(future, *pending.pop(future))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._merge_worker_result(future, *pending.pop(future))
+
+    def _merge_worker_result(self, future, file_path: str,
+                             file_stat: os.stat_result) -> Optional[ScanResult]:
+        """Fold a worker's statistics delta into ours, index and return its result"""
+        result, worker_statistics, worker_prefilter_stats, worker_tier_stats = future.result()
+        for key, value in worker_statistics.items():
+            if key != "files_scanned" and isinstance(value, (int, float)):
+                self.statistics[key] += value
+        self.pattern_matcher.merge_prefilter_stats(worker_prefilter_stats)
+        self.content_classifier.tier_stats.merge(worker_tier_stats)
+        self._index_result(file_path, file_stat, result)
+        return result
+
+    def scan_file(self, file_path: str) -> Optional[ScanResult]:
         """Securely scan individual file"""
         if not self._is_safe_path(file_path):
             return None
         
+        return self._scan_file(Path(file_path))
+
+    def _scan_file(self, file_path_obj: Path, file_stat: Optional[os.stat_result] = None,
+                   skip_binary: bool = False, nofollow: bool = False) -> Optional[ScanResult]:
+        """Scan one file with a single open and a single pass over its bytes
+
+        The first block doubles as the binary/text sniff sample and the
+        classifier input, and every block feeds the SHA-256 as it is read.
+        Multi-block files are classified as they are hashed, so their
+        digest is only known afterwards; the classification cache is
+        therefore used for single-block files only. Returns None for
+        binary files when ``skip_binary`` is set. With ``nofollow``, a
+        file swapped for a symlink after the walk saw it is refused at
+        open time.
+        """
+        file_path = str(file_path_obj)
+        # One pattern set for the whole file, even if a reload lands meanwhile
+        pattern_set = self.pattern_registry.current
         try:
-            file_path_obj = Path(file_path)
-            file_stat = file_path_obj.stat()
-            
-            file_info = {
-                'path': str(file_path_obj),
-                'filename': file_path_obj.name,
-                'size': file_stat.st_size,
-                'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                'created': datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
-                'file_hash': self._calculate_file_hash(file_path_obj),
-                'sensitive_content': False,
-                'risk_level': 'low',
-                'issues': [],
-                'classification_details': {},
-                'scan_timestamp': datetime.now().isoformat()
-            }
-            
-            # Check for sensitive content
-            classification_result = self._analyze_file_content(file_path_obj)
-            if classification_result['is_sensitive']:
-                file_info['sensitive_content'] = True
-                file_info['risk_level'] = classification_result['risk_level']
-                file_info['classification_details'] = classification_result
+            with open(file_path_obj, 'rb', opener=_open_nofollow if nofollow else None) as f:
+                if file_stat is None:
+                    file_stat = os.fstat(f.fileno())
+                
+                buffer = bytearray(READ_BLOCK_SIZE)
+                view = memoryview(buffer)
+                head = bytes(view[:f.readinto(buffer)])
                 
-                # Add descriptive issues
-                if classification_result['detected_patterns']:
-                    patterns = [p['type'] if isinstance(p, dict) else p for p in classification_result['detected_patterns']]
-                    file_info['issues'].append(f"Detected sensitive patterns: {', '.join(set(patterns))}")
+                is_text = self._is_text_by_name(file_path_obj) or \
+                    self._looks_like_text(head[:TEXT_SNIFF_SIZE])
+                if not is_text and skip_binary:
+                    self.statistics["files_skipped_binary"] += 1
+                    return None
                 
+                hasher = hashlib.sha256(head)
+                classification_result = None
+                if is_text and self.streaming_scan and len(head) == READ_BLOCK_SIZE:
+                    classification_result = self._analyze_stream(head, f, buffer, hasher, file_path,
+                                                                 pattern_set)
+                # Hash whatever the classifier did not consume
+                for size in iter(lambda: f.readinto(buffer), 0):
+                    hasher.update(view[:size])
+            
+            file_info = ScanResult(
+                file_path,
+                size=file_stat.st_size,
+                modified=file_stat.st_mtime,
+                created=file_stat.st_ctime,
+                digest=hasher.digest(),
+                scan_timestamp=time.time()
+            )
+            
+            # Check for sensitive content
+            if classification_result is None:
+                classification_result = self._classify_cached(head, file_info.sha256, file_path,
+                                                              pattern_set) \
+                    if is_text else self._empty_classification()
+            
+            file_info.set_classification(classification_result)
+            if file_info.error:
+                self.statistics["files_failed"] += 1
+            if file_info.sensitive:
                 self.statistics["sensitive_files_found"] += 1
+            if file_info.timed_out:
+                self.logger.warning(f"Regex time budget exceeded: {file_path} - "
+                                    f"{', '.join(file_info.timed_out)}")
+                self.statistics["files_timed_out"] += 1
             
             self.statistics["total_size_scanned"] += file_stat.st_size
             return file_info
             
         except PermissionError:
             self.logger.warning(f"Permission denied: {file_path}")
-            return {
-                'path': file_path,
-                'error': 'Permission denied',
-                'sensitive_content': False,
-                'issues': ['Access denied']
-            }
+            return ScanResult.failure(file_path, 'Permission denied', 'Access denied')
         except Exception as e:
             self.logger.error(f"File scan failed: {file_path} - {str(e)}")
             self.statistics["files_failed"] += 1
-            return {
-                'path': file_path,
-                'error': str(e),
-                'sensitive_content': False,
-                'issues': ['Scan failed']
-            }
+            return ScanResult.failure(file_path, str(e), 'Scan failed')
 
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate secure file hash"""
-        try:
-            hasher = hashlib.sha256()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except Exception:
-            return "unknown"
-
-    def _analyze_file_content(self, file_path: Path) -> Dict[str, Any]:
-        """Analyze file content for sensitive information"""
+    @staticmethod
+    def _empty_classification() -> Dict[str, Any]:
+        """Classification result for content that was not analyzed"""
+        return {
+            'is_sensitive': False,
+            'confidence': 0.0,
+            'detected_patterns': [],
+            'risk_level': 'low'
+        }
+
+    @staticmethod
+    def _pattern_names(detected_patterns: List[Any]) -> List[str]:
+        """Labels for detected regex patterns and keyword matches"""
+        return [
+            (p.get('type') or p.get('keyword', 'unknown')) if isinstance(p, dict) else str(p)
+            for p in detected_patterns
+        ]
+
+    def _cache_key(self, digest: str, pattern_set: PatternSet) -> str:
+        """Cache key for content classified with a given pattern set"""
+        return f"{self.content_classifier.ruleset_fingerprint(pattern_set)[:16]}:{digest}"
+
+    def _classify_cached(self, data: bytes, digest: str, file_path: str,
+                         pattern_set: PatternSet) -> Dict[str, Any]:
+        """Classify content, reusing the result for previously seen content digests"""
+        if self.classification_cache is None:
+            return self._analyze_content(data, file_path, pattern_set)
+        
+        cache_key = self._cache_key(digest, pattern_set)
+        cached = self.classification_cache.get(cache_key)
+        if cached is not None:
+            self.statistics["classification_cache_hits"] += 1
+            return cached
+        
+        self.statistics["classification_cache_misses"] += 1
+        result = self._analyze_content(data, file_path, pattern_set)
+        if 'error' not in result and 'timed_out' not in result:
+            self.classification_cache.put(cache_key, result)
+        return result
+
+    def _analyze_stream(self, head: bytes, f, buffer: bytearray, hasher, file_path: str,
+                        pattern_set: PatternSet) -> Dict[str, Any]:
+        """Classify a multi-block file in full, feeding ``hasher`` as it is read
+
+        Blocks are decoded incrementally (so multi-byte characters split
+        across blocks survive) and fed to the classifier one at a time,
+        keeping memory per file constant regardless of file size.
+        """
+        view = memoryview(buffer)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        
+        def text_blocks():
+            yield decoder.decode(head)
+            for size in iter(lambda: f.readinto(buffer), 0):
+                block = view[:size]
+                hasher.update(block)
+                yield decoder.decode(block)
+            yield decoder.decode(b'', final=True)
+        
+        return self.content_classifier.classify_stream(text_blocks(), file_path, pattern_set)
+
+    def _analyze_content(self, data: bytes, file_path: str,
+                         pattern_set: Optional[PatternSet] = None) -> Dict[str, Any]:
+        """Analyze already-read file content for sensitive information"""
         try:
-            # Only process text files
-            if not self._is_text_file(file_path):
-                return {
-                    'is_sensitive': False,
-                    'confidence': 0.0,
-                    'detected_patterns': [],
-                    'risk_level': 'low'
-                }
-            
-            # Read file with size limits and encoding handling
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read(1024 * 1024)  # Read only first 1MB for performance
-            except UnicodeDecodeError:
-                # Fallback for binary files that were misclassified
-                return {
-                    'is_sensitive': False,
-                    'confidence': 0.0,
-                    'detected_patterns': [],
-                    'risk_level': 'low'
-                }
-            
-            # Use the Content Classifier
-            return self.content_classifier.classify_content(content, str(file_path))
+            content = data.decode('utf-8', errors='ignore')
+            return self.content_classifier.classify_content(content, file_path, pattern_set)
             
         except Exception as e:
             self.logger.error(f"Content analysis failed: {file_path} - {str(e)}")
-            return {
-                'is_sensitive': False,
-                'confidence': 0.0,
-                'detected_patterns': [],
-                'risk_level': 'low',
-                'error': str(e)
-            }
+            result = self._empty_classification()
+            result['error'] = str(e)
+            return result
 
     def generate_report(self) -> Dict[str, Any]:
         """Generate comprehensive scan report"""
@@ -353,10 +753,45 @@ class DLPEngine:
         """Get engine statistics"""
         return {
             "statistics": self.statistics,
+            "classification_cache": self._classification_cache_stats(),
+            "scan_index": {
+                "enabled": self.scan_index is not None,
+                "indexed_files": self.scan_index.count() if self.scan_index else 0
+            },
+            "pattern_prefilter": self._prefilter_stats(),
+            "detection_tiers": self.content_classifier.tier_stats.to_dict(),
             "engine_status": "operational",
             "timestamp": datetime.now().isoformat()
         }
 
+    def _classification_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy of the classification cache"""
+        hits = self.statistics["classification_cache_hits"]
+        misses = self.statistics["classification_cache_misses"]
+        cache = self.classification_cache
+        return {
+            "enabled": cache is not None,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(cache) if cache is not None else 0,
+            "max_entries": cache.max_entries if cache is not None else 0,
+            "disk_backed": cache.disk_backed if cache is not None else False
+        }
+
+    def _prefilter_stats(self) -> Dict[str, Any]:
+        """Per-pattern count of classified texts and how many the prefilter skipped"""
+        stats = {}
+        for name, counters in self.pattern_matcher.prefilter_stats.items():
+            checked, skipped = counters["checked"], counters["skipped"]
+            stats[name] = {
+                "enabled": self.pattern_matcher.prefilters[name].enabled,
+                "checked": checked,
+                "skipped": skipped,
+                "skip_rate": skipped / checked if checked else 0.0
+            }
+        return stats
+
     def get_health_status(self) -> Dict[str, Any]:
         """Get engine health status"""
         return {
@@ -367,6 +802,7 @@ class DLPEngine:
                 "file_scanner": "operational",
                 "reporting": "operational"
             },
+            "patterns": self.pattern_registry.health(),
             "statistics": self.statistics
         }
 
@@ -376,13 +812,21 @@ class DLPEngine:
             "files_scanned": 0,
             "sensitive_files_found": 0,
             "files_failed": 0,
+            "files_unchanged": 0,
+            "files_skipped_binary": 0,
+            "files_timed_out": 0,
             "total_size_scanned": 0,
+            "classification_cache_hits": 0,
+            "classification_cache_misses": 0,
             "last_scan": None
         }
+        self.pattern_matcher.reset_prefilter_stats()
+        self.content_classifier.tier_stats.reset()
 
-    def generate_text_report(self, scan_results: List[Dict[str, Any]] = None) -> str:
+    def generate_text_report(self, scan_results: List[Union[ScanResult, Dict[str, Any]]] = None) -> str:
         """Generate a comprehensive text format security report"""
         try:
+            scan_results = self._results_as_dicts(scan_results)
             report_time = datetime.now()
             
             # Build the report header
@@ -438,7 +882,7 @@ class DLPEngine:
                     # Show classification details
                     classification = result.get('classification_details', {})
                     if classification.get('detected_patterns'):
-                        patterns = [p['type'] if isinstance(p, dict) else p for p in classification['detected_patterns']]
+                        patterns = self._pattern_names(classification['detected_patterns'])
                         report.append(f"   Detected Patterns: {', '.join(patterns)}")
                         report.append(f"   Confidence: {classification.get('confidence', 0) * 100:.1f}%")
             
@@ -481,6 +925,13 @@ class DLPEngine:
             self.logger.error(f"Error generating text report: {str(e)}")
             return f"Error generating report: {str(e)}"
 
+    @staticmethod
+    def _results_as_dicts(scan_results):
+        """Report helpers work on the serialized shape the API returns"""
+        if scan_results is None:
+            return None
+        return [r.to_dict() if isinstance(r, ScanResult) else r for r in scan_results]
+
     def _format_bytes(self, bytes_value: int) -> str:
         """Format bytes to human readable format"""
         if bytes_value == 0:
@@ -494,9 +945,10 @@ class DLPEngine:
         
         return f"{bytes_value:.2f} {sizes[i]}"
 
-    def generate_detailed_scan_report(self, scan_results: List[Dict[str, Any]]) -> str:
+    def generate_detailed_scan_report(self, scan_results: List[Union[ScanResult, Dict[str, Any]]]) -> str:
         """Generate detailed technical report for a specific scan"""
         try:
+            scan_results = self._results_as_dicts(scan_results)
             report = []
             report.append("=" * 70)
             report.append("           DETAILED SCAN REPORT")
@@ -533,7 +985,7 @@ class DLPEngine:
                     if classification:
                         patterns = classification.get('detected_patterns', [])
                         if patterns:
-                            pattern_list = [p['type'] if isinstance(p, dict) else str(p) for p in patterns]
+                            pattern_list = self._pattern_names(patterns)
                             report.append(f"   Patterns: {', '.join(pattern_list)}")
                         report.append(f"   Confidence: {classification.get('confidence', 0) * 100:.1f}%")
             
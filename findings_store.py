@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_RECENT = 10000
+# Bytes read back from the end of the history file to resume its numbering
+_TAIL_READ = 64 * 1024
+
+
+class FindingsStore:
+    """
+    Bounded store of monitor findings.
+
+    The most recent ``max_recent`` findings are kept in memory; with a
+    ``history_path`` every finding is also appended to that JSONL file,
+    which queries fall back to for anything older. Each finding is stamped
+    with a ``timestamp`` (epoch seconds) and a ``seq`` number that keeps
+    increasing across restarts, so a query never returns the same finding
+    from both places.
+    """
+
+    def __init__(self, max_recent: int = DEFAULT_MAX_RECENT, history_path: Optional[str] = None):
+        self.history_path = Path(history_path) if history_path else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=max_recent)
+        self._next_seq = 0
+        if self.history_path:
+            self.history_path.parent.mkdir(exist_ok=True, parents=True)
+            self._next_seq = self._last_seq() + 1
+
+    def _last_seq(self) -> int:
+        try:
+            with open(self.history_path, 'rb') as f:
+                f.seek(max(0, f.seek(0, os.SEEK_END) - _TAIL_READ))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return -1
+        for line in reversed(lines):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        return -1
+
+    def add(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stamp and store findings; returns them stamped"""
+        now = time.time()
+        with self._lock:
+            stamped = []
+            for finding in findings:
+                finding = dict(finding, seq=self._next_seq)
+                finding.setdefault("timestamp", now)
+                self._next_seq += 1
+                stamped.append(finding)
+            self._recent.extend(stamped)
+            if self.history_path and stamped:
+                try:
+                    with open(self.history_path, 'a', encoding='utf-8') as f:
+                        f.write(''.join(json.dumps(finding) + '\n' for finding in stamped))
+                except OSError as e:
+                    self.logger.error(f"Failed to append findings history: {str(e)}")
+        return stamped
+
+    def recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """The newest findings in memory, oldest first"""
+        with self._lock:
+            count = len(self._recent)
+            return [self._recent[index] for index in range(max(0, count - limit), count)]
+
+    def query(self, start: Optional[float] = None, end: Optional[float] = None,
+              path_prefix: Optional[str] = None, limit: Optional[int] = None,
+              after_seq: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Findings with ``start <= timestamp < end`` in files under ``path_prefix``, oldest first
+
+        ``after_seq`` keeps only findings numbered above it, e.g. the last
+        one a poller has seen. Reads the history file only if the range
+        reaches back past what is in memory. With ``limit``, the newest
+        ``limit`` matches are returned, or with ``after_seq`` the oldest,
+        so a poller paging forward from its cursor never skips any.
+        """
+        def matches(finding):
+            timestamp = finding["timestamp"]
+            return (start is None or timestamp >= start) and (end is None or timestamp < end) and \
+                (after_seq is None or finding["seq"] > after_seq) and \
+                (path_prefix is None or finding["file"].startswith(path_prefix))
+
+        with self._lock:
+            recent = list(self._recent)
+        found = [finding for finding in recent if matches(finding)]
+        newest_first = after_seq is None
+        if limit and newest_first and len(found) >= limit:
+            # Everything older would be cut off anyway
+            return found[-limit:]
+        oldest = recent[0] if recent else None
+        reaches_back = (start is None or oldest is None or start < oldest["timestamp"]) and \
+            (after_seq is None or oldest is None or after_seq < oldest["seq"] - 1)
+        if self.history_path and reaches_back:
+            first_in_memory = oldest["seq"] if oldest else self._next_seq
+            history = (finding for finding in self._history(first_in_memory) if matches(finding))
+            if not limit:
+                older = list(history)
+            elif newest_first:
+                # Only the last few older ones can make the cut; keep no more
+                older = list(deque(history, maxlen=limit - len(found)))
+            else:
+                older = list(islice(history, limit))
+            found = older + found
+        if not limit:
+            return found
+        return found[-limit:] if newest_first else found[:limit]
+
+    def _history(self, before_seq: int) -> Iterator[Dict[str, Any]]:
+        """Findings from the history file numbered below ``before_seq``"""
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        finding = json.loads(line)
+                    except ValueError:
+                        continue
+                    if finding["seq"] >= before_seq:
+                        return
+                    yield finding
+        except FileNotFoundError:
+            return
+
+    def __len__(self) -> int:
+        """Findings held in memory"""
+        with self._lock:
+            return len(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_memory": len(self._recent),
+                "max_recent": self._recent.maxlen,
+                "total": self._next_seq,
+                "history_path": str(self.history_path) if self.history_path else None
+            }
@@ -1,51 +1,376 @@
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from alert_system import AlertSystem
-from dlp_engine import DLPEngine
+from dlp_engine import DLPEngine, READ_BLOCK_SIZE
+from findings_store import FindingsStore, DEFAULT_MAX_RECENT
+from ai_components.line_index import LineIndex
+from monitor_dispatcher import MonitorDispatcher
+from monitor_queue import ChangeQueue, DEFAULT_DEBOUNCE
+from tail_cursors import TailCursors
 import os
-import re
 import logging
+import sys
 import time
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # Optional: without it the monitor polls every scan_interval
+    FileSystemEventHandler = object
+    Observer = None
+
+SCANNED_SUFFIXES = (".txt", ".log", ".csv", ".json")
+# Append-only files: only what was added since the last scan is read
+TAILED_SUFFIXES = (".log",)
+# Changed paths held between scans; past this the queue counts as overflowed
+# and the next pass reconciles by walking the scan paths instead
+DEFAULT_MAX_PENDING_EVENTS = 10000
+# Files scanned at once; while all are busy, new events wait (and coalesce) in the queue
+DEFAULT_SCAN_WORKERS = 4
+# Log cursors are written at most this often (seconds) while running, and on stop
+CURSOR_SAVE_INTERVAL = 1.0
+# Longest stop() waits for running scans before saving the log cursors
+STOP_TIMEOUT = 30.0
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Forwards the paths of watchdog events to the monitor's change queue
+
+    Deleted and moved-away paths are queued too; scanning them finds them
+    gone and drops them from the monitor's bookkeeping.
+    """
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def on_created(self, event):
+        self.monitor.changes.put(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.monitor.changes.put(event.src_path)
+
+    def on_moved(self, event):
+        self.monitor.changes.put(event.src_path)
+        self.monitor.changes.put(event.dest_path)
+
+    def on_deleted(self, event):
+        self.monitor.changes.put(event.src_path)
+
+
 class BootnetMonitor:
-    LEAKAGE_PATTERNS = {
-        "EMAIL": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-        "PASSWORD": r"password\s*=\s*[\"'].*?[\"']",
-        "API_KEY": r"(sk|api|key|token)[_=:\s\"']+[A-Za-z0-9_\-]{12,40}",
-        "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b"
-    }
-
-    def __init__(self, alert_config: dict, scan_paths=None, scan_interval=30):
+    def __init__(self, alert_config: dict, scan_paths=None, scan_interval=30, pattern_registry=None,
+                 event_driven=True, max_pending_events=DEFAULT_MAX_PENDING_EVENTS, cursor_path=None,
+                 debounce=DEFAULT_DEBOUNCE, scan_workers=DEFAULT_SCAN_WORKERS, executor=None,
+                 max_findings=DEFAULT_MAX_RECENT, findings_path=None, engine=None, observer=None,
+                 dispatcher=None):
         self.alert_system = AlertSystem(alert_config)
-        self.ai_model = DLPEngine(alert_config)
+        # An engine (and so compiled patterns) may be shared between monitors
+        self.ai_model = engine or DLPEngine(alert_config, pattern_registry)
+        # Same compiled, hot-reloaded patterns as the engine's file scans
+        self.pattern_registry = self.ai_model.pattern_registry
         self.scan_paths = scan_paths or ["./data"]
         self.scan_interval = scan_interval
         self.running = False
-        self.findings = []
+        # Recent findings in memory, all of them in findings_path (JSONL) if given
+        self.findings = FindingsStore(max_findings, findings_path)
         self.lock = threading.Lock()
+        # Scan on filesystem events (needs watchdog) rather than re-walking every scan_interval
+        self.event_driven = event_driven and Observer is not None
+        # A running observer shared with other monitors, or None to run our own
+        self.observer = observer
+        self._own_observer = observer is None
+        self._handler = _ChangeHandler(self)
+        self._watches = []
+        # A running dispatcher shared with other monitors, or None to run our own
+        self.dispatcher = dispatcher
+        self._own_dispatcher = dispatcher is None
+        self.started_at = None
+        # Changed paths, coalesced until quiet for `debounce` seconds
+        self.changes = ChangeQueue(debounce, max_pending_events, on_ready=self._wake)
+        # Scans run on `executor` if given (e.g. shared between monitors), else
+        # on a pool of our own; at most `scan_workers` at a time either way
+        self.scan_workers = scan_workers
+        self._executor = executor
+        self._own_executor = None
+        self._in_flight = set()
+        # Reconciliation in progress: the walk's remaining files, and those it found
+        self._walk = None
+        self._present = set()
+        self._next_poll = 0.0
+        self._next_save = 0.0
+        self._pattern_set = None
+        # (mtime, size) of every file as last scanned, so unchanged files are skipped
+        self._seen = {}
+        self._state_lock = threading.Lock()
+        # Notified whenever the last in-flight scan finishes
+        self._idle = threading.Condition(self._state_lock)
+        self._scan_counters = {"scans": 0, "lag_total": 0.0, "lag_max": 0.0, "requeued": 0}
+        # Read positions in logs, kept across restarts if cursor_path is given
+        self.tail_cursors = TailCursors(cursor_path)
+        self._own_files = {os.path.abspath(cursor_path), os.path.abspath(cursor_path) + ".tmp"} \
+            if cursor_path else set()
         self.logger = logging.getLogger("BootnetMonitor")
         if not self.logger.handlers:
             handler = logging.StreamHandler()
             handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
+        if event_driven and Observer is None:
+            self.logger.warning("watchdog not installed; polling scan paths instead")
 
     def start(self):
         self.running = True
-        thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        thread.start()
-        self.logger.info("BootnetMonitor started in background thread")
+        self.started_at = time.time()
+        self._pattern_set = self.pattern_registry.current
+        if self._executor is None:
+            self._own_executor = ThreadPoolExecutor(max_workers=self.scan_workers,
+                                                    thread_name_prefix="BootnetMonitorScan")
+        if self._own_dispatcher:
+            self.dispatcher = MonitorDispatcher()
+        if self.event_driven:
+            if self._own_observer:
+                self.observer = Observer()
+            for path in self.scan_paths:
+                if os.path.isdir(path):
+                    self._watches.append(self.observer.schedule(self._handler, path, recursive=True))
+                else:
+                    self.logger.warning(f"Scan path not found: {path}")
+            # Watching before the baseline walk, so nothing written during it is missed
+            if self._own_observer:
+                self.observer.start()
+            # The baseline walk is simply a first reconciliation
+            self.changes.overflow()
+        self.dispatcher.add(self)
+        self.logger.info("BootnetMonitor started")
 
-    def stop(self):
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Stop watching and dispatching, then save the log cursors
+
+        Scans already running are given up to ``timeout`` seconds to finish
+        first, so the saved cursors include what they read.
+        """
         self.running = False
+        if self.dispatcher is not None:
+            self.dispatcher.remove(self)
+            if self._own_dispatcher:
+                self.dispatcher.stop()
+        if self._own_observer and self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+        else:
+            # Others may watch the same path; only our handler goes
+            for watch in self._watches:
+                self.observer.remove_handler_for_watch(self._handler, watch)
+        self._watches = []
+        self.changes.close()
+        # Nothing new is submitted once out of the dispatcher
+        with self._idle:
+            if not self._idle.wait_for(lambda: not self._in_flight, timeout):
+                self.logger.warning(f"{len(self._in_flight)} scans still running at stop; "
+                                    "their log reads are not saved")
+        self.tail_cursors.save()
+        if self._own_executor is not None:
+            self._own_executor.shutdown(wait=False)
         self.logger.info("BootnetMonitor stopped")
 
-    def _monitor_loop(self):
-        while self.running:
-            new_findings = self.scan_directories()
-            if new_findings:
-                self.report_findings(new_findings)
-            time.sleep(self.scan_interval)
+    def join(self, timeout=None):
+        """Wait for the monitor's own dispatcher thread to finish after stop()"""
+        if self._own_dispatcher and self.dispatcher is not None:
+            self.dispatcher.join(timeout)
+
+    def _wake(self):
+        if self.dispatcher is not None:
+            self.dispatcher.wake()
+
+    def pump(self):
+        """Hand ready work to the scan workers without blocking; called by the dispatcher
+
+        Event-driven, that is the paths events named once they went quiet,
+        or a reconciliation (a walk of all scan paths) when the queue
+        overflowed. Polling, it is a reconciliation every scan_interval.
+        Only as many files as there are free worker slots are submitted;
+        the rest waits (and coalesces) in the queue or the walk until a
+        scan finishes and wakes the dispatcher. Returns when to be called
+        again (monotonic time).
+        """
+        if not self.running:
+            return None
+        now = time.monotonic()
+        self.pattern_registry.maybe_reload()
+        current = self.pattern_registry.current
+        if current is not self._pattern_set:
+            # New patterns (possibly reloaded by another monitor on the engine):
+            # every file needs scanning again
+            self._pattern_set = current
+            self._forget_all()
+            self._begin_reconcile()
+        if not self.event_driven and now >= self._next_poll:
+            self._next_poll = now + self.scan_interval
+            self._begin_reconcile()
+        wake_at = self._next_poll if not self.event_driven else now + self.scan_interval
+        if self._walk is None:
+            free = self._free_slots()
+            if free:
+                paths, reconcile, due = self.changes.poll(free)
+                if reconcile:
+                    self._begin_reconcile()
+                for path, first_seen in paths.items():
+                    self._submit(path, first_seen)
+                if due is not None:
+                    wake_at = min(wake_at, due)
+        if self._walk is not None:
+            self._continue_reconcile()
+        if now >= self._next_save:
+            self._next_save = now + CURSOR_SAVE_INTERVAL
+            self.tail_cursors.save()
+        return wake_at
+
+    def _free_slots(self):
+        with self._state_lock:
+            return self.scan_workers - len(self._in_flight)
+
+    def _submit(self, path, first_seen):
+        """Scan a path on the worker pool; the caller checks there is a free slot"""
+        with self._state_lock:
+            busy = path in self._in_flight
+            if not busy:
+                self._in_flight.add(path)
+        if busy:
+            # Changed again while being scanned: scan once more after this scan
+            with self._state_lock:
+                self._scan_counters["requeued"] += 1
+            self.changes.put(path, first_seen)
+            return
+        executor = self._executor or self._own_executor
+        try:
+            executor.submit(self._scan_job, path, first_seen)
+        except RuntimeError:
+            # Executor shut down by stop()
+            with self._state_lock:
+                self._discard_in_flight(path)
+
+    def _scan_job(self, path, first_seen):
+        try:
+            findings = self._scan_changed(path)
+            if findings:
+                self.report_findings(findings)
+        except Exception as e:
+            self.logger.warning(f"Scan of {path} failed: {e}")
+        finally:
+            lag = time.monotonic() - first_seen
+            with self._state_lock:
+                self._discard_in_flight(path)
+                counters = self._scan_counters
+                counters["scans"] += 1
+                counters["lag_total"] += lag
+                counters["lag_max"] = max(counters["lag_max"], lag)
+            # A slot is free: the dispatcher may have work waiting for it
+            self._wake()
+
+    def _discard_in_flight(self, path):
+        """Under _state_lock: the scan of ``path`` is over"""
+        self._in_flight.discard(path)
+        if not self._in_flight:
+            self._idle.notify_all()
+
+    def metrics(self):
+        """Change queue, worker pool and scan lag (first event to scan done) counters"""
+        with self._state_lock:
+            counters = dict(self._scan_counters)
+            in_flight = len(self._in_flight)
+        scans = counters.pop("scans")
+        lag_total = counters.pop("lag_total")
+        return {
+            "queue": self.changes.metrics(),
+            "scan_workers": self.scan_workers,
+            "in_flight": in_flight,
+            "scans": scans,
+            "scans_per_second": round(scans / (time.time() - self.started_at), 2) if self.started_at else None,
+            "requeued": counters["requeued"],
+            "avg_lag_seconds": round(lag_total / scans, 4) if scans else None,
+            "max_lag_seconds": round(counters["lag_max"], 4),
+            "findings": self.findings.stats()
+        }
+
+    def _forget(self, path):
+        self.tail_cursors.forget(path)
+        prefix = os.path.join(path, "")
+        with self._state_lock:
+            self._seen.pop(path, None)
+            gone = [seen for seen in self._seen if seen.startswith(prefix)]
+            for seen in gone:
+                del self._seen[seen]
+        for seen in gone:
+            self.tail_cursors.forget(seen)
+
+    def _forget_all(self):
+        with self._state_lock:
+            self._seen.clear()
+
+    def _scan_changed(self, path):
+        """Scan a file (or the files under a directory) unless unchanged since last scanned"""
+        if os.path.isdir(path):
+            findings = []
+            for root, _dirs, files in os.walk(path):
+                for file in files:
+                    findings.extend(self._scan_changed(os.path.join(root, file)))
+            return findings
+        if not path.lower().endswith(SCANNED_SUFFIXES) or \
+                self._own_files and os.path.abspath(path) in self._own_files:
+            return []
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            self._forget(path)
+            return []
+        signature = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._state_lock:
+            if self._seen.get(path) == signature:
+                return []
+            self._seen[path] = signature
+        return self.scan_file(Path(path))
+
+    def _begin_reconcile(self):
+        """Start walking all scan paths, to scan files that are new or changed and forget deleted ones
+
+        The walk goes on over as many pump() calls as it takes to submit
+        every file through the worker pool, like event-driven scans;
+        findings are reported as each file is done.
+        """
+        self.logger.info("Reconciling scan paths")
+        self._walk = self._walk_files()
+        self._present = set()
+
+    def _walk_files(self):
+        for path in self.scan_paths:
+            if not os.path.exists(path):
+                self.logger.warning(f"Scan path not found: {path}")
+                continue
+            for root, _dirs, files in os.walk(path):
+                for file in files:
+                    yield os.path.join(root, file)
+
+    def _continue_reconcile(self):
+        """Submit walked files while worker slots are free; once the walk ends, forget deleted files"""
+        while self.running and self._free_slots():
+            file_path = next(self._walk, None)
+            if file_path is None:
+                break
+            self._present.add(file_path)
+            if file_path.lower().endswith(SCANNED_SUFFIXES):
+                self._submit(file_path, time.monotonic())
+        else:
+            return
+        self._walk = None
+        with self._state_lock:
+            gone = set(self._seen) - self._present
+            for path in gone:
+                del self._seen[path]
+        for path in gone:
+            self.tail_cursors.forget(path)
+        self._present = set()
 
     def scan_directories(self):
         all_findings = []
@@ -53,7 +378,7 @@ class BootnetMonitor:
             if not os.path.exists(path):
                 self.logger.warning(f"Scan path not found: {path}")
                 continue
-            for root, dirs, files in os.walk(path):
+            for root, _dirs, files in os.walk(path):
                 for file in files:
                     file_path = Path(root) / file
                     results = self.scan_file(file_path)
@@ -63,31 +388,80 @@ class BootnetMonitor:
     def scan_file(self, file_path: Path):
         findings = []
         try:
-            if not file_path.suffix.lower() in [".txt", ".log", ".csv", ".json"]:
+            suffix = file_path.suffix.lower()
+            if not suffix in SCANNED_SUFFIXES:
                 return []
+            if suffix in TAILED_SUFFIXES:
+                return self._scan_appended(file_path)
 
-            with open(file_path, "r", errors="ignore") as f:
-                for idx, line in enumerate(f, start=1):
-                    for label, pattern in self.LEAKAGE_PATTERNS.items():
-                        matches = re.findall(pattern, line)
-                        if matches:
-                            confidence = self.ai_model.analyze(line)["confidence"]
-                            finding = {
-                                "file": str(file_path),
-                                "line": idx,
-                                "pattern_type": label,
-                                "matches": matches,
-                                "confidence": confidence,
-                                "snippet": line.strip()
-                            }
-                            self.ai_model.add_training_sample(line, label)
-                            findings.append(finding)
+            with open(file_path, "rb") as f:
+                for content, first_line in self._read_lines(f):
+                    findings.extend(self._content_findings(file_path, content, first_line))
         except Exception as e:
             self.logger.warning(f"Skipped file {file_path}: {e}")
         return findings
 
+    @staticmethod
+    def _read_lines(f):
+        """Yield (text, number of lines before it) for a file, a block of whole lines at a time
+
+        Blocks end at a newline, so no line or character is split between
+        them; only a line longer than a block is. Undecodable bytes are
+        dropped.
+        """
+        first_line = 0
+        carry = b""
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            data = carry + block
+            if not data:
+                return
+            end = data.rfind(b"\n") + 1 if block else len(data)
+            if not end:
+                end = len(data)
+            content = data[:end].decode("utf-8", errors="ignore")
+            carry = data[end:]
+            yield content, first_line
+            first_line += content.count("\n")
+
+    def _scan_appended(self, file_path: Path):
+        """Scan the lines appended to a log since it was last scanned"""
+        content, first_line, unread = self.tail_cursors.read_new(str(file_path))
+        if unread:
+            # More than one read's worth was appended: scan the rest next pass
+            with self._state_lock:
+                self._seen.pop(str(file_path), None)
+            if self.event_driven:
+                self.changes.put(str(file_path))
+        return self._content_findings(file_path, content, first_line) if content else []
+
+    def _content_findings(self, file_path: Path, content: str, first_line: int = 0):
+        """One finding per pattern and line; ``first_line`` lines precede ``content`` in the file"""
+        findings = []
+        # One pass over the whole text; line numbers only for what matched,
+        # but for every match, so no matching line goes unreported
+        classification = self.ai_model.content_classifier.classify_content(
+            content, str(file_path), locations=True, max_locations=sys.maxsize
+        )
+        lines = LineIndex(content)
+        for detected in classification["detected_patterns"]:
+            by_line = {}
+            for location in detected.get("locations", []):
+                by_line.setdefault(location["line"], []).append(location)
+            for idx, locations in by_line.items():
+                findings.append({
+                    "file": str(file_path),
+                    "line": first_line + idx,
+                    "column": locations[0]["column"],
+                    "pattern_type": detected["type"],
+                    "matches": [content[location["offset"]:location["end"]] for location in locations],
+                    "confidence": classification["confidence"],
+                    "snippet": lines.line(idx).strip()
+                })
+        return findings
+
     def report_findings(self, findings):
+        findings = self.findings.add(findings)
         with self.lock:
-            self.findings.extend(findings)
             for f in findings:
                 self.alert_system.send_alert(f, event_type="bootnet_event")
@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+from typing import List
+
+# Longest the dispatcher sleeps when no monitor asked to be called sooner
+DEFAULT_IDLE_WAIT = 5.0
+
+
+class MonitorDispatcher:
+    """
+    One thread handing the changed paths of any number of monitors to their scan workers.
+
+    Each round calls every monitor's ``pump()``, which submits what it can
+    without blocking and returns when it next wants to be called
+    (monotonic time, or None). Between rounds the thread sleeps until the
+    earliest of those times or until :meth:`wake` is called, e.g. by a
+    change queue that got a path or a scan that freed a worker slot.
+    """
+
+    def __init__(self, idle_wait: float = DEFAULT_IDLE_WAIT):
+        self.idle_wait = idle_wait
+        self.logger = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+        # Held for a whole round, so remove() can wait until a monitor is out of it
+        self._round = threading.Lock()
+        self._monitors: List = []
+        self._woken = False
+        self._stopped = False
+        self._thread = None
+
+    def add(self, monitor) -> None:
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Dispatcher is stopped")
+            self._monitors.append(monitor)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="MonitorDispatcher", daemon=True)
+                self._thread.start()
+            self._wake()
+
+    def remove(self, monitor) -> None:
+        """Stop pumping ``monitor``; once this returns, no call of its pump() is running"""
+        with self._cond:
+            if monitor in self._monitors:
+                self._monitors.remove(monitor)
+        if threading.current_thread() is not self._thread:
+            with self._round:
+                pass
+
+    def wake(self) -> None:
+        """Start another round as soon as the current one (if any) is done"""
+        with self._cond:
+            self._wake()
+
+    def _wake(self) -> None:
+        self._woken = True
+        self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def join(self, timeout=None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                self._woken = False
+                monitors = list(self._monitors)
+            wake_at = time.monotonic() + self.idle_wait
+            with self._round:
+                for monitor in monitors:
+                    try:
+                        due = monitor.pump()
+                    except Exception as e:
+                        self.logger.error(f"Monitor dispatch failed: {str(e)}")
+                        continue
+                    if due is not None:
+                        wake_at = min(wake_at, due)
+            with self._cond:
+                if not self._woken and not self._stopped:
+                    self._cond.wait(max(0.0, wake_at - time.monotonic()))
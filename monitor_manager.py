@@ -0,0 +1,187 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dlp_engine import DLPEngine
+from monitor import BootnetMonitor, Observer
+from monitor_dispatcher import MonitorDispatcher
+
+try:
+    import fcntl
+except ImportError:  # Optional: without it (Windows) the state directory is not locked
+    fcntl = None
+
+# Scans running at once across all sessions
+DEFAULT_POOL_WORKERS = 8
+# Session names end up in state file names
+SESSION_NAME = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+
+class _SharedObserver:
+    """
+    One watchdog observer for every session.
+
+    Sessions watching the same directory share its watch; it is removed
+    once the last session's handler is.
+    """
+
+    def __init__(self):
+        self.observer = Observer()
+        self._lock = threading.Lock()
+        self._users = Counter()
+        self._stopped = False
+        self.observer.start()
+
+    def schedule(self, handler, path, recursive=False):
+        with self._lock:
+            watch = self.observer.schedule(handler, path, recursive=recursive)
+            self._users[watch] += 1
+            return watch
+
+    def remove_handler_for_watch(self, handler, watch):
+        with self._lock:
+            if self._stopped:
+                # Stopping the observer already dropped every watch
+                return
+            self.observer.remove_handler_for_watch(handler, watch)
+            self._users[watch] -= 1
+            if self._users[watch] <= 0:
+                del self._users[watch]
+                self.observer.unschedule(watch)
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self.observer.stop()
+        self.observer.join()
+
+
+class MonitorManager:
+    """
+    Named monitor sessions running in this process.
+
+    Every session is a :class:`BootnetMonitor` over its own paths, but they
+    all use one engine (so one compiled, hot-reloaded pattern set), one
+    scan thread pool, one filesystem observer and one dispatcher thread,
+    so a session adds no threads of its own. With a ``state_dir``,
+    sessions keep their log cursors and findings history there, under
+    their name.
+
+    Sessions live in this process only, so the app must serve all monitor
+    requests from one process (e.g. gunicorn ``--workers 1 --threads N``).
+    The first manager to start a session locks the state directory; in any
+    other process ``start`` raises RuntimeError rather than run a second
+    copy of a session over the same state files.
+    """
+
+    def __init__(self, engine: DLPEngine, alert_config: Optional[Dict[str, Any]] = None,
+                 pool_workers: int = DEFAULT_POOL_WORKERS, state_dir: Optional[str] = None):
+        self.engine = engine
+        self.alert_config = alert_config or {}
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, BootnetMonitor] = {}
+        self._executor = ThreadPoolExecutor(max_workers=pool_workers,
+                                            thread_name_prefix="MonitorScan")
+        self._observer = None
+        self._dispatcher = MonitorDispatcher()
+        self._state_lock_file = None
+
+    def _lock_state_dir(self) -> None:
+        """Make sure no other process runs sessions over the same state directory"""
+        if self._state_lock_file is not None or not self.state_dir or fcntl is None:
+            return
+        self.state_dir.mkdir(exist_ok=True, parents=True)
+        lock_file = open(self.state_dir / "manager.lock", "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.seek(0)
+            owner = lock_file.read().strip() or "unknown"
+            lock_file.close()
+            raise RuntimeError(f"Monitor sessions run in another process (pid {owner}); "
+                               "serve the app from a single worker process")
+        lock_file.truncate(0)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._state_lock_file = lock_file
+
+    def start(self, name: str, paths: List[str], **options: Any) -> Dict[str, Any]:
+        """Start a session watching ``paths``; ``options`` go to BootnetMonitor
+
+        Raises ValueError for a bad name or one that is already running, and
+        RuntimeError if another process runs the sessions.
+        """
+        if not SESSION_NAME.match(name):
+            raise ValueError(f"Invalid session name: {name!r}")
+        with self._lock:
+            self._lock_state_dir()
+            current = self._sessions.get(name)
+            if current is not None and current.running:
+                raise ValueError(f"Session already running: {name}")
+            if self._observer is None and Observer is not None:
+                self._observer = _SharedObserver()
+            if self.state_dir:
+                options.setdefault("cursor_path", str(self.state_dir / f"{name}.cursors.json"))
+                options.setdefault("findings_path", str(self.state_dir / f"{name}.findings.jsonl"))
+            session = BootnetMonitor(self.alert_config, scan_paths=list(paths), engine=self.engine,
+                                     executor=self._executor, observer=self._observer,
+                                     dispatcher=self._dispatcher, **options)
+            self._sessions[name] = session
+            session.start()
+        self.logger.info(f"Monitor session {name} started for {', '.join(paths)}")
+        return self.status(name)
+
+    def stop(self, name: str) -> Dict[str, Any]:
+        """Stop a session; it stays listed, with its final stats, until started again"""
+        session = self.get(name)
+        session.stop()
+        self.logger.info(f"Monitor session {name} stopped")
+        return self.status(name)
+
+    def get(self, name: str) -> BootnetMonitor:
+        """The session called ``name``; raises KeyError if there is none"""
+        with self._lock:
+            if name not in self._sessions:
+                raise KeyError(name)
+            return self._sessions[name]
+
+    def status(self, name: str) -> Dict[str, Any]:
+        session = self.get(name)
+        return {
+            "name": name,
+            "running": session.running,
+            "paths": session.scan_paths,
+            "event_driven": session.event_driven,
+            "started_at": session.started_at,
+            "uptime_seconds": round(time.time() - session.started_at, 1) if session.started_at else None,
+            "metrics": session.metrics()
+        }
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            names = sorted(self._sessions)
+        return [self.status(name) for name in names]
+
+    def shutdown(self) -> None:
+        """Stop every session, the dispatcher, the observer and the scan pool"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            if session.running:
+                session.stop()
+        self._dispatcher.stop()
+        self._executor.shutdown(wait=True)
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._state_lock_file is not None:
+            self._state_lock_file.close()
+            self._state_lock_file = None
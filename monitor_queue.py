@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Seconds a path must go without events before it is handed out, so a file
+# written in many small writes is scanned once, after the last of them
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_PENDING = 10000
+
+
+class ChangeQueue:
+    """
+    Debouncing, coalescing queue of changed paths.
+
+    Repeated events for a path already queued only move its quiet period
+    forward. Paths are kept in order of their last event, so the ones
+    ready to hand out are always at the front. When more than
+    ``max_pending`` distinct paths are waiting the queue overflows: it
+    drops them all and tells the consumer to reconcile (rescan everything
+    that changed) instead.
+
+    A consumer can block in :meth:`take`, or poll without blocking and
+    have ``on_ready`` called whenever the queue gets something new for it.
+    """
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE, max_pending: int = DEFAULT_MAX_PENDING,
+                 on_ready: Optional[Callable[[], None]] = None):
+        self.debounce = debounce
+        self.max_pending = max_pending
+        self.on_ready = on_ready
+        self._cond = threading.Condition()
+        # path -> (time of its first event, time of its last event)
+        self._pending: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self._overflowed = False
+        self._closed = False
+        self._counters = {"events": 0, "coalesced": 0, "dropped": 0, "overflows": 0, "peak_depth": 0}
+
+    def put(self, path: str, first_seen: Optional[float] = None) -> bool:
+        """Queue a changed path; False if it was dropped because the queue overflowed"""
+        now = time.monotonic()
+        with self._cond:
+            self._counters["events"] += 1
+            if self._overflowed:
+                self._counters["dropped"] += 1
+                return False
+            entry = self._pending.pop(path, None)
+            if entry is not None:
+                self._counters["coalesced"] += 1
+                self._pending[path] = (entry[0], now)
+                return True
+            if len(self._pending) >= self.max_pending:
+                self._counters["dropped"] += len(self._pending) + 1
+                self._counters["overflows"] += 1
+                self._pending.clear()
+                self._overflowed = True
+                self._notify()
+                return False
+            self._pending[path] = (now if first_seen is None else first_seen, now)
+            self._counters["peak_depth"] = max(self._counters["peak_depth"], len(self._pending))
+            if len(self._pending) == 1:
+                # Otherwise the consumer is already waiting on an earlier path
+                self._notify()
+            return True
+
+    def _notify(self) -> None:
+        self._cond.notify()
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def overflow(self) -> None:
+        """Ask the consumer for a reconciliation, as if the queue had overflowed"""
+        with self._cond:
+            self._pending.clear()
+            self._overflowed = True
+            self._notify()
+
+    def _ready(self, now: float, limit: Optional[int]) -> Dict[str, float]:
+        ready = {}
+        while self._pending and (limit is None or len(ready) < limit):
+            path, (first, last) = next(iter(self._pending.items()))
+            if now - last < self.debounce:
+                break
+            del self._pending[path]
+            ready[path] = first
+        return ready
+
+    def _due(self) -> Optional[float]:
+        """When the path at the front goes quiet (monotonic time), if any is queued"""
+        if not self._pending:
+            return None
+        return next(iter(self._pending.values()))[1] + self.debounce
+
+    def take(self, timeout: float) -> Tuple[Dict[str, float], bool]:
+        """Wait up to ``timeout`` seconds for paths that went quiet
+
+        Returns ({path: time of its first event}, whether to reconcile).
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._closed:
+                if self._overflowed:
+                    self._overflowed = False
+                    return {}, True
+                now = time.monotonic()
+                ready = self._ready(now, None)
+                if ready:
+                    return ready, False
+                if now >= deadline:
+                    break
+                due = self._due()
+                self._cond.wait((deadline if due is None else min(deadline, due)) - now)
+        return {}, False
+
+    def poll(self, limit: Optional[int] = None) -> Tuple[Dict[str, float], bool, Optional[float]]:
+        """Like :meth:`take`, without waiting and for at most ``limit`` paths
+
+        Also returns when the next queued path goes quiet (monotonic time),
+        or None if nothing else is queued.
+        """
+        with self._cond:
+            if self._closed:
+                return {}, False, None
+            if self._overflowed:
+                self._overflowed = False
+                return {}, True, None
+            ready = self._ready(time.monotonic(), limit)
+            return ready, False, self._due()
+
+    def close(self) -> None:
+        """Wake the consumer and make every further take return nothing"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self._counters, depth=len(self._pending), overflowed=self._overflowed)
@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Set, Tuple
+
+
+class ScanIndex:
+    """
+    Persistent SQLite index of scanned files.
+
+    Each path is stored with the (device, inode, size, mtime_ns) tuple it had
+    when it was last scanned, its SHA-256 and the scan result, so unchanged
+    files can be skipped on the next incremental scan. Results are only
+    valid for the detection rules that produced them; see :meth:`bind_ruleset`.
+    """
+
+    COMMIT_EVERY = 1000
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_index (
+                path TEXT PRIMARY KEY,
+                device INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT,
+                result TEXT,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scan_index_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _stat_key(file_stat: os.stat_result) -> Tuple[int, int, int, int]:
+        return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+    def lookup(self, path: str, file_stat: os.stat_result) -> Tuple[bool, Any]:
+        """Return (True, last result) if the file is unchanged since it was indexed
+
+        The stored result is None for files the scanner skipped as binary.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT device, inode, size, mtime_ns, result FROM scan_index WHERE path = ?",
+                (path,)
+            ).fetchone()
+
+        if row is None or tuple(row[:4]) != self._stat_key(file_stat):
+            return False, None
+
+        try:
+            return True, json.loads(row[4]) if row[4] else None
+        except ValueError:
+            return False, None
+
+    def store(self, path: str, file_stat: os.stat_result, result: Any,
+              sha256: Optional[str] = None) -> None:
+        """Record the JSON-serializable scan result for a file and the stat tuple it was scanned at"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scan_index "
+                "(path, device, inode, size, mtime_ns, sha256, result, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, *self._stat_key(file_stat), sha256,
+                 json.dumps(result) if result else None, time.time())
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= self.COMMIT_EVERY:
+                self._commit_locked()
+
+    def prune(self, root: str, seen: Set[str]) -> int:
+        """Drop the rows of paths below ``root`` that a complete walk of it did not yield
+
+        Such files were deleted, moved or excluded since they were indexed.
+        Returns the number of rows dropped.
+        """
+        prefix = os.path.join(root, '')
+        # Every path starting with the prefix, as a range over the primary key
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self._lock:
+            stale = [(path,) for (path,) in self._conn.execute(
+                "SELECT path FROM scan_index WHERE path >= ? AND path < ?", (prefix, upper)
+            ) if path not in seen]
+            if stale:
+                self._conn.executemany("DELETE FROM scan_index WHERE path = ?", stale)
+                self._commit_locked()
+        return len(stale)
+
+    def bind_ruleset(self, fingerprint: str) -> bool:
+        """Tie indexed results to a ruleset, dropping those of any other
+
+        Returns True if results indexed under a different ruleset were cleared.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM scan_index_meta WHERE key = 'ruleset'"
+            ).fetchone()
+            if row is not None and row[0] == fingerprint:
+                return False
+            self._conn.execute("DELETE FROM scan_index")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scan_index_meta (key, value) VALUES ('ruleset', ?)",
+                (fingerprint,)
+            )
+            self._commit_locked()
+            return row is not None
+
+    def commit(self) -> None:
+        """Flush pending index writes"""
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        try:
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.error(f"Scan index commit failed: {str(e)}")
+        self._pending_writes = 0
+
+    def count(self) -> int:
+        """Number of indexed paths"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scan_index").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit_locked()
+            self._conn.close()
@@ -0,0 +1,213 @@
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Pattern types and keywords are interned to small ints shared by every
+# result in the process; records keep the ints, not the strings.
+_finding_names: List[Tuple[str, str]] = []
+_finding_ids: Dict[Tuple[str, str], int] = {}
+_intern_lock = threading.Lock()
+
+PATTERN = 'type'
+KEYWORD = 'keyword'
+
+# Classification keys that are represented by record slots
+_CLASSIFICATION_KEYS = frozenset({'is_sensitive', 'confidence', 'detected_patterns', 'risk_level'})
+_FINDING_KEYS = frozenset({'type', 'keyword', 'count', 'sample'})
+
+
+def intern_finding(kind: str, name: str) -> int:
+    """Return the small-int id for a (kind, name) finding label"""
+    key = (kind, name)
+    finding_id = _finding_ids.get(key)
+    if finding_id is None:
+        with _intern_lock:
+            finding_id = _finding_ids.setdefault(key, len(_finding_names))
+            if finding_id == len(_finding_names):
+                _finding_names.append(key)
+    return finding_id
+
+
+def finding_label(finding_id: int) -> Tuple[str, str]:
+    return _finding_names[finding_id]
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+class ScanResult:
+    """
+    Compact per-file scan result.
+
+    Timestamps are epoch floats, the hash is the raw digest and findings are
+    tuples of (interned type id, count, sample, extra). The JSON shape the
+    API has always returned is produced on demand by :meth:`to_dict`.
+    """
+
+    __slots__ = ('path', 'size', 'modified', 'created', 'digest', 'scan_timestamp',
+                 'sensitive', 'risk_level', 'confidence', 'findings', 'extra',
+                 'error', 'issue')
+
+    def __init__(self, path: str, size: int = 0, modified: Optional[float] = None,
+                 created: Optional[float] = None, digest: bytes = b'',
+                 scan_timestamp: Optional[float] = None, sensitive: bool = False,
+                 risk_level: str = 'low', confidence: float = 0.0, findings: tuple = (),
+                 extra: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+                 issue: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.modified = modified
+        self.created = created
+        self.digest = digest
+        self.scan_timestamp = scan_timestamp
+        self.sensitive = sensitive
+        self.risk_level = risk_level
+        self.confidence = confidence
+        self.findings = findings
+        self.extra = extra
+        self.error = error
+        self.issue = issue
+
+    @classmethod
+    def failure(cls, path: str, error: str, issue: Optional[str] = None) -> 'ScanResult':
+        """Result for a file (or target) that could not be scanned"""
+        return cls(path, error=error, issue=issue)
+
+    def set_classification(self, classification: Dict[str, Any]) -> None:
+        """Store a classifier result; only sensitive results keep their details"""
+        if classification.get('error'):
+            # Not classified: a failure, so it is neither cached nor indexed as clean
+            self.error = classification['error']
+            self.issue = 'Classification failed'
+            return
+        if not classification.get('is_sensitive'):
+            # A clean result is still incomplete if patterns ran out of time
+            if classification.get('timed_out'):
+                self.extra = {'timed_out': classification['timed_out']}
+            return
+
+        self.sensitive = True
+        self.risk_level = classification.get('risk_level', 'low')
+        self.confidence = classification.get('confidence', 0.0)
+
+        findings = []
+        for pattern in classification.get('detected_patterns', []):
+            if 'type' in pattern:
+                finding_id = intern_finding(PATTERN, pattern['type'])
+            else:
+                finding_id = intern_finding(KEYWORD, pattern.get('keyword', 'unknown'))
+            extra = {k: v for k, v in pattern.items() if k not in _FINDING_KEYS} or None
+            findings.append((finding_id, pattern.get('count', 0), pattern.get('sample'), extra))
+        self.findings = tuple(findings)
+
+        extra = {k: v for k, v in classification.items()
+                 if k not in _CLASSIFICATION_KEYS and not (k == 'details' and not v)}
+        self.extra = extra or None
+
+    @property
+    def sha256(self) -> Optional[str]:
+        return self.digest.hex() if self.digest else None
+
+    @property
+    def timed_out(self) -> List[str]:
+        """Patterns that ran out of regex time, so their counts are partial"""
+        return self.extra.get('timed_out', []) if self.extra else []
+
+    def pattern_names(self) -> List[str]:
+        return [finding_label(finding[0])[1] for finding in self.findings]
+
+    def _detected_patterns(self) -> List[Dict[str, Any]]:
+        detected = []
+        for finding_id, count, sample, extra in self.findings:
+            kind, name = finding_label(finding_id)
+            entry = {kind: name, 'count': count}
+            if kind == PATTERN:
+                entry['sample'] = sample
+            if extra:
+                entry.update(extra)
+            detected.append(entry)
+        return detected
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the JSON shape returned by the API"""
+        if self.error is not None:
+            result = {'path': self.path, 'error': self.error}
+            if self.issue is not None:
+                result['sensitive_content'] = False
+                result['issues'] = [self.issue]
+            return result
+
+        issues = []
+        classification_details = {}
+        if self.sensitive:
+            detected_patterns = self._detected_patterns()
+            classification_details = {
+                'is_sensitive': True,
+                'confidence': self.confidence,
+                'detected_patterns': detected_patterns,
+                'risk_level': self.risk_level,
+                'details': []
+            }
+            if self.extra:
+                classification_details.update(self.extra)
+            if detected_patterns:
+                issues.append(f"Detected sensitive patterns: {', '.join(set(self.pattern_names()))}")
+        timed_out = self.timed_out
+        if timed_out:
+            issues.append(f"Pattern time budget exceeded: {', '.join(timed_out)}")
+
+        result = {
+            'path': self.path,
+            'filename': os.path.basename(self.path),
+            'size': self.size,
+            'modified': _isoformat(self.modified),
+            'created': _isoformat(self.created),
+            'file_hash': self.sha256 or 'unknown',
+            'sensitive_content': self.sensitive,
+            'risk_level': self.risk_level,
+            'issues': issues,
+            'classification_details': classification_details,
+            'scan_timestamp': _isoformat(self.scan_timestamp)
+        }
+        if timed_out:
+            result['timed_out'] = list(timed_out)
+        return result
+
+    # Findings are pickled and persisted by name, since interned ids are
+    # only meaningful inside the process that assigned them
+    def to_state(self) -> list:
+        findings = [[*finding_label(finding_id), count, sample, extra]
+                    for finding_id, count, sample, extra in self.findings]
+        return [self.path, self.size, self.modified, self.created, self.sha256,
+                self.scan_timestamp, self.sensitive, self.risk_level, self.confidence,
+                findings, self.extra, self.error, self.issue]
+
+    @classmethod
+    def from_state(cls, state: list) -> 'ScanResult':
+        (path, size, modified, created, sha256, scan_timestamp, sensitive, risk_level,
+         confidence, findings, extra, error, issue) = state
+        return cls(
+            path, size, modified, created, bytes.fromhex(sha256) if sha256 else b'',
+            scan_timestamp, sensitive, risk_level, confidence,
+            tuple((intern_finding(kind, name), count, sample, finding_extra)
+                  for kind, name, count, sample, finding_extra in findings),
+            extra, error, issue
+        )
+
+    def __getstate__(self):
+        return self.to_state()
+
+    def __setstate__(self, state):
+        restored = ScanResult.from_state(state)
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(restored, slot))
+
+    def __eq__(self, other):
+        if not isinstance(other, ScanResult):
+            return NotImplemented
+        return self.to_state() == other.to_state()
+
+    def __repr__(self):
+        return f"ScanResult(path={self.path!r}, sensitive={self.sensitive}, error={self.error!r})"
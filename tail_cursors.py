@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Bytes read from one file per call; the rest waits for the next call
+DEFAULT_MAX_READ = 8 * 1024 * 1024
+# An unterminated line this long is scanned as far as it is written rather
+# than waited for
+DEFAULT_MAX_LINE = 64 * 1024
+
+
+class TailCursors:
+    """
+    Read positions in append-only files (logs), optionally persisted as JSON.
+
+    Each path has a cursor of (device, inode, byte offset, lines consumed),
+    so every read returns only the complete lines appended since the
+    previous one. The offset stops at the start of an unterminated last
+    line, which is carried over by reading it again once it is complete.
+    A different inode means the file was rotated and a size below the
+    offset that it was truncated; either way it is read from the start.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_read: int = DEFAULT_MAX_READ,
+                 max_line: int = DEFAULT_MAX_LINE):
+        self.path = Path(path) if path else None
+        self.max_read = max_read
+        self.max_line = max_line
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._cursors = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Tail cursors unreadable, starting over: {self.path} - {str(e)}")
+
+    def read_new(self, file_path: str) -> Tuple[str, int, int]:
+        """Complete lines appended to a file since the last call
+
+        Returns (text, number of lines before it, bytes left unread because
+        of ``max_read``); the text is empty if no line was completed.
+        Undecodable bytes are dropped, as the monitor does for whole files.
+        """
+        with open(file_path, 'rb') as f:
+            file_stat = os.fstat(f.fileno())
+            with self._lock:
+                cursor = self._cursors.get(file_path)
+            if cursor is None or cursor["device"] != file_stat.st_dev or \
+                    cursor["inode"] != file_stat.st_ino or file_stat.st_size < cursor["offset"]:
+                if cursor is not None:
+                    self.logger.info(f"Log rotated or truncated, reading from the start: {file_path}")
+                cursor = {"device": file_stat.st_dev, "inode": file_stat.st_ino, "offset": 0, "lines": 0}
+            if file_stat.st_size == cursor["offset"]:
+                return "", cursor["lines"], 0
+            f.seek(cursor["offset"])
+            data = f.read(self.max_read)
+
+        end = data.rfind(b'\n') + 1
+        if not end and len(data) >= min(self.max_line, self.max_read):
+            end = len(data)
+        # Cut at a newline, so no character is split across reads
+        complete = data[:end].decode('utf-8', errors='ignore')
+        first_line = cursor["lines"]
+        cursor = dict(cursor, offset=cursor["offset"] + end, lines=first_line + complete.count('\n'))
+        with self._lock:
+            self._cursors[file_path] = cursor
+            self._dirty = True
+        unread = file_stat.st_size - (cursor["offset"] - end + len(data))
+        return complete, first_line, max(0, unread)
+
+    def forget(self, file_path: str) -> None:
+        with self._lock:
+            if self._cursors.pop(file_path, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write the cursors if they changed, replacing the file atomically"""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            data = json.dumps(self._cursors)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(exist_ok=True, parents=True)
+            temp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Failed to save tail cursors: {self.path} - {str(e)}")
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._cursors)
@@ -0,0 +1,110 @@
+import random
+import re
+
+import pytest
+
+from ai_components import keyword_automaton
+from ai_components.content_classifier import ContentClassifier
+from ai_components.keyword_automaton import KeywordAutomaton
+from dlp_engine import DLPEngine
+
+# Fragments that put matches next to, inside and across each other
+PIECES = ['user@example.com', ' password=hunter2 ', '123-45-6789', '4111 1111 1111 1111',
+          '(555) 123-4567', '555.123.4567', 'sk-' + 'A' * 30, 'AKIA' + '7' * 20, 'secret: xyz',
+          'Token', 'KEY', 'private_key', 'secretsecret', 'SECRET_KEY', '9' * 12, 'abc', 'xyz',
+          'foo', 'ab', 'cd', 'qq', ' ', '\n', '-', '.', '\x1e', 'é', 'Σ', 'ΑΣ ', '日本', 'İ']
+
+# Extra patterns that cannot all share the combined alternation
+EXTRA_PATTERNS = {
+    'anchored': '^abc',
+    'line_end': {'pattern': r'xyz$', 'flags': ['MULTILINE']},
+    'lookbehind': r'(?<=\n)foo',
+    'dotall': {'pattern': r'ab.{0,4}cd', 'flags': ['DOTALL']},
+    'backref': r'(?P<x>q)(?P=x)',
+    'folded': {'pattern': r'secret', 'flags': ['IGNORECASE']},
+}
+
+
+def random_texts(seed, count, max_pieces=120):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(PIECES) for _ in range(rng.randint(0, max_pieces)))
+            for _ in range(count)]
+
+
+def naive_findings(classifier, text):
+    """What the classifier must report, one findall/count per pattern and keyword"""
+    findings = []
+    for name, pattern in classifier.pattern_registry.current.patterns.items():
+        matches = pattern.findall(text)
+        if matches:
+            findings.append({'type': name, 'count': len(matches), 'sample': matches[0]})
+    lowered = text.lower()
+    for keyword in classifier.high_risk_keywords:
+        count = lowered.count(keyword.lower())
+        if count:
+            findings.append({'keyword': keyword, 'count': count})
+    return findings
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return ContentClassifier({'patterns': EXTRA_PATTERNS})
+
+
+def test_classify_content_matches_naive_counts(classifier):
+    for text in random_texts(1, 300):
+        assert classifier.classify_content(text, 'x')['detected_patterns'] == \
+            naive_findings(classifier, text), text
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 300])
+def test_classify_stream_matches_whole_content(classifier, chunk_size):
+    for text in random_texts(2, 80):
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        assert classifier.classify_stream(chunks, 'x') == classifier.classify_content(text, 'x'), text
+
+
+@pytest.mark.parametrize('config', [{}, {'keyword_whole_words': True}, {'patterns': EXTRA_PATTERNS}])
+def test_classify_batch_matches_per_text(config):
+    batch_classifier = ContentClassifier(config)
+    rng = random.Random(3)
+    for round_ in range(40):
+        # Short texts, empty ones and ones holding the batch separator
+        texts = random_texts(round_, rng.randint(0, 40), max_pieces=rng.choice([0, 1, 2, 5, 20]))
+        assert batch_classifier.classify_batch(texts) == \
+            [batch_classifier.classify_content(text, 'batch') for text in texts]
+        assert batch_classifier.classify_batch(texts, locations=True) == \
+            [batch_classifier.classify_content(text, 'batch', locations=True) for text in texts]
+
+
+@pytest.mark.parametrize('whole_words', [False, True])
+def test_keyword_automaton_matches_direct_count(monkeypatch, whole_words):
+    keywords = ['key', 'secret', 'secret_key', 'private_key', 'token', 'eye', 'ee']
+    monkeypatch.setattr(keyword_automaton, 'DIRECT_COUNT_MAX_KEYWORDS', 0)
+    automaton = KeywordAutomaton(keywords, whole_words=whole_words)
+    assert automaton.uses_automaton
+    for text in random_texts(4, 300) + ['keyeyeee', 'SecretSecret_KEY', 'éToken_', 'ΣTOKEN token']:
+        if whole_words:
+            expected = {keyword: len(re.findall(r'(?<!\w)' + re.escape(keyword) + r'(?!\w)', text, re.I))
+                        for keyword in keywords}
+        else:
+            expected = {keyword: text.lower().count(keyword) for keyword in keywords}
+        assert automaton.count(text) == expected, text
+
+
+def test_parallel_scan_matches_serial(workdir):
+    data = workdir / 'data'
+    data.mkdir()
+    for index, text in enumerate(random_texts(5, 24, max_pieces=400)):
+        (data / f'file{index}.txt').write_text(text)
+
+    def scan(workers):
+        engine = DLPEngine({'workers': workers,
+                            'reporting': {'output_path': str(workdir / 'reports')},
+                            'database': {'path': str(workdir / f'index{workers}.db')}})
+        results = [result.to_dict() for result in engine.scan_target('data', mode='full')]
+        for result in results:
+            result.pop('scan_timestamp', None)
+        return sorted(results, key=lambda result: result['path'])
+
+    assert scan(1) == scan(3)
@@ -0,0 +1,66 @@
+from dlp_engine import DLPEngine
+
+
+def make_engine(workdir, **config):
+    config.setdefault("reporting", {"output_path": str(workdir / "reports")})
+    config.setdefault("database", {"path": str(workdir / "index.db")})
+    return DLPEngine(config)
+
+
+def test_failed_classification_is_not_cached_or_indexed(workdir, monkeypatch):
+    (workdir / "data").mkdir()
+    (workdir / "data" / "a.txt").write_text("ssn 123-45-6789\n")
+    (workdir / "data" / "b.txt").write_text("ssn 123-45-6789\n")
+    engine = make_engine(workdir)
+    calls = []
+
+    def failing(*args, **kwargs):
+        calls.append(args)
+        raise RuntimeError("classifier broke")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(engine.content_classifier, "_classify", failing)
+        results = engine.scan_target("data")
+    assert [result.error for result in results] == ["classifier broke"] * 2
+    assert not any(result.sensitive for result in results)
+    # Same content twice: the failure must not be served from the cache
+    assert len(calls) == 2
+    assert len(engine.classification_cache) == 0
+    assert engine.scan_index.count() == 0
+
+    results = engine.scan_target("data", mode="incremental")
+    assert all(result.sensitive for result in results)
+    assert engine.statistics["files_unchanged"] == 0
+    assert engine.scan_index.count() == 2
+
+
+def test_index_drops_files_gone_from_a_complete_walk(workdir):
+    data = workdir / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.txt").write_text("ssn 123-45-6789\n")
+    (data / "sub" / "b.txt").write_text("nothing here\n")
+    (data / "blob.dat").write_bytes(b"\x7fELF" + bytes(range(256)) * 4)
+    engine = make_engine(workdir, allowed_extensions=[".txt", ".dat"])
+    engine.scan_target("data")
+    assert engine.statistics["files_skipped_binary"] == 1
+    assert engine.scan_index.count() == 3
+
+    (data / "a.txt").unlink()
+    # A walk cut short proves nothing about the files it did not reach
+    scan = engine.iter_scan("data")
+    next(scan)
+    scan.close()
+    assert engine.scan_index.count() == 3
+
+    engine.reset_statistics()
+    engine.scan_target("data")
+    assert engine.statistics["files_unchanged"] == 1
+    assert engine.statistics["files_skipped_binary"] == 1
+    assert engine.scan_index.count() == 2
+
+    # Only rows below the walked directory are candidates for removal
+    engine.scan_target("data/sub")
+    assert engine.scan_index.count() == 2
+    (data / "sub" / "b.txt").unlink()
+    engine.scan_target("data/sub")
+    assert engine.scan_index.count() == 1
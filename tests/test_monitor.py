@@ -0,0 +1,31 @@
+import json
+import threading
+import time
+
+from monitor import BootnetMonitor
+
+
+def test_stop_saves_cursors_of_scans_still_running(workdir, monkeypatch):
+    logs = workdir / "logs"
+    logs.mkdir()
+    (logs / "app.log").write_text("ssn 123-45-6789\n")
+    cursors = workdir / "cursors.json"
+    monitor = BootnetMonitor({"database": {"path": str(workdir / "index.db")}},
+                             scan_paths=[str(logs)], event_driven=False,
+                             cursor_path=str(cursors))
+    started = threading.Event()
+    scan_changed = monitor._scan_changed
+
+    def slow_scan(path):
+        started.set()
+        time.sleep(0.3)
+        return scan_changed(path)
+
+    monkeypatch.setattr(monitor, "_scan_changed", slow_scan)
+    monitor.start()
+    assert started.wait(5)
+    monitor.stop()
+
+    saved = json.loads(cursors.read_text())
+    assert saved[str(logs / "app.log")]["lines"] == 1
+    assert len(monitor.findings.recent(10)) == 1
@@ -0,0 +1,60 @@
+import os
+
+from ai_components.content_classifier import ContentClassifier
+from ai_components.pattern_registry import BUILTIN_KEYWORDS, PatternRegistry
+
+
+def touch_later(path):
+    """Bump a file's mtime so the next poll sees it changed within the same second"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_keywords_come_from_config_and_keywords_file(tmp_path):
+    names = tmp_path / "codenames.txt"
+    names.write_text("# project codenames\nBlueHeron\n\nbuild-01.corp.internal\n")
+    config = tmp_path / "dlp.yaml"
+    config.write_text(f"keywords:\n  high_risk_keywords: [secret]\n  keywords_file: {names}\n")
+    registry = PatternRegistry(str(config), poll_interval=0)
+    assert registry.current.keywords == ("secret", "BlueHeron", "build-01.corp.internal")
+
+    classifier = ContentClassifier({}, registry)
+    result = classifier.classify_content("blueheron ships from BUILD-01.corp.internal", "x")
+    assert {p["keyword"]: p["count"] for p in result["detected_patterns"]} == \
+        {"BlueHeron": 1, "build-01.corp.internal": 1}
+
+
+def test_keywords_file_edit_reloads_and_changes_ruleset(tmp_path):
+    names = tmp_path / "codenames.txt"
+    names.write_text("BlueHeron\n")
+    registry = PatternRegistry(keywords_file=str(names), poll_interval=0)
+    classifier = ContentClassifier({}, registry)
+    before = classifier.ruleset_fingerprint()
+    assert registry.current.keywords == BUILTIN_KEYWORDS + ("BlueHeron",)
+
+    names.write_text("BlueHeron\nRedKite\n")
+    touch_later(names)
+    assert registry.maybe_reload()
+    assert registry.current.keywords[-1] == "RedKite"
+    assert classifier.ruleset_fingerprint() != before
+    assert classifier.classify_content("redkite", "x")["is_sensitive"]
+
+
+def test_bad_keyword_settings_keep_current_set(tmp_path):
+    config = tmp_path / "dlp.yaml"
+    config.write_text("keywords:\n  high_risk_keywords: [secret]\n")
+    registry = PatternRegistry(str(config), poll_interval=0)
+
+    config.write_text("keywords:\n  high_risk_keywords: 5\n")
+    touch_later(config)
+    assert not registry.maybe_reload()
+    assert registry.current.keywords == ("secret",)
+    assert registry.last_error
+
+
+def test_patterns_matching_the_empty_string_are_rejected():
+    registry = PatternRegistry(overrides={'stars': 'x*', 'lookahead': '(?=x)', 'optional': 'ab|',
+                                          'word': r'\bfoo\b'})
+    assert set(registry.current.rejected) == {'stars', 'lookahead', 'optional'}
+    assert registry.current.rejected['stars'] == "matches the empty string"
+    assert 'word' in registry.current.patterns